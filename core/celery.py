@@ -19,14 +19,20 @@ from kombu import Queue, Exchange
 # Two completely independent queues so that scraping and sync (import/export)
 # tasks NEVER block each other regardless of worker concurrency.
 #
-#   scraping  – all scrape_* tasks          → start with: -Q scraping --concurrency 2
-#   sync      – import / export / recovery  → start with: -Q sync,default --concurrency 4
-#   default   – celery beat / admin tasks   → included in the sync worker above
+#   scraping      – short scrape_* runs      → start with: -Q scraping --concurrency 1
+#   scraping_slow – long scrape_* runs       → start with: -Q scraping_slow,scraping --concurrency 1
+#   sync          – import / export / recovery  → start with: -Q sync,default --concurrency 4
+#   default       – celery beat / admin tasks   → included in the sync worker above
+#
+# Scrapes are put in the fast (scraping) or slow (scraping_slow) lane by their
+# expected duration when dispatched (scraper/scheduler.py); the route below
+# is only the fallback for tasks sent without a queue.
 #
 app.conf.task_queues = (
-    Queue('default',  Exchange('default'),  routing_key='default'),
-    Queue('scraping', Exchange('scraping'), routing_key='scraping'),
-    Queue('sync',     Exchange('sync'),     routing_key='sync'),
+    Queue('default',       Exchange('default'),       routing_key='default'),
+    Queue('scraping',      Exchange('scraping'),      routing_key='scraping'),
+    Queue('scraping_slow', Exchange('scraping_slow'), routing_key='scraping_slow'),
+    Queue('sync',          Exchange('sync'),          routing_key='sync'),
 )
 app.conf.task_default_queue = 'default'
 app.conf.task_default_exchange = 'default'
@@ -70,25 +76,48 @@ app.conf.task_routes = {
     'scraper.tasks.scrape_ezpekalach':                   {'queue': 'scraping'},
     'scraper.tasks.scrape_classictouchdecor':            {'queue': 'scraping'},
 
+    # Chunked crawls (dispatched to the session's lane; these are fallbacks)  ─
+    'scraper.tasks.crawl_chunk':                         {'queue': 'scraping'},
+    'scraper.tasks.finalize_chunked_crawl':              {'queue': 'default'},
+
+    # Cooperative crawl of several custom websites in one worker process  ──
+    'scraper.tasks.crawl_websites_together':             {'queue': 'scraping_slow'},
+
     # Sync / import / export tasks  ────────────────────────────────────────────
     'scraper.tasks.import_website_products_task':        {'queue': 'sync'},
     'scraper.tasks.export_products_to_website_task':     {'queue': 'sync'},
     'scraper.tasks.export_products_to_google_sheet':     {'queue': 'sync'},
 
+    # Re-extraction from the page archive (CPU only, no network)  ─────────────
+    'scraper.tasks.scrape_from_archive':                 {'queue': 'sync'},
+    'scraper.tasks.prune_page_archive_task':             {'queue': 'sync'},
+
     # Dashboard export task (defined in dashboard/tasks.py if it exists)
     'dashboard.tasks.export_products_task':              {'queue': 'sync'},
+    'dashboard.tasks.prune_exports_task':                {'queue': 'sync'},
 
     # Recovery  ────────────────────────────────────────────────────────────────
     'scraper.tasks.recover_stuck_sessions_task':         {'queue': 'default'},
+    'scraper.tasks.run_scheduled_scrape':                {'queue': 'default'},
 }
 
 # ── Celery Beat: periodic task schedule ──────────────────────────────────────
 app.conf.beat_schedule = {
     'recover-stuck-scraping-sessions': {
         'task': 'scraper.tasks.recover_stuck_sessions_task',
-        'schedule': 300.0,   # every 5 minutes
+        'schedule': 60.0,    # every minute (heartbeat lookups are cheap)
         'options': {'queue': 'default'},
     },
+    'prune-page-archive': {
+        'task': 'scraper.tasks.prune_page_archive_task',
+        'schedule': 24 * 60 * 60.0,    # daily
+        'options': {'queue': 'sync'},
+    },
+    'prune-excel-exports': {
+        'task': 'dashboard.tasks.prune_exports_task',
+        'schedule': 24 * 60 * 60.0,    # daily
+        'options': {'queue': 'sync'},
+    },
 }
 app.conf.timezone = 'UTC'
 
@@ -98,6 +127,10 @@ app.conf.task_track_started = True
 # Keep results long enough for stuck-session detection (24 hours)
 app.conf.result_expires = 86400
 
+# Reserve one task at a time so scrapes run in the order they were dispatched
+# (shortest first) instead of being prefetched by whichever process is free
+app.conf.worker_prefetch_multiplier = 1
+
 
 @app.task(bind=True)
 def debug_task(self):
@@ -145,6 +145,9 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Compressed archive of fetched product pages (scraper/page_archive.py)
+PAGE_ARCHIVE_ROOT = os.path.join(BASE_DIR, 'page_archive')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
@@ -156,6 +159,12 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TIME_ZONE = 'UTC'
 
+# Scrapers allowed to run at once across the workers (raise it for a gevent
+# pool worker, see WORKER_STARTUP.md) and, under gevent, database queries in
+# flight per worker process
+SCRAPER_MAX_CONCURRENT = int(os.environ.get('SCRAPER_MAX_CONCURRENT', '2'))
+SCRAPER_GREEN_DB_SLOTS = int(os.environ.get('SCRAPER_GREEN_DB_SLOTS', '10'))
+
 # Django REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
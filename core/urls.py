@@ -38,6 +38,7 @@ urlpatterns = [
     path('start-scraping/<int:website_id>/', start_scraping, name='start_scraping'),
     path('stop-scraping/<int:website_id>/', stop_scraping, name='stop_scraping'),
     path('resume-scraping/<int:session_id>/', resume_scraping, name='resume_scraping'),
+    path('reextract-scraping/<int:session_id>/', reextract_scraping, name='reextract_scraping'),
     
     # Bulk Operations
     path('start-all-scraping/', start_all_scraping, name='start_all_scraping'),
@@ -52,10 +53,12 @@ urlpatterns = [
     
     # Slow Scrapers (Custom HTML)
     path('start-all-slow-scraping/', start_all_slow_scraping, name='start_all_slow_scraping'),
+    path('start-slow-scraping-together/', start_slow_scraping_together, name='start_slow_scraping_together'),
     path('stop-all-slow-scraping/', stop_all_slow_scraping, name='stop_all_slow_scraping'),
     
     # Export Functionality
     path('export-products/', export_products, name='export_products'),
+    path('export-excel/<str:task_id>/', excel_export_status, name='excel_export_status'),
     path('export-status/<int:export_id>/', export_status, name='export_status'),
     path('cancel-export/<int:export_id>/', cancel_export, name='cancel_export'),
     
@@ -0,0 +1,64 @@
+"""
+Helpers shared by the dashboard product exports (CSV download and the
+background Excel export task).
+
+Rows are produced from values_list() tuples streamed with iterator() so large
+exports never hold full Product instances in memory.
+"""
+
+from scraper.models import Product, Website
+
+EXPORT_HEADERS = ['Website', 'Name', 'SKU', 'Price', 'Category', 'Vendor', 'InStock',
+                  'Description', 'Image Link', 'Link', 'Created At', 'Updated At']
+
+EXPORT_FIELDS = ('website', 'name', 'sku', 'price', 'category', 'vendor', 'in_stock',
+                 'description', 'image_link', 'link', 'created_at', 'updated_at')
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+def get_export_products(website_id='all'):
+    """
+    Return (queryset, filename) for the export filter.
+
+    Raises Website.DoesNotExist for an unknown website_id.
+    """
+    from django.utils import timezone
+
+    timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
+    if website_id == 'all':
+        products = Product.objects.all().order_by('website', 'created_at')
+        return products, f"all_products_{timestamp}"
+
+    website = Website.objects.get(id=website_id)
+    products = Product.objects.filter(website=website.name).order_by('created_at')
+    return products, f"{website.name}_products_{timestamp}"
+
+
+def export_rows(products, max_images=None):
+    """
+    Yield one list of cell values per product, in EXPORT_HEADERS order.
+
+    Args:
+        products: Product queryset
+        max_images: Keep only the first N comma-separated image links
+    """
+    rows = products.values_list(*EXPORT_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    for (website, name, sku, price, category, vendor, in_stock,
+         description, image_link, link, created_at, updated_at) in rows:
+        if image_link and max_images:
+            image_link = ", ".join(image_link.split(",")[:max_images])
+        yield [
+            website or '',
+            name or '',
+            sku or '',
+            price or '',
+            category or '',
+            vendor or '',
+            "Yes" if in_stock else "No",
+            description or '',
+            image_link or '',
+            link or '',
+            created_at.strftime('%Y-%m-%d %H:%M:%S') if created_at else '',
+            updated_at.strftime('%Y-%m-%d %H:%M:%S') if updated_at else '',
+        ]
@@ -0,0 +1,81 @@
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Finished Excel exports are written here and served by the dashboard
+EXPORTS_DIR = os.path.join(settings.BASE_DIR, 'exports')
+# The status page can only find an export while its task result exists
+# (result_expires, 24 hours), so older files are pruned daily by Beat
+EXPORTS_KEEP_HOURS = 24
+
+
+@shared_task(bind=True, soft_time_limit=1800, time_limit=1860)
+def export_products_task(self, website_id='all'):
+    """
+    Export products to an Excel file in the background.
+
+    Uses xlsxwriter's constant_memory mode: each row is flushed to disk as it
+    is written, so memory stays flat no matter how many products are exported.
+
+    Args:
+        website_id: 'all' or a Website ID
+
+    Returns:
+        Dict with status, file_path and filename
+    """
+    import xlsxwriter
+    from scraper.models import Website
+    from .exports import EXPORT_HEADERS, export_rows, get_export_products
+
+    try:
+        try:
+            products, filename = get_export_products(website_id)
+        except Website.DoesNotExist:
+            return {'status': 'failed', 'message': 'Website not found'}
+
+        os.makedirs(EXPORTS_DIR, exist_ok=True)
+        filename = f"{filename}.xlsx"
+        file_path = os.path.join(EXPORTS_DIR, filename)
+
+        workbook = xlsxwriter.Workbook(file_path, {'constant_memory': True})
+        worksheet = workbook.add_worksheet('Products')
+        worksheet.write_row(0, 0, EXPORT_HEADERS)
+
+        count = 0
+        for count, row in enumerate(export_rows(products, max_images=2), start=1):
+            worksheet.write_row(count, 0, row)
+
+        workbook.close()
+        logger.info(f"[ExcelExport] Wrote {count} products to {file_path}")
+
+        return {
+            'status': 'completed',
+            'file_path': file_path,
+            'filename': filename,
+            'products_exported': count,
+            'completed_at': timezone.now().isoformat(),
+        }
+
+    except Exception as e:
+        logger.error(f"[ExcelExport] Export failed: {e}")
+        return {'status': 'failed', 'message': str(e)}
+
+
+@shared_task(bind=True, soft_time_limit=300, time_limit=360)
+def prune_exports_task(self, keep_hours=EXPORTS_KEEP_HOURS):
+    """Daily Beat task: delete Excel exports older than keep_hours"""
+    cutoff = time.time() - keep_hours * 3600
+    deleted = 0
+    if os.path.isdir(EXPORTS_DIR):
+        for filename in os.listdir(EXPORTS_DIR):
+            path = os.path.join(EXPORTS_DIR, filename)
+            if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                deleted += 1
+    logger.info(f"[ExcelExport] Pruned {deleted} export file(s)")
+    return {'status': 'ok', 'deleted': deleted}
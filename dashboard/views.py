@@ -1,14 +1,20 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse, FileResponse
 from django.contrib import messages
 from .forms import BootstrapAuthenticationForm
+from .exports import EXPORT_HEADERS, export_rows, get_export_products
 from scraper.models import Website, ScrapingSession, ScrapingState, ScrapingLog, Product, GoogleSheetLinks
+from scraper.heartbeat import get_task_liveness
+from scraper.scheduler import describe_decision
 from scraper.utils import (
     start_scraping_session,
+    start_scraping_batch,
+    start_cooperative_crawl,
     stop_scraping_session,
     resume_scraping_session,
+    reextract_session,
     get_website_status,
     get_session_logs,
     initialize_websites,
@@ -50,8 +56,15 @@ def home(request):
     fast_websites = []  # Shopify websites
     slow_websites = []  # Custom HTML scrapers
     
+    # Check every running task with one heartbeat lookup
+    task_liveness = get_task_liveness(
+        ScrapingState.objects.filter(
+            website__in=websites, current_session__isnull=False
+        ).values_list('current_session__celery_task_id', flat=True)
+    )
+    
     for website in websites:
-        status = get_website_status(website.id)
+        status = get_website_status(website.id, task_liveness=task_liveness)
         
         # Check if it's a custom scraper (slow) or Shopify (fast)
         scraper_function = website.scraper_function.lower()
@@ -185,6 +198,26 @@ def resume_scraping(request, session_id):
     
     return redirect('home')
 
+@login_required(login_url='login')
+def reextract_scraping(request, session_id):
+    """Re-extract a session's archived product pages without crawling the site"""
+    if request.method == 'POST':
+        result = reextract_session(session_id, user=request.user)
+        
+        if result['success']:
+            messages.success(request, result['message'])
+        else:
+            messages.error(request, result['message'])
+        
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return JsonResponse(result)
+        
+        if result['success']:
+            return redirect('session_details', session_id=result['session_id'])
+        return redirect('session_details', session_id=session_id)
+    
+    return redirect('home')
+
 @login_required(login_url='login')
 def website_status(request, website_id):
     """Get real-time status of a website's scraping operation"""
@@ -206,7 +239,8 @@ def session_details(request, session_id):
     context = {
         'session': session,
         'logs': logs_data.get('logs', []) if 'logs' in logs_data else [],
-        'website_status': get_website_status(session.website.id)
+        'website_status': get_website_status(session.website.id),
+        'archived_page_count': session.archived_pages.count(),
     }
     
     return render(request, 'session_details.html', context)
@@ -256,6 +290,13 @@ def user_login(request):
 
     return render(request, 'login.html', {'form': form})
 
+def _dispatch_result_message(decision, result):
+    """Bulk-start message for one website, with its lane when it was started"""
+    message = f"{decision['website'].name}: {result['message']}"
+    if result.get('success'):
+        message += f" ({describe_decision(decision)})"
+    return message
+
 @login_required(login_url='login')
 def start_all_scraping(request):
     """Start scraping for all active websites"""
@@ -263,9 +304,9 @@ def start_all_scraping(request):
         websites = Website.objects.filter(is_active=True)
         results = []
         
-        for website in websites:
-            result = start_scraping_session(website.id, user=request.user)
-            results.append(f"{website.name}: {result['message']}")
+        # Shortest expected runs first, long crawls in the slow lane
+        for decision, result in start_scraping_batch(websites, user=request.user):
+            results.append(_dispatch_result_message(decision, result))
         
         if results:
             messages.success(request, f"Bulk operation completed: {'; '.join(results)}")
@@ -395,9 +436,8 @@ def start_all_fast_scraping(request):
         ]
         
         results = []
-        for website in fast_websites:
-            result = start_scraping_session(website.id, user=request.user)
-            results.append(f"{website.name}: {result['message']}")
+        for decision, result in start_scraping_batch(fast_websites, user=request.user):
+            results.append(_dispatch_result_message(decision, result))
         
         if results:
             messages.success(request, f"Started {len(fast_websites)} fast Shopify scrapers: {'; '.join(results)}")
@@ -480,9 +520,8 @@ def start_all_slow_scraping(request):
         ]
         
         results = []
-        for website in slow_websites:
-            result = start_scraping_session(website.id, user=request.user)
-            results.append(f"{website.name}: {result['message']}")
+        for decision, result in start_scraping_batch(slow_websites, user=request.user):
+            results.append(_dispatch_result_message(decision, result))
         
         if results:
             messages.success(request, f"Started {len(slow_websites)} slow HTML scrapers: {'; '.join(results)}")
@@ -496,6 +535,26 @@ def start_all_slow_scraping(request):
     
     return redirect('home')
 
+@login_required(login_url='login')
+def start_slow_scraping_together(request):
+    """Crawl all slow (Custom HTML) websites together in one worker process"""
+    if request.method == 'POST':
+        result = start_cooperative_crawl(Website.objects.filter(is_active=True), user=request.user)
+        
+        if result['success']:
+            messages.success(request, result['message'])
+        else:
+            messages.warning(request, result['message'])
+        if result['skipped']:
+            messages.info(request, f"Skipped: {'; '.join(result['skipped'])}")
+        
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return JsonResponse(result)
+        
+        return redirect('home')
+    
+    return redirect('home')
+
 @login_required(login_url='login')
 def stop_all_slow_scraping(request):
     """Stop scraping for all slow (Custom HTML) websites"""
@@ -536,25 +595,18 @@ def export_products(request):
     website_id = request.GET.get('website_id', 'all')  # specific website or all
     
     # Get products based on filter
-    if website_id == 'all':
-        products = Product.objects.all().order_by('website', 'created_at')
-        filename = f"all_products_{timezone.now().strftime('%Y%m%d_%H%M%S')}"
-    else:
-        print(type(website_id))
-        try:
-            website = Website.objects.get(id=website_id)
-            products = Product.objects.filter(website=website.name).order_by('created_at')
-            filename = f"{website.name}_products_{timezone.now().strftime('%Y%m%d_%H%M%S')}"
-        except Website.DoesNotExist:
-            messages.error(request, "Website not found")
-            return redirect('home')
+    try:
+        products, filename = get_export_products(website_id)
+    except Website.DoesNotExist:
+        messages.error(request, "Website not found")
+        return redirect('home')
     
     if not products.exists():
         messages.warning(request, "No products found to export")
         return redirect('home')
     
     if format_type == 'excel':
-        return _export_excel(products, filename)
+        return _export_excel_background(website_id)
     elif format_type == 'google_sheet':
         return _export_google_sheet_background(request, website_id)
     else:
@@ -587,68 +639,67 @@ def _export_google_sheet_background(request, website_filter='all'):
     messages.info(request, "Google Sheet export started in background. Check the status on the homepage.")
     return redirect('home')
 
+class _Echo:
+    """File-like object whose write() returns the value, for streaming csv.writer output"""
+    def write(self, value):
+        return value
+
 def _export_csv(products, filename):
-    """Export products to CSV format"""
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    """Stream products as CSV, fetching rows in chunks instead of full model instances"""
+    writer = csv.writer(_Echo())
     
-    writer = csv.writer(response)
-    writer.writerow(['Website', 'Name', 'SKU', 'Price', 'Category','Vendor','InStock', 'Description', 'Image Link','Link', 'Created At', 'Updated At'])
-    
-    for product in products:
-        writer.writerow([
-            product.website,
-            product.name,
-            product.sku,
-            product.price,
-            product.category,
-            product.vendor,
-            "Yes" if product.in_stock else "No",
-            product.description,
-            product.image_link,
-            product.link,
-            product.created_at.strftime('%Y-%m-%d %H:%M:%S') if product.created_at else '',
-            product.updated_at.strftime('%Y-%m-%d %H:%M:%S') if product.updated_at else ''
-        ])
+    def stream():
+        yield writer.writerow(EXPORT_HEADERS)
+        for row in export_rows(products):
+            yield writer.writerow(row)
     
+    response = StreamingHttpResponse(stream(), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
     return response
 
-def _export_excel(products, filename):
-    """Export products to Excel format"""
-    output = BytesIO()
-    workbook = xlsxwriter.Workbook(output, {'in_memory': True})
-    worksheet = workbook.add_worksheet('Products')
-    
-    # Add headers
-    headers = ['Website', 'Name', 'SKU', 'Price', 'Category', 'Vendor', 'InStock','Description','Image Link', 'Link', 'Created At', 'Updated At']
-    for col, header in enumerate(headers):
-        worksheet.write(0, col, header)
-    
-    # Add data
-    for row, product in enumerate(products, start=1):
-        worksheet.write(row, 0, product.website or '')
-        worksheet.write(row, 1, product.name or '')
-        worksheet.write(row, 2, product.sku or '')
-        worksheet.write(row, 3, product.price or '')
-        worksheet.write(row, 4, product.category or '')
-        worksheet.write(row, 5, product.vendor or '')
-        worksheet.write(row, 6, "Yes" if product.in_stock else "No")
-        worksheet.write(row, 7, product.description or '')
-        worksheet.write(row, 8, ", ".join(product.image_link.split(",")[:2]) or '')
-        worksheet.write(row, 9, product.link or '')
-        worksheet.write(row, 10, product.created_at.strftime('%Y-%m-%d %H:%M:%S') if product.created_at else '')
-        worksheet.write(row, 11, product.updated_at.strftime('%Y-%m-%d %H:%M:%S') if product.updated_at else '')
+def _export_excel_background(website_id='all'):
+    """Start the Excel export in background; the status page serves the file when ready"""
+    from .tasks import export_products_task
     
-    workbook.close()
-    output.seek(0)
-    
-    response = HttpResponse(
-        output.read(),
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    response['Content-Disposition'] = f'attachment; filename="{filename}.xlsx"'
+    task = export_products_task.delay(website_id)
+    return redirect('excel_export_status', task_id=task.id)
+
+# The wait page reloads every 3 seconds; give up after the export task's
+# time limit (1860 s), as an unknown or expired task ID stays PENDING forever
+EXCEL_EXPORT_MAX_CHECKS = 620
+
+@login_required(login_url='login')
+def excel_export_status(request, task_id):
+    """Wait page for a background Excel export; downloads the file once it is ready"""
+    from celery.result import AsyncResult
     
-    return response
+    try:
+        check = int(request.GET.get('check', 0))
+    except ValueError:
+        check = 0
+    
+    task_result = AsyncResult(task_id)
+    if not task_result.ready():
+        if check >= EXCEL_EXPORT_MAX_CHECKS:
+            messages.error(request, "Excel export did not finish in time, or the export has expired. Please start a new export.")
+            return redirect('home')
+        return render(request, 'export_excel_status.html', {'task_id': task_id, 'next_check': check + 1})
+    
+    result = task_result.result
+    if isinstance(result, dict) and result.get('status') == 'completed':
+        file_path = result.get('file_path')
+        if file_path and os.path.exists(file_path):
+            return FileResponse(
+                open(file_path, 'rb'),
+                as_attachment=True,
+                filename=result.get('filename'),
+                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            )
+        messages.error(request, "Excel export file not found on server")
+    else:
+        message = result.get('message') if isinstance(result, dict) else 'Unknown error'
+        messages.error(request, f"Excel export failed: {message}")
+    return redirect('home')
 
 def _export_to_google_sheet(products, filename):
     SERVICE_ACCOUNT_FILE = os.path.join(settings.BASE_DIR, 'credentials', 'web-scraper-463601-05f99a6d168b.json')
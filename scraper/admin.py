@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     Website, Product, ScrapingSession, ScrapingLog, ScrapingState,
-    GoogleSheetLinks, VendorConfiguration, ProductSyncStatus, WebsiteImportLog
+    GoogleSheetLinks, VendorConfiguration, ProductSyncStatus, WebsiteImportLog, ScrapeSchedule
 )
 
 @admin.register(Website)
@@ -57,6 +57,13 @@ class ScrapingStateAdmin(admin.ModelAdmin):
     list_display = ['website', 'is_running', 'current_session', 'last_run']
     list_filter = ['is_running', 'last_run']
     readonly_fields = ['last_run']
+@admin.register(ScrapeSchedule)
+class ScrapeScheduleAdmin(admin.ModelAdmin):
+    list_display = ['website', 'scrape_mode', 'minute', 'hour', 'day_of_week', 'window_start', 'window_end',
+                    'is_active', 'last_run_at', 'last_result']
+    list_filter = ['scrape_mode', 'is_active']
+    search_fields = ['website__name']
+    readonly_fields = ['last_run_at', 'last_result', 'last_session', 'created_at', 'updated_at']
 @admin.register(GoogleSheetLinks)
 class GoogleSheetAdmin(admin.ModelAdmin):
     list_display = ['link', 'status']
@@ -0,0 +1,182 @@
+"""
+Cooperative crawl of several websites in one worker process
+
+A single-site crawl spends nearly all of its time sleeping between polite
+requests while it holds a worker slot. run_cooperative_crawl() drives many
+websites from one asyncio event loop instead: each website is a coroutine
+that waits for its domain's next request slot (rate_limit.py, the same
+reservations chunked crawls take), fetches the page on a thread of its own
+and hands it to a shared write stage.
+
+The write stage is one thread behind a bounded queue, so every database
+write of the crawl goes through a single connection in arrival order and a
+slow database holds the fetchers back instead of piling pages up in memory.
+Because the queue is FIFO, a website's finish() runs after all of its pages
+were saved.
+
+The loop itself never blocks: URL loading, requests and slot reservations
+run on the fetch threads, database work on the write thread. load() may
+return an iterator instead of a list (e.g. crawl_frontier.py streaming
+product URLs while category pages are still being crawled); items are then
+pulled one at a time on the fetch thread.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List
+from urllib.parse import urlparse
+
+from django.db import connection
+
+from .rate_limit import reserve_slot
+
+logger = logging.getLogger(__name__)
+
+# Pages fetched but not yet saved, across all websites
+WRITE_QUEUE_SIZE = 20
+
+_END = object()
+
+
+class SiteCrawl:
+    """
+    One website of a cooperative crawl.
+
+    load() and fetch() run on a fetch thread; loaded(), is_active(), save()
+    and finish() run on the write thread. An exception from load() or
+    loaded() fails the website; fetch() errors are passed to save() in place
+    of the page.
+    """
+
+    interval = 10  # seconds between requests to the website's domain
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def load(self) -> Iterable:
+        """The website's URL list items, as a list or an iterator"""
+        raise NotImplementedError
+
+    def url(self, item) -> str:
+        return item
+
+    def loaded(self, items: Iterable):
+        pass
+
+    def is_active(self) -> bool:
+        return True
+
+    def fetch(self, item):
+        raise NotImplementedError
+
+    def save(self, position: int, item, page):
+        raise NotImplementedError
+
+    def finish(self, status: str, error: str = ''):
+        """status: 'completed', 'stopped' or 'failed'"""
+
+
+def _close_connection():
+    # Resolved in the calling thread: each thread has its own connection
+    connection.close()
+
+
+def _closing_connection(func, *args):
+    # fetch() may read the page cache; don't keep a connection open per fetch thread
+    try:
+        return func(*args)
+    finally:
+        connection.close()
+
+
+class _CooperativeCrawl:
+    def __init__(self, sites: List[SiteCrawl], write_queue_size: int):
+        self.sites = sites
+        self.write_queue_size = write_queue_size
+
+    async def run(self) -> Dict[str, str]:
+        self.loop = asyncio.get_running_loop()
+        self.writes = asyncio.Queue(maxsize=self.write_queue_size)
+        # A website has at most one load, reservation or request in flight,
+        # so one thread each means no website ever waits for another
+        self.fetch_pool = ThreadPoolExecutor(max(1, len(self.sites)), thread_name_prefix='crawl-fetch')
+        self.db_pool = ThreadPoolExecutor(1, thread_name_prefix='crawl-db')
+        writer = asyncio.create_task(self._write_stage())
+        try:
+            statuses = await asyncio.gather(*(self._crawl_site(site) for site in self.sites))
+            await self.writes.join()
+            return dict(zip((site.name for site in self.sites), statuses))
+        finally:
+            writer.cancel()
+            self.fetch_pool.shutdown(wait=True, cancel_futures=True)
+            self.db_pool.submit(_close_connection).result()
+            self.db_pool.shutdown(wait=True)
+
+    def _fetching(self, func, *args):
+        return self.loop.run_in_executor(self.fetch_pool, _closing_connection, func, *args)
+
+    def _db(self, func, *args):
+        return self.loop.run_in_executor(self.db_pool, func, *args)
+
+    async def _write(self, func, *args):
+        # Blocks while the write stage is WRITE_QUEUE_SIZE items behind
+        await self.writes.put((func, args))
+
+    async def _write_stage(self):
+        while True:
+            func, args = await self.writes.get()
+            try:
+                await self._db(func, *args)
+            except Exception as e:
+                logger.exception(f"[CooperativeCrawl] Write failed: {e}")
+            finally:
+                self.writes.task_done()
+
+    async def _crawl_site(self, site: SiteCrawl) -> str:
+        status, error = 'completed', ''
+        iterator = None
+        try:
+            items = await self._fetching(site.load)
+            # Not queued: an error here (e.g. no URLs found) fails the website
+            await self._db(site.loaded, items)
+            iterator = iter(items)
+            position = 0
+            while True:
+                item = await self._fetching(next, iterator, _END)
+                if item is _END:
+                    break
+                if not await self._db(site.is_active):
+                    status = 'stopped'
+                    break
+                delay = await self._fetching(reserve_slot, urlparse(site.url(item)).netloc, site.interval)
+                await asyncio.sleep(delay)
+                try:
+                    page = await self._fetching(site.fetch, item)
+                except Exception as fetch_error:
+                    page = fetch_error
+                await self._write(site.save, position, item, page)
+                position += 1
+        except Exception as e:
+            logger.exception(f"[CooperativeCrawl] {site.name} failed: {e}")
+            status, error = 'failed', str(e)
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                # Stops a generator's background work (e.g. frontier discovery threads)
+                await self._fetching(close)
+        await self._write(site.finish, status, error)
+        return status
+
+
+def run_cooperative_crawl(sites: List[SiteCrawl], write_queue_size: int = WRITE_QUEUE_SIZE) -> Dict[str, str]:
+    """
+    Crawl several websites concurrently from one event loop.
+
+    Each website keeps its own request spacing; the whole run takes about as
+    long as its slowest website instead of the sum of all of them.
+
+    Returns:
+        dict: website name -> 'completed', 'stopped' or 'failed'
+    """
+    return asyncio.run(_CooperativeCrawl(sites, write_queue_size).run())
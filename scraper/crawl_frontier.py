@@ -0,0 +1,223 @@
+"""
+Persistent crawl frontier for the category-crawling URL loaders
+
+Loaders that find products by walking category and pagination pages
+(mefoarjudaica, ozvehadar, kaftorjudaica, toys4u) keep every page they find
+in CrawlFrontierURL rows instead of in memory:
+
+- A URL is stored once per frontier, so a product listed in several
+  categories is returned once and a listing page is never visited twice.
+- Listing pages are claimed by DISCOVERY_CONCURRENCY threads, highest
+  priority first, then nearest to the seed. Requests to one domain stay
+  `interval` seconds apart through the rate_limit.py slots that product
+  crawls use as well.
+- iter_products() yields each product as soon as its listing page has been
+  parsed, so the fetch stage can start before the category crawl ends.
+- A frontier interrupted less than FRONTIER_MAX_AGE ago (listing pages still
+  pending or in progress) is continued: pages claimed by a crashed run go
+  back to pending, and products found before come first, in the same order.
+  A frontier crawled to the end is cleared, so the next run starts over from
+  the seeds, as do older ones.
+"""
+
+import hashlib
+import json
+import logging
+import queue
+import threading
+from datetime import timedelta
+from typing import Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+import requests
+from django.db import connection
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import CrawlFrontierURL
+from .rate_limit import wait_for_slot
+
+logger = logging.getLogger(__name__)
+
+DISCOVERY_CONCURRENCY = 3
+FRONTIER_MAX_AGE = timedelta(hours=6)
+# A listing page that failed this many times is given up
+MAX_ATTEMPTS = 3
+
+
+def frontier_key(item) -> str:
+    """sha256 of a product's URL, or of its listing data when it has no link"""
+    if isinstance(item, dict):
+        key = item.get('link') or json.dumps(item, sort_keys=True)
+    else:
+        key = item
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def _item(row: CrawlFrontierURL):
+    return row.data if row.data is not None else row.url
+
+
+class CrawlFrontier:
+    """
+    Frontier of one loader
+
+    Args:
+        name: Frontier name (the loader's website)
+        seeds: Listing pages the crawl starts from
+        parse: parse(url, depth, response) -> dict with 'listings' (category
+            pages), 'next_page' (URL or None) and 'products' (URLs or dicts
+            with a 'link')
+        get: Function doing the request (default requests.get)
+        interval: Seconds between listing requests to the domain
+    """
+
+    def __init__(self, name: str, seeds: List[str], parse: Callable, get: Optional[Callable] = None,
+                 interval: float = 0, concurrency: int = DISCOVERY_CONCURRENCY,
+                 max_age: timedelta = FRONTIER_MAX_AGE):
+        self.name = name
+        self.seeds = seeds
+        self.parse = parse
+        self.get = get or requests.get
+        self.interval = interval
+        self.concurrency = concurrency
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+    @property
+    def rows(self):
+        return CrawlFrontierURL.objects.filter(frontier=self.name)
+
+    def open(self):
+        """Continue a recent, interrupted frontier, or clear any other one and push the seeds"""
+        unfinished = self.rows.filter(kind='listing', state__in=['pending', 'in_progress'])
+        last_update = self.rows.aggregate(last=Max('updated_at'))['last']
+        if last_update is not None and timezone.now() - last_update < self.max_age and unfinished.exists():
+            requeued = self.rows.filter(state='in_progress').update(state='pending')
+            logger.info(f"[Frontier] Continuing {self.name} ({requeued} interrupted pages requeued)")
+            return
+        self.rows.delete()
+        self.push_listings(self.seeds, depth=0)
+
+    def push_listings(self, urls: List[str], depth: int, priority: int = 0):
+        self._push(urls, 'listing', depth, priority)
+
+    def push_products(self, items: List, depth: int) -> List:
+        """Store products not seen before; returns them in the order given"""
+        return self._push(items, 'product', depth, 0)
+
+    def _push(self, items: List, kind: str, depth: int, priority: int) -> List:
+        new_rows = {}
+        for item in items:
+            key = frontier_key(item)
+            if key not in new_rows:
+                new_rows[key] = CrawlFrontierURL(
+                    frontier=self.name,
+                    url_hash=key,
+                    url=(item.get('link') or '') if isinstance(item, dict) else item,
+                    kind=kind,
+                    depth=depth,
+                    priority=priority,
+                    state='done' if kind == 'product' else 'pending',
+                    data=item if isinstance(item, dict) else None,
+                )
+        with self._lock:
+            known = set(self.rows.filter(url_hash__in=list(new_rows)).values_list('url_hash', flat=True))
+            rows = [row for key, row in new_rows.items() if key not in known]
+            CrawlFrontierURL.objects.bulk_create(rows, ignore_conflicts=True)
+        return [_item(row) for row in rows]
+
+    def claim(self) -> Optional[CrawlFrontierURL]:
+        """Take the next pending listing page, or None if there is none right now"""
+        while True:
+            row = self.rows.filter(kind='listing', state='pending').order_by('-priority', 'depth', 'id').first()
+            if row is None:
+                return None
+            # Conditional update: only one claimant wins the row
+            if self.rows.filter(id=row.id, state='pending').update(state='in_progress', updated_at=timezone.now()):
+                return row
+
+    def finish(self, row: CrawlFrontierURL, error: str = ''):
+        if not error:
+            self.rows.filter(id=row.id).update(state='done', updated_at=timezone.now())
+            return
+        attempts = row.attempts + 1
+        state = 'failed' if attempts >= MAX_ATTEMPTS else 'pending'
+        self.rows.filter(id=row.id).update(state=state, attempts=attempts, updated_at=timezone.now())
+        logger.warning(f"[Frontier] {self.name}: {row.url} failed ({attempts}/{MAX_ATTEMPTS}): {error}")
+
+    def visit(self, row: CrawlFrontierURL) -> List:
+        """Fetch and parse a claimed listing page; returns the new products on it"""
+        if self.interval:
+            wait_for_slot(urlparse(row.url).netloc, self.interval)
+        try:
+            page = self.parse(row.url, row.depth, self.get(row.url))
+        except Exception as e:
+            self.finish(row, error=str(e) or e.__class__.__name__)
+            return []
+
+        self.push_listings(page.get('listings', []), depth=row.depth + 1)
+        if page.get('next_page'):
+            # Finish a category's pages before opening the next category
+            self.push_listings([page['next_page']], depth=row.depth + 1, priority=row.priority + 1)
+        products = self.push_products(page.get('products', []), depth=row.depth + 1)
+        self.finish(row)
+        logger.info(f"[Frontier] {self.name}: {row.url} - {len(products)} new products")
+        return products
+
+    def _discover(self, found: queue.Queue, stop: threading.Event):
+        try:
+            while not stop.is_set():
+                row = self.claim()
+                if row is None:
+                    # Pages being parsed by other threads may still add more
+                    if not self.rows.filter(kind='listing', state='in_progress').exists():
+                        return
+                    stop.wait(0.5)
+                    continue
+                for item in self.visit(row):
+                    found.put(item)
+        except Exception as e:
+            logger.exception(f"[Frontier] {self.name}: discovery thread failed: {e}")
+        finally:
+            connection.close()
+
+    def iter_products(self) -> Iterator:
+        """
+        Products of the frontier: those found by an earlier, interrupted run
+        first, then each new one as soon as its listing page is parsed.
+        """
+        self.open()
+        known = [_item(row) for row in self.rows.filter(kind='product').order_by('id')]
+
+        found = queue.Queue()
+        stop = threading.Event()
+        threads = [
+            threading.Thread(target=self._discover, args=(found, stop), name=f'frontier-{self.name}-{i}', daemon=True)
+            for i in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            yield from known
+            while True:
+                try:
+                    yield found.get(timeout=0.5)
+                except queue.Empty:
+                    if not any(thread.is_alive() for thread in threads) and found.empty():
+                        break
+            # Crawled to the end: a later run must not replay these products
+            logger.info(f"[Frontier] {self.name} finished: {self.summary()}")
+            self.rows.delete()
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    def summary(self) -> Dict[str, int]:
+        """Row counts by kind and state, e.g. {'listing_done': 40, 'product_done': 1200}"""
+        counts = {}
+        for row in self.rows.values('kind', 'state'):
+            key = f"{row['kind']}_{row['state']}"
+            counts[key] = counts.get(key, 0) + 1
+        return counts
@@ -0,0 +1,555 @@
+"""
+Declarative extraction specs for the custom (HTML) scrapers
+
+Each extract_<site>_product_info in tasks.py is a thin wrapper around
+extract_with_spec(). A spec maps every Product field to where its value comes
+from, tried in this order:
+
+    structured  – key of the page's JSON-LD / microdata (structured_data.py),
+                  or a callable taking that dict
+    xpath       – XPath on the lxml tree of the page (a list is tried in order)
+    listing     – key of the listing dict the scraper collected for the page
+    url         – callable taking the product link
+    from_field  – value of a field extracted before this one
+    value       – a constant
+
+with these optional modifiers:
+
+    pick        – 'first' (default), 'last', 'all' or an index into the matches
+    min_matches – only pick when the XPath found at least this many nodes
+    separator   – join an element's text nodes with it ('' by default, which
+                  matches BeautifulSoup's get_text(strip=True))
+    clean       – functions applied in order to a value that did not come from
+                  structured data
+    default     – used when nothing matched ('' if not given)
+    required    – raise when nothing matched, failing the page like a missing
+                  element used to
+
+Every XPath is compiled once when the module is imported, so each worker
+process pays for it once instead of re-interpreting selectors on every page.
+Specs are XPath only: CSS selectors would need cssselect, which is not a
+dependency.
+
+Adding an HTML vendor is a new EXTRACTION_SPECS entry plus the usual scrape
+loop; field-level changes never touch tasks.py.
+"""
+
+import re
+from typing import Dict, Optional
+
+from lxml import etree
+
+from .models import link_variant_id
+from .structured_data import ProductPage, structured_price
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+
+
+def cls(*names: str) -> str:
+    """XPath predicate for an element carrying every one of the class tokens"""
+    return ' and '.join(
+        f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')" for name in names
+    )
+
+
+def any_cls(*names: str) -> str:
+    """XPath predicate for an element carrying at least one of the class tokens"""
+    return '(' + ' or '.join(f"({cls(name)})" for name in names) + ')'
+
+
+# ── Post-processing ───────────────────────────────────────────────────────────
+
+def digits(value: str) -> str:
+    """'$1,299.00 MSRP' -> '1299.00'"""
+    return re.sub(r'[^\d\.]', '', value)
+
+
+def https_scheme(value: str) -> str:
+    """Protocol-relative '//cdn/...' -> 'https://cdn/...'"""
+    return 'https:' + value if value.startswith('//') else value
+
+
+def prefix(base_url: str):
+    def add_prefix(value: str) -> str:
+        return base_url + value
+    return add_prefix
+
+
+def remove(pattern: str):
+    def remove_pattern(value: str) -> str:
+        return re.sub(pattern, '', value, flags=re.IGNORECASE).strip()
+    return remove_pattern
+
+
+def contains(text: str, ignore_case: bool = False):
+    def has_text(value: str) -> bool:
+        if ignore_case:
+            return text.lower() in value.lower()
+        return text in value
+    return has_text
+
+
+def image_files(values):
+    """Unique image URLs (by extension), in page order"""
+    return list(dict.fromkeys(v for v in values if v.endswith(IMAGE_EXTENSIONS)))
+
+
+def join_first(count: int, separator: str = ','):
+    def join(values) -> str:
+        return separator.join(values[:count])
+    return join
+
+
+def price_with_symbol(structured: Dict) -> Optional[str]:
+    return structured_price(structured, with_symbol=True)
+
+
+def price_without_symbol(structured: Dict) -> Optional[str]:
+    return structured_price(structured, with_symbol=False)
+
+
+HAS_PRICE = {'from_field': 'price', 'clean': [bool], 'default': False}
+
+# Gallery/theme image URLs on BigCommerce pages: links, img src and lazy-loaded img
+BIGCOMMERCE_IMAGES = {
+    'xpath': '//a/@href | //img/@src | //img/@data-lazy',
+    'pick': 'all',
+    'clean': [image_files, join_first(2)],
+}
+
+
+# ── Specs ─────────────────────────────────────────────────────────────────────
+# Field keys follow the Product model. product_variant_id is derived after the
+# fields: 'sku' uses '<website>_<sku>' when there is a SKU, 'link' always
+# uses a digest of the product link (link_variant_id).
+
+EXTRACTION_SPECS = {
+    'feldheim': {
+        'variant_id': 'sku',
+        'fields': {
+            'name': {'listing': 'title'},
+            'sku': {'url': lambda link: link.rstrip('/').split('/')[-1]},
+            'price': {'structured': 'price', 'xpath': "//meta[@itemprop='price']/@content", 'default': None},
+            'vendor': {'value': ''},
+            'category': {'structured': 'brand', 'xpath': f"//a[{cls('brand-link')}]", 'default': None},
+            'description': {
+                'structured': 'description',
+                'xpath': f"//*[@data-id='description']//*[{cls('prose')}]",
+                'separator': ' ',
+                'default': None,
+            },
+            'in_stock': {
+                'structured': 'in_stock',
+                'xpath': f"//p[{cls('stock')}]//span",
+                'clean': [contains('in stock', ignore_case=True)],
+                'default': False,
+            },
+            'image_link': {'listing': 'image'},
+        },
+    },
+    'toys4u': {
+        'variant_id': 'sku',
+        'fields': {
+            'name': {'listing': 'title'},
+            'sku': {'structured': 'sku', 'xpath': f"//*[{cls('productView-info-value--sku')}]"},
+            'price': {'listing': 'price'},
+            'vendor': {'value': ''},
+            'category': {'listing': 'category'},
+            'description': {
+                'structured': 'description',
+                'xpath': f"//*[@id='tab-description']//*[{cls('productView-description-tabContent')}]",
+                'separator': ' ',
+            },
+            'in_stock': {'value': True},
+            'image_link': {'listing': 'image'},
+        },
+    },
+    'jewisheducationaltoys': {
+        'variant_id': 'sku',
+        'fields': {
+            'name': {'structured': 'name', 'xpath': f"//font[{cls('productnamecolorLARGE', 'colors_productname')}]"},
+            # The UPC value is the text right after <b>UPC:</b>
+            'sku': {'structured': 'gtin', 'xpath': "(//b[contains(., 'UPC:')])[1]/following-sibling::node()[1]"},
+            'price': {'value': 'Login Required'},
+            'vendor': {'value': ''},
+            'category': {
+                'xpath': f"((//td[{cls('vCSS_breadcrumb_td')}])[1]//b)[1]//a",
+                'pick': 'last',
+                'required': True,
+            },
+            'description': {'structured': 'description', 'xpath': "//span[@id='product_description']"},
+            'in_stock': {
+                'structured': 'in_stock',
+                'xpath': "//meta[@itemprop='availability']/@content",
+                'clean': [contains('InStock')],
+                'default': False,
+            },
+            'image_link': {
+                'structured': 'image',
+                'xpath': "//img[@id='product_photo']/@src",
+                'clean': [https_scheme],
+                'required': True,
+            },
+        },
+    },
+    'ritelite': {
+        'variant_id': 'sku',
+        'fields': {
+            'name': {'structured': 'name', 'xpath': f"//h3[{cls('mainhead', 'myriad-pro-normal')}]"},
+            'sku': {
+                'structured': 'sku',
+                'xpath': f"//h4[{cls('mainhead', 'myriad-pro-bold', 'uppercase', 'text-center')}]",
+                'clean': [remove(r'\bitem\b')],
+            },
+            'price': {
+                'structured': price_without_symbol,
+                'xpath': f"//span[{cls('myriad-pro-bold')}]",
+                'clean': [digits],
+            },
+            'vendor': {'value': ''},
+            'category': {'url': lambda link: link.split('Category/')[1].split('/')[0]},
+            'description': {
+                'structured': 'description',
+                'xpath': f"//div[{cls('col-xs-12', 'col-lg-12', 'col-md-12', 'nopadding', 'myriad', 'margin-top-10')}]",
+            },
+            'in_stock': HAS_PRICE,
+            'image_link': {
+                'structured': 'image',
+                'xpath': f"//img[{cls('zoom_02')}]/@src",
+                'clean': [prefix('https://ritelite.com')],
+            },
+        },
+    },
+    'shaijudaica': {
+        'variant_id': 'sku',
+        'fields': {
+            'name': {'structured': 'name', 'xpath': "//*[@id='item_current_title']"},
+            'sku': {'structured': 'sku', 'xpath': f"//*[{cls('code_item')}]"},
+            'price': {'xpath': f"//span[{cls('price_value')}]"},
+            'vendor': {'value': ''},
+            'category': {'xpath': "//*[@id='bread_crumbs']//li", 'pick': -2, 'min_matches': 2},
+            'description': {'xpath': "//*[@id='item_current_sub_title']"},
+            'in_stock': HAS_PRICE,
+            'image_link': {'structured': 'image', 'xpath': "//*[@id='item_show_carousel']//img/@src"},
+        },
+    },
+    'meiros': {
+        'variant_id': 'sku',
+        'fields': {
+            'name': {'structured': 'name', 'xpath': f"//h2[{cls('pd-top__main-right__title')}]"},
+            'sku': {'structured': 'sku', 'xpath': f"//span[{cls('pd-top__main-right__bpinner-label', 'sku')}]"},
+            'price': {
+                'structured': price_without_symbol,
+                'xpath': f"//span[{cls('pd-top__main-right__price')}]",
+                'clean': [digits],
+            },
+            'vendor': {'value': ''},
+            'category': {'value': ''},
+            'description': {
+                'structured': 'description',
+                'xpath': f"(//div[{cls('description-inner__text')}])[1]//p[{cls('description-inner__text-text')}]",
+            },
+            'in_stock': HAS_PRICE,
+            'image_link': {
+                'structured': 'image',
+                'xpath': [
+                    f"(//div[{cls('slick-track')}])[1]//a[{cls('pd-top__main-slider-img')}]/@href",
+                    f"(//div[{cls('slick-track')}])[1]//img/@src",
+                ],
+            },
+        },
+    },
+    'legacyjudaica': {
+        'variant_id': 'sku',
+        'fields': {
+            'name': {'structured': 'name', 'xpath': f"(//div[{cls('product-name')}])[1]//h1"},
+            'sku': {'structured': 'sku', 'xpath': f"(//div[{cls('sku')}])[1]//span[{cls('value')}]"},
+            'price': {
+                'structured': price_without_symbol,
+                'xpath': f"(//div[{cls('product-price')}])[1]//span[contains(@class, 'price-value')]",
+                'clean': [digits],
+            },
+            'vendor': {'structured': 'brand', 'xpath': f"(//div[{cls('manufacturers')}])[1]//span[{cls('value')}]//a"},
+            # No separate category on the site
+            'category': {'from_field': 'vendor'},
+            'description': {'structured': 'description', 'xpath': f"//div[{cls('short-description')}]"},
+            'in_stock': HAS_PRICE,
+            'image_link': {
+                'structured': 'image',
+                'xpath': f"(//a[{cls('picture-link')}])[1]/@data-full-image-url",
+                'required': True,
+            },
+        },
+    },
+    'simchonim': {
+        'variant_id': 'link',
+        'fields': {
+            'name': {'structured': 'name', 'xpath': f"//h1[{cls('product_title', 'entry-title')}]", 'default': None},
+            'sku': {'structured': 'sku', 'xpath': f"//span[{cls('sku')}]", 'default': None},
+            'price': {
+                'structured': price_with_symbol,
+                'xpath': f"//span[{cls('woocommerce-Price-amount')}]",
+                'default': None,
+            },
+            'vendor': {'value': ''},
+            'category': {'value': ''},
+            'description': {
+                'structured': 'description',
+                'xpath': f"//div[{cls('woocommerce-product-details__short-description')}]",
+                'separator': ' ',
+                'default': None,
+            },
+            'in_stock': HAS_PRICE,
+            'image_link': {
+                'structured': 'image',
+                'xpath': f"(//div[{cls('woocommerce-product-gallery__image')}])[1]//img/@src",
+                'default': None,
+            },
+        },
+    },
+    'mefoarjudaica': {
+        'variant_id': 'link',
+        'fields': {
+            'name': {'structured': 'name', 'xpath': f"//h1[{cls('productView-title')}]", 'default': None},
+            'sku': {
+                'structured': 'sku',
+                'xpath': f"//dd[{cls('productView-info-value')} and @data-product-sku]",
+                'default': None,
+            },
+            'price': {
+                'structured': price_with_symbol,
+                'xpath': f"//span[{cls('price', 'price--withoutTax')}]",
+                'default': None,
+            },
+            'vendor': {'value': ''},
+            'category': {'xpath': '//breadcrumbs//li', 'pick': -2, 'min_matches': 3},
+            'description': {
+                'structured': 'description',
+                'xpath': "//*[@id='tab-description-panel']",
+                'separator': ' ',
+                'default': None,
+            },
+            'in_stock': HAS_PRICE,
+            'image_link': BIGCOMMERCE_IMAGES,
+        },
+    },
+    'ozvehadar': {
+        'variant_id': 'link',
+        'fields': {
+            'name': {'structured': 'name', 'xpath': f"//h1[{cls('productView-title')}]", 'default': None},
+            'sku': {'structured': 'sku', 'xpath': '//dd[@data-product-sku]', 'default': None},
+            'price': {
+                'structured': price_with_symbol,
+                'xpath': f"//span[{cls('price', 'price--withoutTax')}]",
+                'default': None,
+            },
+            'vendor': {'value': ''},
+            'category': {'xpath': f"//ol[{cls('breadcrumbs')}]//li", 'pick': -2, 'min_matches': 3},
+            'description': {
+                'structured': 'description',
+                'xpath': "//*[@id='tab-description']",
+                'separator': ' ',
+                'default': None,
+            },
+            'in_stock': HAS_PRICE,
+            'image_link': BIGCOMMERCE_IMAGES,
+        },
+    },
+    'craftsandmore': {
+        'variant_id': 'link',
+        'fields': {
+            'name': {
+                'structured': 'name',
+                'xpath': f"//h1[{cls('product_title', 'entry-title', 'wd-entities-title')}]",
+                'default': None,
+            },
+            'sku': {
+                'structured': 'sku',
+                'xpath': f"//span[{cls('sku_wrapper')}]",
+                'clean': [remove(r'Item# ')],
+                'required': True,
+            },
+            'price': {'xpath': f"//p[{cls('price')}]", 'default': None},
+            'vendor': {'value': ''},
+            'category': {'xpath': f"//nav[{cls('woocommerce-breadcrumb')}]//a", 'pick': 'last', 'min_matches': 2},
+            'description': {
+                'xpath': f"//div[{any_cls('markdown', 'prose', 'dark:prose-invert', 'w-full', 'break-words', 'light')}]",
+                'separator': ' ',
+                'default': None,
+            },
+            'in_stock': HAS_PRICE,
+            'image_link': {
+                'structured': 'image',
+                'xpath': f"((//figure[{cls('woocommerce-product-gallery__image')}])[1]//a)[1]/@href",
+            },
+        },
+    },
+    'zionjudaica': {
+        'variant_id': 'link',
+        'fields': {
+            'name': {'structured': 'name', 'xpath': f"//h1[{cls('fusion-title-heading')}]", 'default': None},
+            'sku': {'structured': 'sku', 'xpath': f"//*[{cls('sku')}]", 'default': None},
+            'price': {
+                'structured': price_with_symbol,
+                'xpath': [f"//p[{cls('price')}]//ins//bdi", f"//p[{cls('price')}]//bdi"],
+                'required': True,
+            },
+            'vendor': {'value': ''},
+            'category': {
+                'xpath': f"//ol[{cls('awb-breadcrumb-list')}]//li//a//span",
+                'pick': 'last',
+                'required': True,
+            },
+            'description': {'xpath': "//*[@id='productContent']//p", 'default': None},
+            'in_stock': HAS_PRICE,
+            'image_link': {
+                'structured': 'image',
+                'xpath': f"//*[{cls('woocommerce-product-gallery__image')}]//a[@href]/@href",
+            },
+        },
+    },
+}
+
+
+def _compile(specs: Dict) -> Dict:
+    """{site: {field: [XPath, ...]}} for every field with an xpath"""
+    compiled = {}
+    for site, spec in specs.items():
+        compiled[site] = {}
+        for field, field_spec in spec['fields'].items():
+            expressions = field_spec.get('xpath')
+            if expressions is None:
+                continue
+            if isinstance(expressions, str):
+                expressions = [expressions]
+            compiled[site][field] = [etree.XPath(expression) for expression in expressions]
+    return compiled
+
+
+COMPILED_XPATHS = _compile(EXTRACTION_SPECS)
+
+
+class MissingField(ValueError):
+    """A required field was not found on the page"""
+
+
+def _node_value(node, separator: str) -> str:
+    """Text of an element, or the string an attribute/text() XPath returned"""
+    if isinstance(node, str):
+        return node.strip()
+    if isinstance(node, etree._Element):
+        parts = (text.strip() for text in node.itertext())
+        return separator.join(part for part in parts if part)
+    return str(node)
+
+
+def _pick(matches: list, field_spec: Dict):
+    """The match(es) a field wants, or None"""
+    if not isinstance(matches, list):
+        # Boolean/number/string XPath results
+        return matches
+    if len(matches) < field_spec.get('min_matches', 1):
+        return None
+    pick = field_spec.get('pick', 'first')
+    if pick == 'all':
+        return matches
+    index = {'first': 0, 'last': -1}.get(pick, pick)
+    try:
+        return matches[index]
+    except IndexError:
+        return None
+
+
+def _dom_value(xpaths: list, tree, field_spec: Dict):
+    if tree is None:
+        return None
+    separator = field_spec.get('separator', '')
+    for xpath in xpaths:
+        picked = _pick(xpath(tree), field_spec)
+        if picked is None:
+            continue
+        if isinstance(picked, list):
+            return [_node_value(node, separator) for node in picked]
+        return _node_value(picked, separator)
+    return None
+
+
+def _field_value(field: str, field_spec: Dict, xpaths: list, page: ProductPage, link: str, listing: Dict, values: Dict):
+    if 'structured' in field_spec:
+        source = field_spec['structured']
+        value = source(page.structured) if callable(source) else page.structured.get(source)
+        if value is not None:
+            return value
+
+    if 'value' in field_spec:
+        return field_spec['value']
+
+    value = None
+    if xpaths:
+        value = _dom_value(xpaths, page.tree, field_spec)
+    elif 'listing' in field_spec:
+        value = listing.get(field_spec['listing'])
+    elif 'url' in field_spec:
+        value = field_spec['url'](link)
+    elif 'from_field' in field_spec:
+        value = values.get(field_spec['from_field'])
+
+    if value is None:
+        if field_spec.get('required'):
+            raise MissingField(f"{field} not found")
+        return field_spec.get('default', '')
+
+    for clean in field_spec.get('clean', ()):
+        value = clean(value)
+    return value
+
+
+def extract_with_spec(site: str, page, product_url, website_name: str) -> Dict:
+    """
+    Product information for one page, following EXTRACTION_SPECS[site]
+
+    Args:
+        site: Key of EXTRACTION_SPECS
+        page: ProductPage (or HTML bytes/str) of the product page
+        product_url: Product link, or the listing dict holding it under 'link'
+        website_name: Name of the website
+
+    Returns:
+        dict: Product information dictionary
+
+    Raises:
+        MissingField: A required field is not on the page
+    """
+    spec = EXTRACTION_SPECS[site]
+    xpaths = COMPILED_XPATHS[site]
+    if not isinstance(page, ProductPage):
+        page = ProductPage(page if isinstance(page, (bytes, str)) else str(page))
+
+    if isinstance(product_url, dict):
+        link, listing = product_url['link'], product_url
+    else:
+        link, listing = product_url, {}
+
+    values = {}
+    for field, field_spec in spec['fields'].items():
+        values[field] = _field_value(field, field_spec, xpaths.get(field), page, link, listing, values)
+
+    sku = values.get('sku')
+    if spec['variant_id'] == 'sku' and sku:
+        product_variant_id = f"{website_name}_{sku}"
+    else:
+        product_variant_id = link_variant_id(website_name, link)
+
+    return {
+        'product_variant_id': product_variant_id,
+        'name': values.get('name'),
+        'sku': values.get('sku'),
+        'price': values.get('price'),
+        'vendor': values.get('vendor'),
+        'category': values.get('category'),
+        'description': values.get('description'),
+        'in_stock': values.get('in_stock'),
+        'link': link,
+        'image_link': values.get('image_link'),
+        'website': website_name,
+    }
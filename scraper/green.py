@@ -0,0 +1,111 @@
+"""
+Running the scraping tasks under Celery's gevent pool
+
+With `celery worker -P gevent` every task is a greenlet in one process and
+the standard library is monkey-patched, so requests/cloudscraper fetches,
+time.sleep, Redis calls and the heartbeat threads all yield to other tasks
+on their own. Three things still need help, and enter_task() / leave_task()
+(called from the task_prerun / task_postrun handlers in tasks.py) provide
+them while a gevent pool is running:
+
+- psycopg2 talks to PostgreSQL from C and would block every greenlet while
+  a query runs; a wait callback makes it poll the socket through gevent.
+- Each task greenlet has its own database connection, so at most
+  SCRAPER_GREEN_DB_SLOTS queries run at a time across the worker; the others
+  wait for a slot instead of piling onto the database.
+- The gevent pool only enforces hard time limits. The soft limit that makes
+  long crawls pause and auto-resume is raised here as SoftTimeLimitExceeded.
+
+Outside a gevent pool both functions do nothing.
+"""
+
+import logging
+import sys
+from typing import Dict
+
+from celery.exceptions import SoftTimeLimitExceeded
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+_configured = False
+_db_slots = None
+_soft_limits: Dict[str, object] = {}
+
+
+def gevent_active() -> bool:
+    """Whether this process runs with gevent's monkey-patched sockets"""
+    if 'gevent' not in sys.modules:
+        return False
+    from gevent import monkey
+    return monkey.is_module_patched('socket')
+
+
+def _gevent_wait_callback(conn, timeout=None):
+    # psycogreen's callback: wait on the connection's socket instead of
+    # blocking inside libpq
+    from gevent.socket import wait_read, wait_write
+    from psycopg2 import OperationalError, extensions
+
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            break
+        elif state == extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise OperationalError(f"Bad result from poll: {state!r}")
+
+
+def _configure():
+    global _configured, _db_slots
+    if _configured:
+        return
+    from gevent.lock import BoundedSemaphore
+
+    _db_slots = BoundedSemaphore(getattr(settings, 'SCRAPER_GREEN_DB_SLOTS', 10))
+    try:
+        from psycopg2 import extensions
+        extensions.set_wait_callback(_gevent_wait_callback)
+    except ImportError:
+        pass
+    _configured = True
+    logger.info(f"[Green] gevent pool detected: {_db_slots.counter} database query slots")
+
+
+def _bounded_query(execute, sql, params, many, context):
+    with _db_slots:
+        return execute(sql, params, many, context)
+
+
+def enter_task(task, task_id: str):
+    """Set up a task greenlet: query slots for its connection, and its soft time limit"""
+    if not gevent_active():
+        return
+    from gevent import Timeout
+
+    _configure()
+    if _bounded_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_bounded_query)
+
+    time_limits = getattr(task.request, 'timelimit', None) or (None, None)
+    soft_time_limit = time_limits[1] or task.soft_time_limit
+    if soft_time_limit:
+        # Raised in the current greenlet, which runs the task
+        timeout = Timeout(soft_time_limit, SoftTimeLimitExceeded(soft_time_limit))
+        timeout.start()
+        _soft_limits[task_id] = timeout
+
+
+def leave_task(task_id: str):
+    """Undo enter_task once the task has returned"""
+    if not _configured:
+        return
+    timeout = _soft_limits.pop(task_id, None)
+    if timeout is not None:
+        timeout.close()
+    if _bounded_query in connection.execute_wrappers:
+        connection.execute_wrappers.remove(_bounded_query)
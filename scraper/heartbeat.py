@@ -0,0 +1,169 @@
+"""
+Heartbeats for running scraping tasks
+
+While a scrape_* task runs, a background thread in the worker refreshes a
+Redis key with a short TTL.  The key disappears within HEARTBEAT_TTL seconds
+of the worker dying, so liveness checks read these keys with one MGET instead
+of asking the result backend about each task and waiting out the 15 minute
+PENDING heuristic.
+
+Heartbeats use the Redis client of the Celery result backend.  With any other
+backend they are unavailable and callers fall back to AsyncResult states.
+"""
+
+import logging
+import socket
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from celery import current_app
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_KEY_PREFIX = 'scraper:heartbeat:'
+HEARTBEAT_INTERVAL = 15  # seconds between refreshes
+HEARTBEAT_TTL = 60       # a task whose key expired is considered dead
+
+# Tasks that send heartbeats (all scrape_* tasks on the scraping queue)
+HEARTBEAT_TASK_PREFIX = 'scraper.tasks.scrape_'
+
+
+def _redis_client():
+    """Redis client of the result backend, or None if the backend is not Redis"""
+    from celery.backends.redis import RedisBackend
+
+    backend = current_app.backend
+    if isinstance(backend, RedisBackend):
+        return backend.client
+    return None
+
+
+def heartbeats_available() -> bool:
+    return _redis_client() is not None
+
+
+def heartbeat_key(task_id: str) -> str:
+    return f"{HEARTBEAT_KEY_PREFIX}{task_id}"
+
+
+def beat(task_id: str):
+    """Write (or refresh) the heartbeat key of a task"""
+    client = _redis_client()
+    if client is not None:
+        client.set(heartbeat_key(task_id), f"{socket.gethostname()}:{time.time():.0f}", ex=HEARTBEAT_TTL)
+
+
+def clear(task_id: str):
+    """Remove the heartbeat key once the task has finished"""
+    client = _redis_client()
+    if client is not None:
+        client.delete(heartbeat_key(task_id))
+
+
+class HeartbeatThread(threading.Thread):
+    """Refreshes a task's heartbeat key every HEARTBEAT_INTERVAL seconds until stopped"""
+
+    def __init__(self, task_id: str):
+        super().__init__(name=f'heartbeat-{task_id}', daemon=True)
+        self.task_id = task_id
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(HEARTBEAT_INTERVAL):
+            try:
+                beat(self.task_id)
+            except Exception as e:
+                logger.warning(f"[Heartbeat] Could not refresh heartbeat for task {self.task_id}: {e}")
+
+    def stop(self):
+        self._stopped.set()
+
+
+_threads: Dict[str, HeartbeatThread] = {}
+
+
+def start_heartbeat(task_id: str):
+    """Write the first heartbeat synchronously, then keep it fresh in the background"""
+    try:
+        if not heartbeats_available():
+            return
+        beat(task_id)
+    except Exception as e:
+        logger.warning(f"[Heartbeat] Could not start heartbeat for task {task_id}: {e}")
+        return
+
+    thread = HeartbeatThread(task_id)
+    _threads[task_id] = thread
+    thread.start()
+
+
+def stop_heartbeat(task_id: str):
+    thread = _threads.pop(task_id, None)
+    if thread is None:
+        return
+    thread.stop()
+    try:
+        clear(task_id)
+    except Exception as e:
+        logger.warning(f"[Heartbeat] Could not clear heartbeat for task {task_id}: {e}")
+
+
+def _state_liveness(state: str, heartbeats: bool) -> Optional[bool]:
+    """Liveness of a task without a heartbeat, from its result backend state"""
+    if state in ('SUCCESS', 'FAILURE', 'REVOKED'):
+        return False
+    if state == 'STARTED':
+        # Started tasks keep their heartbeat fresh; without one the worker is gone
+        return not heartbeats
+    return None  # PENDING
+
+
+def get_task_liveness(task_ids: Iterable[str]) -> Dict[str, Optional[bool]]:
+    """
+    Check several Celery tasks at once.
+
+    With a Redis result backend the heartbeat keys and the task result keys
+    of all tasks are read in a single MGET.  Tasks with a heartbeat are alive;
+    for the others the stored state decides: finished tasks are dead, and a
+    STARTED task without a heartbeat belongs to a worker that died.
+
+    Other backends fall back to one AsyncResult lookup per task.
+
+    Returns:
+        {task_id: True (running) / False (dead) / None (PENDING: queued or unknown)}
+    """
+    task_ids = list(dict.fromkeys(task_id for task_id in task_ids if task_id))
+    if not task_ids:
+        return {}
+
+    client = _redis_client()
+    if client is not None:
+        try:
+            backend = current_app.backend
+            keys = [heartbeat_key(task_id) for task_id in task_ids]
+            keys += [backend.get_key_for_task(task_id) for task_id in task_ids]
+            values = client.mget(keys)
+            heartbeats, metas = values[:len(task_ids)], values[len(task_ids):]
+
+            liveness = {}
+            for task_id, heartbeat, meta in zip(task_ids, heartbeats, metas):
+                if heartbeat is not None:
+                    liveness[task_id] = True
+                else:
+                    state = backend.decode_result(meta)['status'] if meta else 'PENDING'
+                    liveness[task_id] = _state_liveness(state, heartbeats=True)
+            return liveness
+        except Exception as e:
+            logger.warning(f"[Heartbeat] Could not read heartbeats, falling back to task states: {e}")
+
+    liveness = {}
+    for task_id in task_ids:
+        try:
+            state = current_app.AsyncResult(task_id).state
+        except Exception as e:
+            logger.warning(f"Error checking Celery task {task_id} status: {e}")
+            liveness[task_id] = False
+            continue
+        liveness[task_id] = _state_liveness(state, heartbeats=False)
+    return liveness
@@ -0,0 +1,117 @@
+"""
+Conditional requests for product pages
+
+Each product page that was scraped and saved successfully leaves a
+PageCacheEntry with its ETag, Last-Modified and a hash of the body.  The next
+fetch of the same URL sends If-None-Match / If-Modified-Since; when the server
+answers 304, or returns a body with the same hash, the page is unchanged and
+the scraper skips extraction and the product save.
+
+Validators are only stored after the product was saved, so a page whose
+extraction or save failed is fetched and processed again on the next run.
+Entries older than PAGE_CACHE_MAX_AGE are ignored and the page is processed
+in full, so nothing stays stale forever if a site serves wrong validators.
+Products marked out of stock by the removal sweep lose their entries too
+(forget_pages), so a product that comes back is saved again in full.
+"""
+
+import hashlib
+from datetime import timedelta
+from typing import Callable, Dict, Iterable, Optional
+
+import requests
+from django.utils import timezone
+
+from .models import PageCacheEntry
+
+PAGE_CACHE_MAX_AGE = timedelta(days=7)
+
+
+def url_hash(url: str) -> str:
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+class CachedPage:
+    """Result of fetch_page"""
+
+    def __init__(self, url: str, response, entry: Optional[PageCacheEntry]):
+        self.url = url
+        self.response = response
+        self.entry = entry
+        self.content_hash = content_hash(response.content) if response.status_code == 200 else ''
+
+    @property
+    def not_modified(self) -> bool:
+        return self.entry is not None and self.response.status_code == 304
+
+    @property
+    def unchanged(self) -> bool:
+        """True if the page is the same as when it was last saved"""
+        if self.entry is None:
+            return False
+        if self.response.status_code == 304:
+            return True
+        return bool(self.content_hash) and self.content_hash == self.entry.content_hash
+
+    def store(self):
+        """Remember this response's validators; call after the product was saved"""
+        if self.response.status_code != 200:
+            return
+        PageCacheEntry.objects.update_or_create(
+            url_hash=url_hash(self.url),
+            defaults={
+                'url': self.url,
+                'etag': self.response.headers.get('ETag', '')[:500],
+                'last_modified': self.response.headers.get('Last-Modified', '')[:100],
+                'content_hash': self.content_hash,
+                'fetched_at': timezone.now(),
+            }
+        )
+
+
+def forget_pages(urls: Iterable[str], batch_size: int = 500) -> int:
+    """
+    Drop the cache entries of some URLs, so their next fetch is processed in full
+
+    Returns:
+        int: Number of entries deleted
+    """
+    hashes = [url_hash(url) for url in urls if url]
+    deleted = 0
+    for start in range(0, len(hashes), batch_size):
+        deleted += PageCacheEntry.objects.filter(url_hash__in=hashes[start:start + batch_size]).delete()[0]
+    return deleted
+
+
+def fetch_page(url: str, get: Optional[Callable] = None, headers: Optional[Dict] = None,
+               timeout: Optional[float] = 30) -> CachedPage:
+    """
+    GET a product page, conditionally if it was saved before.
+
+    Args:
+        url: Page URL
+        get: Function doing the request (default requests.get, or a cloudscraper session's get)
+        headers: Request headers; the conditional headers are added to a copy
+        timeout: Request timeout in seconds
+
+    Returns:
+        CachedPage; check .unchanged before processing .response
+    """
+    entry = PageCacheEntry.objects.filter(
+        url_hash=url_hash(url),
+        fetched_at__gte=timezone.now() - PAGE_CACHE_MAX_AGE,
+    ).first()
+
+    request_headers = dict(headers or {})
+    if entry is not None:
+        if entry.etag:
+            request_headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            request_headers['If-Modified-Since'] = entry.last_modified
+
+    response = (get or requests.get)(url, headers=request_headers, timeout=timeout)
+    return CachedPage(url, response, entry)
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0018_alter_googlesheetlinks_sheet_file_id_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GoogleSheetRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sheet_file_id', models.CharField(max_length=255)),
+                ('product_id', models.BigIntegerField()),
+                ('row_number', models.IntegerField()),
+                ('row_hash', models.CharField(max_length=32)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['sheet_file_id', 'row_number'], name='scraper_goo_sheet_f_0ffe51_idx')],
+                'unique_together': {('sheet_file_id', 'product_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductExportLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filename', models.CharField(max_length=500)),
+                ('celery_task_id', models.CharField(blank=True, max_length=255, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('total_products', models.IntegerField(default=0)),
+                ('products_exported', models.IntegerField(default=0)),
+                ('progress_percentage', models.IntegerField(default=0)),
+                ('file_path', models.CharField(blank=True, default='', max_length=1000)),
+                ('error_message', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Product Export Log',
+                'verbose_name_plural': 'Product Export Logs',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
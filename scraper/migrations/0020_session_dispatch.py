@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0019_google_sheet_row_map'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingsession',
+            name='dispatch_position',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='scrapingsession',
+            name='dispatch_queue',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='scrapingsession',
+            name='expected_duration',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='scrapingsession',
+            name='run_started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
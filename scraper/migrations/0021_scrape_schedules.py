@@ -0,0 +1,40 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_celery_beat', '0019_alter_periodictasks_options'),
+        ('scraper', '0020_session_dispatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingsession',
+            name='scrape_mode',
+            field=models.CharField(choices=[('full', 'Full'), ('incremental', 'Incremental')], default='full', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='ScrapeSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scrape_mode', models.CharField(choices=[('full', 'Full'), ('incremental', 'Incremental')], default='incremental', max_length=20)),
+                ('minute', models.CharField(default='0', max_length=240)),
+                ('hour', models.CharField(default='*', max_length=96)),
+                ('day_of_week', models.CharField(default='*', max_length=64)),
+                ('window_start', models.TimeField(blank=True, null=True)),
+                ('window_end', models.TimeField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+                ('last_result', models.CharField(blank=True, default='', max_length=500)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('last_session', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='scraper.scrapingsession')),
+                ('periodic_task', models.OneToOneField(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to='django_celery_beat.periodictask')),
+                ('website', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scrape_schedules', to='scraper.website')),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0021_scrape_schedules'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='scrapeschedule',
+            name='scrape_mode',
+            field=models.CharField(choices=[('full', 'Full'), ('incremental', 'Incremental'), ('stock_price', 'Stock & price only')], default='incremental', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='scrapingsession',
+            name='scrape_mode',
+            field=models.CharField(choices=[('full', 'Full'), ('incremental', 'Incremental'), ('stock_price', 'Stock & price only')], default='full', max_length=20),
+        ),
+    ]
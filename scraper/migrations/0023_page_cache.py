@@ -0,0 +1,26 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0022_stock_price_mode'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PageCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url_hash', models.CharField(max_length=64, unique=True)),
+                ('url', models.TextField()),
+                ('etag', models.CharField(blank=True, default='', max_length=500)),
+                ('last_modified', models.CharField(blank=True, default='', max_length=100)),
+                ('content_hash', models.CharField(blank=True, default='', max_length=64)),
+                ('fetched_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0023_page_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.IntegerField()),
+                ('url', models.TextField()),
+                ('source', models.JSONField()),
+                ('content_hash', models.CharField(db_index=True, max_length=64)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_pages', to='scraper.scrapingsession')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['session', 'position'], name='scraper_arc_session_6ae2ea_idx')],
+            },
+        ),
+    ]
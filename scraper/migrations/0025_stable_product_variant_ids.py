@@ -0,0 +1,90 @@
+# Replaces product_variant_ids built with Python's per-process hash() and
+# collapses the duplicates they created
+
+import hashlib
+import re
+
+from django.db import migrations
+
+# '<website>_<hash(link)>': a signed 64-bit integer (10+ digits in practice)
+LEGACY_SUFFIX_RE = re.compile(r'^-?\d{10,}$')
+
+SCRAPED_FIELDS = ('name', 'sku', 'price', 'vendor', 'category', 'description', 'in_stock', 'image_link', 'updated_at')
+
+
+def link_variant_id(website_name, link):
+    # Frozen copy of scraper.models.link_variant_id
+    digest = hashlib.sha256((link or '').strip().encode('utf-8')).hexdigest()[:16]
+    return f"{website_name}_{digest}"
+
+
+def is_legacy_variant_id(product):
+    # Frozen copy of scraper.models.is_legacy_variant_id
+    prefix = f"{product.website}_"
+    if not product.link or not product.product_variant_id or not product.product_variant_id.startswith(prefix):
+        return False
+    suffix = product.product_variant_id[len(prefix):]
+    # A numeric SKU-based ID ('<website>_<sku>') is stable and stays
+    return bool(LEGACY_SUFFIX_RE.match(suffix)) and suffix != (product.sku or '').strip()
+
+
+def keeper_rank(product):
+    """Sort key: prefer the row that is on the website, then one with a sync status, then the oldest"""
+    sync_status = getattr(product, 'sync_status', None)
+    return (
+        not (sync_status is not None and sync_status.on_website),
+        sync_status is None,
+        product.created_at,
+        product.id,
+    )
+
+
+def collapse_legacy_variant_ids(apps, schema_editor):
+    Product = apps.get_model('scraper', 'Product')
+
+    groups = {}
+    candidates = Product.objects.filter(product_variant_id__regex=r'_-?[0-9]{10,}$').exclude(link__isnull=True)
+    for product in candidates.iterator():
+        if is_legacy_variant_id(product):
+            groups.setdefault(link_variant_id(product.website, product.link), []).append(product.id)
+
+    merged = deleted = 0
+    for new_id, ids in groups.items():
+        # Include a row that already has the stable ID
+        products = list(
+            Product.objects.filter(id__in=ids).select_related('sync_status')
+            | Product.objects.filter(product_variant_id=new_id).select_related('sync_status')
+        )
+        products.sort(key=keeper_rank)
+        keeper, duplicates = products[0], products[1:]
+
+        # Latest scraped values win, the keeper keeps its identity and sync status
+        latest = max(products, key=lambda product: product.updated_at)
+        for field in SCRAPED_FIELDS:
+            setattr(keeper, field, getattr(latest, field))
+
+        if duplicates:
+            Product.objects.filter(id__in=[product.id for product in duplicates]).delete()
+            deleted += len(duplicates)
+
+        keeper.product_variant_id = new_id
+        # update() keeps updated_at as copied (save() would bump auto_now)
+        Product.objects.filter(id=keeper.id).update(
+            product_variant_id=new_id,
+            **{field: getattr(keeper, field) for field in SCRAPED_FIELDS},
+        )
+        merged += 1
+
+    if merged:
+        print(f"\n  Stable product_variant_id: {merged} products re-keyed, {deleted} duplicates removed")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0024_page_archive'),
+    ]
+
+    operations = [
+        migrations.RunPython(collapse_legacy_variant_ids, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-19 15:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0025_stable_product_variant_ids'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='last_seen_session',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='seen_products', to='scraper.scrapingsession'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.1 on 2026-10-19 16:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0026_product_last_seen_session'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CrawlFrontierURL',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('frontier', models.CharField(max_length=100)),
+                ('url_hash', models.CharField(max_length=64)),
+                ('url', models.TextField()),
+                ('kind', models.CharField(choices=[('listing', 'Listing page'), ('product', 'Product page')], max_length=10)),
+                ('depth', models.IntegerField(default=0)),
+                ('priority', models.IntegerField(default=0)),
+                ('state', models.CharField(choices=[('pending', 'Pending'), ('in_progress', 'In progress'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.IntegerField(default=0)),
+                ('data', models.JSONField(blank=True, null=True)),
+                ('discovered_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['frontier', 'kind', 'state'], name='scraper_cra_frontie_db730a_idx')],
+                'unique_together': {('frontier', 'url_hash')},
+            },
+        ),
+    ]
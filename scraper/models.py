@@ -1,4 +1,9 @@
+import hashlib
+import re
+
 from django.db import models
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.contrib.auth.models import User
 
 # Create your models here.
@@ -43,6 +48,55 @@ class GoogleSheetLinks(models.Model):
     def __str__(self):
         return f"Export {self.id} - {self.status} - {self.created_at}"
 
+class GoogleSheetRow(models.Model):
+    """Row map for incremental Google Sheet sync: which sheet row holds which product"""
+    sheet_file_id = models.CharField(max_length=255)
+    # Plain ID, not a ForeignKey: rows of deleted products must stay mapped
+    # until the next sync blanks them in the sheet
+    product_id = models.BigIntegerField()
+    row_number = models.IntegerField()
+    row_hash = models.CharField(max_length=32)   # md5 of the values last written
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = [['sheet_file_id', 'product_id']]
+        indexes = [
+            models.Index(fields=['sheet_file_id', 'row_number']),
+        ]
+
+    def __str__(self):
+        return f"{self.sheet_file_id} row {self.row_number} - product {self.product_id}"
+
+def link_variant_id(website_name, link):
+    """
+    product_variant_id for a product identified by its link (no usable SKU)
+
+    A digest of the link, so the same page gets the same ID in every worker
+    process. Python's hash() is salted per process and must not be used.
+    """
+    digest = hashlib.sha256((link or '').strip().encode('utf-8')).hexdigest()[:16]
+    return f"{website_name}_{digest}"
+
+
+# '<website>_<hash(link)>': a signed 64-bit integer (10+ digits in practice)
+LEGACY_SUFFIX_RE = re.compile(r'^-?\d{10,}$')
+
+
+def is_legacy_variant_id(product):
+    """
+    Whether a product's ID was built with hash(link) rather than its SKU or
+    link_variant_id() (the rule migration 0025 collapsed such IDs by)
+    """
+    prefix = f"{product.website}_"
+    # Shopify scrapers assign the variant's numeric ID before it is saved
+    variant_id = str(product.product_variant_id or '')
+    if not product.link or not variant_id.startswith(prefix):
+        return False
+    suffix = variant_id[len(prefix):]
+    # A numeric SKU-based ID ('<website>_<sku>') is stable and stays
+    return bool(LEGACY_SUFFIX_RE.match(suffix)) and suffix != (product.sku or '').strip()
+
+
 class Product(models.Model):
     product_variant_id = models.CharField(max_length=500,null=True,blank=True,unique=True)     # website
     website = models.CharField(max_length=300,null=True,blank=True)     # website
@@ -57,6 +111,9 @@ class Product(models.Model):
     image_link = models.TextField(null=True, blank=True)                # image_link
     created_at = models.DateTimeField(auto_now_add=True)                # created_at
     updated_at = models.DateTimeField(auto_now=True)                    # updated_at
+    # Last scrape that found the product on the vendor site (see sweep_unseen_products)
+    last_seen_session = models.ForeignKey('ScrapingSession', on_delete=models.SET_NULL, null=True, blank=True,
+                                          related_name='seen_products')
     # class Meta:
         # Ensure unique products per website based on SKU or link
         # unique_together = [['website', 'sku'], ['website', 'link']]
@@ -64,6 +121,16 @@ class Product(models.Model):
     def __str__(self):
         return f"{self.website} - {self.name}"
 
+    def save(self, *args, **kwargs):
+        # Guard against IDs built with hash(link): they change with every
+        # worker restart and turn the next scrape into a duplicate
+        if is_legacy_variant_id(self):
+            raise ValueError(
+                f"Non-deterministic product_variant_id {self.product_variant_id!r}; "
+                f"use link_variant_id() for products without a SKU"
+            )
+        super().save(*args, **kwargs)
+
 class ScrapingSession(models.Model):
     """Model to track scraping sessions"""
     STATUS_CHOICES = [
@@ -89,8 +156,21 @@ class ScrapingSession(models.Model):
     
     # Timestamps
     started_at = models.DateTimeField(auto_now_add=True)
+    run_started_at = models.DateTimeField(null=True, blank=True)  # when a worker picked the task up
     completed_at = models.DateTimeField(null=True, blank=True)
     
+    SCRAPE_MODE_CHOICES = [
+        ('full', 'Full'),
+        ('incremental', 'Incremental'),
+        ('stock_price', 'Stock & price only'),
+    ]
+    scrape_mode = models.CharField(max_length=20, choices=SCRAPE_MODE_CHOICES, default='full')
+    
+    # Dispatch decision (see scheduler.py)
+    dispatch_queue = models.CharField(max_length=50, blank=True, default='')
+    dispatch_position = models.IntegerField(null=True, blank=True)
+    expected_duration = models.FloatField(null=True, blank=True)  # seconds
+    
     # Resume functionality
     last_processed_index = models.IntegerField(default=0)
     last_processed_url = models.TextField(null=True, blank=True)
@@ -138,6 +218,149 @@ class ScrapingState(models.Model):
     def __str__(self):
         return f"{self.website.name} - {'Running' if self.is_running else 'Idle'}"
 
+class PageCacheEntry(models.Model):
+    """Validators of the last product page fetch that was saved, for conditional requests"""
+    url_hash = models.CharField(max_length=64, unique=True)   # sha256 of the URL
+    url = models.TextField()
+    etag = models.CharField(max_length=500, blank=True, default='')
+    last_modified = models.CharField(max_length=100, blank=True, default='')
+    content_hash = models.CharField(max_length=64, blank=True, default='')   # sha256 of the body
+    fetched_at = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.url
+
+class ArchivedPage(models.Model):
+    """Product page fetched in a session, stored in the page archive (see page_archive.py)"""
+    session = models.ForeignKey(ScrapingSession, on_delete=models.CASCADE, related_name='archived_pages')
+    position = models.IntegerField()   # index in the session's URL list
+    url = models.TextField()
+    source = models.JSONField()        # URL list item passed to the extractor
+    content_hash = models.CharField(max_length=64, db_index=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['session', 'position']),
+        ]
+
+    def __str__(self):
+        return f"Session {self.session_id} #{self.position} - {self.url}"
+
+class CrawlFrontierURL(models.Model):
+    """Page found by a category-crawling URL loader (see crawl_frontier.py)"""
+    KIND_CHOICES = [
+        ('listing', 'Listing page'),
+        ('product', 'Product page'),
+    ]
+    STATE_CHOICES = [
+        ('pending', 'Pending'),
+        ('in_progress', 'In progress'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    frontier = models.CharField(max_length=100)   # loader name, e.g. 'mefoarjudaica'
+    url_hash = models.CharField(max_length=64)    # sha256 of the URL (of the listing data without one)
+    url = models.TextField()
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    depth = models.IntegerField(default=0)        # links away from the loader's seed page
+    priority = models.IntegerField(default=0)     # higher is visited first
+    state = models.CharField(max_length=20, choices=STATE_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    data = models.JSONField(null=True, blank=True)   # listing data of a product, if the loader returns dicts
+    discovered_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['frontier', 'url_hash']
+        indexes = [
+            models.Index(fields=['frontier', 'kind', 'state']),
+        ]
+
+    def __str__(self):
+        return f"{self.frontier} {self.kind} ({self.state}) - {self.url}"
+
+class ScrapeSchedule(models.Model):
+    """Recurring scrape of a website, registered as a Celery Beat periodic task"""
+    website = models.ForeignKey(Website, on_delete=models.CASCADE, related_name='scrape_schedules')
+    scrape_mode = models.CharField(max_length=20, choices=ScrapingSession.SCRAPE_MODE_CHOICES, default='incremental')
+    
+    # Crontab fields (UTC), same syntax as django_celery_beat's CrontabSchedule
+    minute = models.CharField(max_length=240, default='0')
+    hour = models.CharField(max_length=96, default='*')
+    day_of_week = models.CharField(max_length=64, default='*')
+    
+    # Optional off-peak window (UTC); runs falling outside it are skipped.
+    # A window may wrap midnight (e.g. 22:00 - 06:00).
+    window_start = models.TimeField(null=True, blank=True)
+    window_end = models.TimeField(null=True, blank=True)
+    
+    is_active = models.BooleanField(default=True)
+    periodic_task = models.OneToOneField('django_celery_beat.PeriodicTask', on_delete=models.SET_NULL,
+                                         null=True, blank=True, editable=False)
+    
+    # Last trigger
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    last_result = models.CharField(max_length=500, blank=True, default='')
+    last_session = models.ForeignKey(ScrapingSession, on_delete=models.SET_NULL, null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.website.name} - {self.scrape_mode} - {self.minute} {self.hour} * * {self.day_of_week}"
+    
+    def in_window(self, moment):
+        """Check if a UTC datetime falls inside the off-peak window (always true without one)"""
+        if not self.window_start or not self.window_end:
+            return True
+        current = moment.time()
+        if self.window_start <= self.window_end:
+            return self.window_start <= current < self.window_end
+        return current >= self.window_start or current < self.window_end
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.sync_periodic_task()
+    
+    def sync_periodic_task(self):
+        """Create or update the Celery Beat entry that triggers this schedule"""
+        import json
+        from django_celery_beat.models import CrontabSchedule, PeriodicTask
+        
+        crontab, _ = CrontabSchedule.objects.get_or_create(
+            minute=self.minute,
+            hour=self.hour,
+            day_of_week=self.day_of_week,
+            day_of_month='*',
+            month_of_year='*',
+            timezone='UTC',
+        )
+        periodic_task, _ = PeriodicTask.objects.update_or_create(
+            name=f'scrape-schedule-{self.id}',
+            defaults={
+                'task': 'scraper.tasks.run_scheduled_scrape',
+                'crontab': crontab,
+                'args': json.dumps([self.id]),
+                'queue': 'default',
+                'enabled': self.is_active and self.website.is_active,
+                'description': f'{self.get_scrape_mode_display()} scrape of {self.website.name}',
+            },
+        )
+        if self.periodic_task_id != periodic_task.id:
+            ScrapeSchedule.objects.filter(id=self.id).update(periodic_task=periodic_task)
+            self.periodic_task = periodic_task
+
+
+@receiver(post_delete, sender=ScrapeSchedule)
+def delete_schedule_periodic_task(sender, instance, **kwargs):
+    """Remove the Beat entry with its schedule (also on cascades from Website)"""
+    if instance.periodic_task_id:
+        from django_celery_beat.models import PeriodicTask
+        PeriodicTask.objects.filter(id=instance.periodic_task_id).delete()
+
 class GoogleOAuth2Token(models.Model):
     """Model to store Google OAuth2 tokens for accessing Google Drive/Sheets"""
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
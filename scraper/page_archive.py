@@ -0,0 +1,123 @@
+"""
+Compressed archive of fetched product pages
+
+Custom scrapers store the body of every product page they fetch, so a
+session can be re-extracted from disk after an extract_<site>_product_info
+fix without crawling the site again.
+
+Bodies are gzip-compressed and content-addressed by their sha256 (the same
+hash the page cache uses), so a page that did not change between runs is
+stored once:
+
+  PAGE_ARCHIVE_ROOT/objects/<first 2 hex chars>/<sha256>.html.gz
+
+ArchivedPage rows index the blobs by session, position and URL.  Pages
+skipped as unchanged are indexed as well, pointing at the blob of the run
+that last fetched them, so every session has a complete set of pages.
+"""
+
+import gzip
+import logging
+import os
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import ArchivedPage
+
+logger = logging.getLogger(__name__)
+
+PAGE_ARCHIVE_ROOT = getattr(settings, 'PAGE_ARCHIVE_ROOT', os.path.join(settings.BASE_DIR, 'page_archive'))
+
+# Index rows of older sessions are pruned, then blobs no longer referenced
+PAGE_ARCHIVE_KEEP_DAYS = 30
+
+
+def blob_path(content_hash: str) -> str:
+    return os.path.join(PAGE_ARCHIVE_ROOT, 'objects', content_hash[:2], f'{content_hash}.html.gz')
+
+
+def write_blob(content_hash: str, content: bytes):
+    """Store a page body unless a blob with the same hash already exists"""
+    path = blob_path(content_hash)
+    if os.path.exists(path):
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with gzip.open(tmp_path, 'wb', compresslevel=6) as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def read_blob(content_hash: str) -> bytes:
+    with gzip.open(blob_path(content_hash), 'rb') as f:
+        return f.read()
+
+
+def archive_page(session, position: int, source, page) -> Optional[ArchivedPage]:
+    """
+    Archive a fetched product page for a session.
+
+    Args:
+        session: ScrapingSession the page was fetched in
+        position: Index of the page in the session's URL list
+        source: The URL list item passed to the extractor (URL string or dict)
+        page: CachedPage returned by http_cache.fetch_page
+
+    Returns:
+        The ArchivedPage, or None if there was nothing to archive.
+        Archive errors are logged and never interrupt the scrape.
+    """
+    try:
+        if page.unchanged:
+            content_hash = page.entry.content_hash
+            if not content_hash or not os.path.exists(blob_path(content_hash)):
+                return None
+        elif page.response.status_code == 200:
+            content_hash = page.content_hash
+            write_blob(content_hash, page.response.content)
+        else:
+            return None
+
+        return ArchivedPage.objects.create(
+            session=session,
+            position=position,
+            url=page.url,
+            source=source,
+            content_hash=content_hash,
+        )
+    except Exception as e:
+        logger.warning(f"[PageArchive] Could not archive {page.url} for session {session.id}: {e}")
+        return None
+
+
+def prune_page_archive(keep_days: int = PAGE_ARCHIVE_KEEP_DAYS):
+    """
+    Drop index rows of sessions older than keep_days and delete the blobs no
+    remaining row refers to.
+
+    Returns:
+        (index rows deleted, blobs deleted)
+    """
+    cutoff = timezone.now() - timedelta(days=keep_days)
+    rows_deleted, _ = ArchivedPage.objects.filter(session__started_at__lt=cutoff).delete()
+
+    referenced = set(ArchivedPage.objects.values_list('content_hash', flat=True).distinct())
+    blobs_deleted = 0
+    objects_dir = os.path.join(PAGE_ARCHIVE_ROOT, 'objects')
+    if os.path.isdir(objects_dir):
+        for prefix in os.listdir(objects_dir):
+            prefix_dir = os.path.join(objects_dir, prefix)
+            for filename in os.listdir(prefix_dir):
+                content_hash = filename.split('.', 1)[0]
+                if content_hash in referenced:
+                    continue
+                # Leave blobs written in the last hour: their index row may not exist yet
+                path = os.path.join(prefix_dir, filename)
+                if os.path.getmtime(path) > (timezone.now() - timedelta(hours=1)).timestamp():
+                    continue
+                os.remove(path)
+                blobs_deleted += 1
+    return rows_deleted, blobs_deleted
@@ -0,0 +1,81 @@
+"""
+Cluster-wide per-domain request spacing
+
+Chunked crawls (see crawl_chunk in tasks.py) fetch one vendor from several
+workers at once. Before each request a worker reserves the next free slot
+of the vendor's domain: slots are at least `interval` seconds apart no
+matter how many workers take part, so a crawl spread over idle workers
+stays as polite as a single sequential one.
+
+Reservations live in Redis (the Celery result backend, as for heartbeats)
+and are taken with one atomic script call. With any other backend they fall
+back to a lock within the current process.
+"""
+
+import logging
+import math
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from .heartbeat import _redis_client
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_KEY_PREFIX = 'scraper:ratelimit:'
+
+# KEYS[1]: domain key, ARGV[1]: now, ARGV[2]: interval (seconds)
+# Returns the start of the reserved slot; the key expires once it is in the past
+RESERVE_SLOT_SCRIPT = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local next_free = tonumber(redis.call('GET', KEYS[1]) or '0')
+local slot = math.max(now, next_free)
+redis.call('SET', KEYS[1], tostring(slot + interval), 'EX', math.ceil(slot + interval - now) + 60)
+return tostring(slot)
+"""
+
+_local_lock = threading.Lock()
+_local_next_free: Dict[str, float] = {}
+
+
+def rate_limit_key(domain: str) -> str:
+    return f"{RATE_LIMIT_KEY_PREFIX}{domain.lower()}"
+
+
+def _reserve_local(domain: str, interval: float, now: float) -> float:
+    with _local_lock:
+        slot = max(now, _local_next_free.get(domain, 0.0))
+        _local_next_free[domain] = slot + interval
+    return slot
+
+
+def reserve_slot(domain: str, interval: float) -> float:
+    """
+    Reserve the next request slot of a domain
+
+    Returns:
+        float: Seconds to wait before sending the request
+    """
+    now = time.time()
+    client = _redis_client()
+    if client is not None:
+        try:
+            slot = float(client.eval(RESERVE_SLOT_SCRIPT, 1, rate_limit_key(domain), f"{now:.3f}", interval))
+            return max(0.0, slot - now)
+        except Exception as e:
+            logger.warning(f"[RateLimit] Could not reserve a slot for {domain}, spacing within this process: {e}")
+    return max(0.0, _reserve_local(domain, interval, now) - now)
+
+
+def wait_for_slot(domain: str, interval: float, sleep: Optional[Callable[[float], None]] = None) -> float:
+    """
+    Block until this worker may send its next request to a domain
+
+    Returns:
+        float: Seconds waited
+    """
+    delay = reserve_slot(domain, interval)
+    if delay > 0:
+        (sleep or time.sleep)(math.ceil(delay * 10) / 10)
+    return delay
@@ -0,0 +1,142 @@
+"""
+Duration-aware dispatch of scraping tasks
+
+Scrapes are split into two Celery lanes by their expected run time:
+
+  scraping       – fast lane (Shopify stores, minutes)
+  scraping_slow  – slow lane (long HTML crawls, hours)
+
+The slow-lane worker also consumes the fast lane when idle, but the fast-lane
+worker never picks up a long crawl, so short scrapes always keep one slot.
+Within a batch, websites are dispatched shortest-job-first.
+
+Expected durations come from the last completed runs of each website in the
+same scrape mode (a weekly full crawl is not estimated from hourly stock &
+price runs), with defaults by mode and scraper kind until there is history.
+"""
+
+from datetime import timedelta
+from statistics import median
+from typing import Dict, Iterable, List, Tuple
+
+from django.utils import timezone
+
+from .models import ScrapingSession
+
+FAST_LANE_QUEUE = 'scraping'
+SLOW_LANE_QUEUE = 'scraping_slow'
+
+# Scrapes expected to run longer than this go to the slow lane
+SLOW_LANE_THRESHOLD = 30 * 60  # seconds
+
+# Completed runs (per website, within HISTORY_DAYS) used for the estimate
+HISTORY_RUNS = 5
+HISTORY_DAYS = 90
+
+# Estimates for websites without completed runs
+DEFAULT_CUSTOM_DURATION = 3 * 60 * 60   # custom HTML crawlers
+DEFAULT_SHOPIFY_DURATION = 15 * 60      # products.json scrapers
+# Shopify incremental and stock & price runs save few products; most custom
+# HTML scrapers still crawl every page in those modes
+DEFAULT_DURATIONS = {
+    # mode: (custom HTML, Shopify)
+    'full': (DEFAULT_CUSTOM_DURATION, DEFAULT_SHOPIFY_DURATION),
+    'incremental': (DEFAULT_CUSTOM_DURATION, 5 * 60),
+    'stock_price': (DEFAULT_CUSTOM_DURATION, 5 * 60),
+}
+
+# Custom HTML scrapers (the rest use the Shopify products.json API)
+CUSTOM_SCRAPER_FUNCTIONS = [
+    'meiros', 'ritelite', 'shaijudaica', 'jewisheducationaltoys',
+    'legacyjudaica', 'simchonim', 'kaftorjudaica', 'mefoarjudaica',
+    'ozvehadar', 'craftsandmore', 'zionjudaica', 'toys4u', 'feldheim'
+]
+
+
+def is_custom_scraper(website) -> bool:
+    scraper_function = (website.scraper_function or '').lower()
+    return any(scraper_type in scraper_function for scraper_type in CUSTOM_SCRAPER_FUNCTIONS)
+
+
+def expected_durations(websites: Iterable, mode: str = 'full') -> Dict[int, Tuple[float, str]]:
+    """
+    Estimate how long a scrape of each website takes.
+
+    Uses the median of the last HISTORY_RUNS completed sessions of the same
+    scrape mode, measured from when the task started running (or from session
+    creation for runs recorded before run_started_at existed).
+
+    Args:
+        mode: Scrape mode of the run being planned ('full', 'incremental', 'stock_price')
+
+    Returns:
+        {website_id: (seconds, 'history' or 'default')}
+    """
+    websites = list(websites)
+    runs: Dict[int, List[float]] = {}
+    history = ScrapingSession.objects.filter(
+        website__in=websites,
+        status='completed',
+        scrape_mode=mode,
+        completed_at__isnull=False,
+        completed_at__gte=timezone.now() - timedelta(days=HISTORY_DAYS),
+    ).exclude(
+        resume_data__has_key='reextracted_from_session'   # archive re-extractions, no crawl
+    ).order_by('website_id', '-completed_at').values_list(
+        'website_id', 'started_at', 'run_started_at', 'completed_at'
+    )
+    for website_id, started_at, run_started_at, completed_at in history:
+        website_runs = runs.setdefault(website_id, [])
+        if len(website_runs) < HISTORY_RUNS:
+            website_runs.append((completed_at - (run_started_at or started_at)).total_seconds())
+
+    custom_default, shopify_default = DEFAULT_DURATIONS.get(mode, DEFAULT_DURATIONS['full'])
+    estimates = {}
+    for website in websites:
+        if runs.get(website.id):
+            estimates[website.id] = (median(runs[website.id]), 'history')
+        elif is_custom_scraper(website):
+            estimates[website.id] = (custom_default, 'default')
+        else:
+            estimates[website.id] = (shopify_default, 'default')
+    return estimates
+
+
+def plan_dispatch(websites: Iterable, mode: str = 'full') -> List[Dict]:
+    """
+    Order websites shortest-job-first and assign each to a lane.
+
+    Args:
+        mode: Scrape mode of the runs being dispatched
+
+    Returns:
+        List of dispatch decisions in dispatch order:
+        {'website', 'expected_duration', 'estimate_source', 'queue', 'position'}
+        where position is the 1-based place in its lane for this batch
+    """
+    websites = list(websites)
+    estimates = expected_durations(websites, mode)
+
+    decisions = []
+    lane_positions = {FAST_LANE_QUEUE: 0, SLOW_LANE_QUEUE: 0}
+    for website in sorted(websites, key=lambda w: (estimates[w.id][0], w.name)):
+        seconds, source = estimates[website.id]
+        queue = SLOW_LANE_QUEUE if seconds > SLOW_LANE_THRESHOLD else FAST_LANE_QUEUE
+        lane_positions[queue] += 1
+        decisions.append({
+            'website': website,
+            'expected_duration': seconds,
+            'estimate_source': source,
+            'queue': queue,
+            'position': lane_positions[queue],
+        })
+    return decisions
+
+
+def describe_decision(decision: Dict) -> str:
+    """One-line summary of a dispatch decision for logs and messages"""
+    lane = 'slow' if decision['queue'] == SLOW_LANE_QUEUE else 'fast'
+    return (
+        f"{lane} lane #{decision['position']}, expected ~{decision['expected_duration'] / 60:.0f} min "
+        f"({'from recent runs' if decision['estimate_source'] == 'history' else 'default estimate'})"
+    )
@@ -1,13 +1,12 @@
 import requests
-import time
 import xml.etree.ElementTree as ET
 from bs4 import BeautifulSoup
-import random
 import os
 from urllib.parse import urljoin, urlparse
-from time import sleep
 import cloudscraper
 
+from ..crawl_frontier import CrawlFrontier
+
 def get_zionjudaica_urls():
     sitemap_urls = [
         "https://zionjudaica.com/product-sitemap.xml",
@@ -40,79 +39,88 @@ def get_zionjudaica_urls():
     
     return all_urls
 
-def load_kaftorjudaica_product_urls():
-    BASE_URL = "https://www.kaftorjudaica.com/"
+KAFTORJUDAICA_BASE_URL = "https://www.kaftorjudaica.com/"
+
+
+def parse_kaftorjudaica_listing(url, depth, r):
+    """One search results page: product dicts and the next page"""
+    print(f"Scraping {url}")
+    r.raise_for_status()
+    soup = BeautifulSoup(r.text, "html.parser")
     products = []
-    url = "https://www.kaftorjudaica.com/search.asp?Keyword=a&image1.x=0&image1.y=0&pg=1"
-
-    while url:
-        print(f"Scraping {url}")
-        r = requests.get(url)
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
-
-        # Find the main product table (fixed width = 765)
-        main_table = soup.find("table", {"width": "765"})
-        if not main_table:
-            print("No product table found")
+
+    # Find the main product table (fixed width = 765)
+    main_table = soup.find("table", {"width": "765"})
+    if not main_table:
+        print("No product table found")
+        return {"products": products, "next_page": None}
+
+    # Collect product images, titles, SKUs, prices
+    # Each row group is: images row -> titles row -> SKU row -> prices row
+    rows = main_table.find_all("tr", recursive=False)
+    
+    # We skip the first tr (it has pagination at top), then process in sets of 4 rows
+    for i in range(1, len(rows), 4):
+        try:
+            img_row = rows[i]
+            title_row = rows[i+1]
+            sku_row = rows[i+2]
+            price_row = rows[i+3]
+        except IndexError:
             break
 
-        # Collect product images, titles, SKUs, prices
-        # Each row group is: images row -> titles row -> SKU row -> prices row
-        rows = main_table.find_all("tr", recursive=False)
-        
-        # We skip the first tr (it has pagination at top), then process in sets of 4 rows
-        for i in range(1, len(rows), 4):
-            try:
-                img_row = rows[i]
-                title_row = rows[i+1]
-                sku_row = rows[i+2]
-                price_row = rows[i+3]
-            except IndexError:
-                break
-
-            img_cells = img_row.find_all("td", width="182")
-            title_cells = title_row.find_all("td", width="182")
-            sku_cells = sku_row.find_all("td", width="182")
-            price_cells = price_row.find_all("td", width="182")
-
-            for j in range(len(img_cells)):
-                product = {}
-
-                # image + link
-                img_tag = img_cells[j].find("img")
-                a_tag = img_cells[j].find("a")
-                if img_tag:
-                    product["image"] = urljoin(BASE_URL, img_tag["src"])
-                if a_tag:
-                    product["link"] = urljoin(BASE_URL, a_tag["href"])
-
-                # title
-                if j < len(title_cells):
-                    product["title"] = title_cells[j].get_text(strip=True)
-
-                # sku
-                if j < len(sku_cells):
-                    product["sku"] = sku_cells[j].get_text(strip=True)
-
-                # price
-                if j < len(price_cells):
-                    price_text = price_cells[j].get_text(" ", strip=True)
-                    if "Our Price:" in price_text:
-                        product["price"] = price_text.split("Our Price:")[-1].strip()
-                    else:
-                        product["price"] = None
-
-                products.append(product)
-
-        # find next page link
-        next_link = main_table.find("a", string=">>")
-        if next_link:
-            url = urljoin(BASE_URL, next_link["href"])
-        else:
-            url = None
-
-    return products
+        img_cells = img_row.find_all("td", width="182")
+        title_cells = title_row.find_all("td", width="182")
+        sku_cells = sku_row.find_all("td", width="182")
+        price_cells = price_row.find_all("td", width="182")
+
+        for j in range(len(img_cells)):
+            product = {}
+
+            # image + link
+            img_tag = img_cells[j].find("img")
+            a_tag = img_cells[j].find("a")
+            if img_tag:
+                product["image"] = urljoin(KAFTORJUDAICA_BASE_URL, img_tag["src"])
+            if a_tag:
+                product["link"] = urljoin(KAFTORJUDAICA_BASE_URL, a_tag["href"])
+
+            # title
+            if j < len(title_cells):
+                product["title"] = title_cells[j].get_text(strip=True)
+
+            # sku
+            if j < len(sku_cells):
+                product["sku"] = sku_cells[j].get_text(strip=True)
+
+            # price
+            if j < len(price_cells):
+                price_text = price_cells[j].get_text(" ", strip=True)
+                if "Our Price:" in price_text:
+                    product["price"] = price_text.split("Our Price:")[-1].strip()
+                else:
+                    product["price"] = None
+
+            products.append(product)
+
+    # find next page link
+    next_link = main_table.find("a", string=">>")
+    next_page = urljoin(KAFTORJUDAICA_BASE_URL, next_link["href"]) if next_link else None
+    return {"products": products, "next_page": next_page}
+
+
+def iter_kaftorjudaica_product_urls():
+    """Listing dicts of kaftorjudaica, yielded page by page through the crawl frontier"""
+    frontier = CrawlFrontier(
+        'kaftorjudaica',
+        seeds=["https://www.kaftorjudaica.com/search.asp?Keyword=a&image1.x=0&image1.y=0&pg=1"],
+        parse=parse_kaftorjudaica_listing,
+    )
+    return frontier.iter_products()
+
+
+def load_kaftorjudaica_product_urls():
+    return list(iter_kaftorjudaica_product_urls())
 
 def load_craftsandmore_product_urls():
     """
@@ -124,15 +132,12 @@ def load_craftsandmore_product_urls():
     with open(file_path, "r", encoding="utf-8") as f:
         return [line.strip() for line in f if line.strip()]
 
-def load_mefoarjudaica_product_urls():
-    product_links = []
-
-    # Step 1: Fetch main sitemap
-    response = requests.get("https://mefoarjudaica.com/sitemap/categories")
+def _category_sitemap_links(response, heading_tag):
+    """Top-level category links under the "Categories" heading of a BigCommerce sitemap"""
     soup = BeautifulSoup(response.content, "html.parser")
 
     # Find the "Categories" section
-    categories_h2 = soup.find("h3", string="Categories")
+    categories_h2 = soup.find(heading_tag, string="Categories")
     categories_ul = categories_h2.find_next("ul")
 
     category_links = []
@@ -140,89 +145,82 @@ def load_mefoarjudaica_product_urls():
         a = li.find("a", recursive=False)
         if a:
             category_links.append(a["href"])
+    return category_links
 
-    # Step 2: Iterate over category links
-    print(category_links)
-    for category_url in category_links:
-        next_page = category_url
-
-        while next_page:
-            print(len(product_links))
-            # Sleep before request (1–3 seconds random)
-            time.sleep(random.uniform(1, 3))
-
-            res = requests.get(next_page)
-            soup_obj = BeautifulSoup(res.content, "html.parser")
-
-            # Grab all products on this page
-            # Grab all products on this page
-            products = soup_obj.select("div.prod-item")
-            for product in products:
-                a_tag = product.select_one("h4.prod-name a")
-                if a_tag and "href" in a_tag.attrs:
-                    product_links.append(a_tag["href"])
-
-
-            # Find next page
-            li = soup_obj.find("li", class_="pagination-item pagination-item--next")
-            if li:
-                a = li.find("a")
-                if a and "href" in a.attrs:
-                    next_page = a["href"]
-                else:
-                    next_page = None
-            else:
-                next_page = None
 
-    return product_links
+def _pagination_next_link(soup_obj):
+    li = soup_obj.find("li", class_="pagination-item pagination-item--next")
+    if li:
+        a = li.find("a")
+        if a and "href" in a.attrs:
+            return a["href"]
+    return None
 
-def load_ozvehadar_product_urls():
+
+def parse_mefoarjudaica_page(url, depth, res):
+    """The category sitemap (depth 0) or one page of a category"""
+    if depth == 0:
+        category_links = _category_sitemap_links(res, "h3")
+        print(category_links)
+        return {"listings": category_links}
+
+    soup_obj = BeautifulSoup(res.content, "html.parser")
+
+    # Grab all products on this page
     product_links = []
+    for product in soup_obj.select("div.prod-item"):
+        a_tag = product.select_one("h4.prod-name a")
+        if a_tag and "href" in a_tag.attrs:
+            product_links.append(a_tag["href"])
 
-    # Step 1: Fetch main sitemap
-    response = requests.get("https://ozvehadar.us/sitemap/categories")
-    soup = BeautifulSoup(response.content, "html.parser")
+    return {"products": product_links, "next_page": _pagination_next_link(soup_obj)}
 
-    # Find the "Categories" section
-    categories_h2 = soup.find("h2", string="Categories")
-    categories_ul = categories_h2.find_next("ul")
 
-    category_links = []
-    for li in categories_ul.find_all("li", recursive=False):  # only top-level li
-        a = li.find("a", recursive=False)
-        if a:
-            category_links.append(a["href"])
+def iter_mefoarjudaica_product_urls():
+    """Product URLs of mefoarjudaica, yielded as category pages are crawled"""
+    frontier = CrawlFrontier(
+        'mefoarjudaica',
+        seeds=["https://mefoarjudaica.com/sitemap/categories"],
+        parse=parse_mefoarjudaica_page,
+        interval=2,
+    )
+    return frontier.iter_products()
 
-    # Step 2: Iterate over category links
-    for category_url in category_links:
-        next_page = category_url
-
-        while next_page:
-            # Sleep before request (1–3 seconds random)
-            time.sleep(random.uniform(1, 3))
-
-            res = requests.get(next_page)
-            soup_obj = BeautifulSoup(res.content, "html.parser")
-
-            # Grab all products on this page
-            products = soup_obj.select("ul.productGrid li.product")
-            for product in products:
-                a_tag = product.select_one("h3.card-title a")
-                if a_tag and "href" in a_tag.attrs:
-                    product_links.append(a_tag["href"])
-
-            # Find next page
-            li = soup_obj.find("li", class_="pagination-item pagination-item--next")
-            if li:
-                a = li.find("a")
-                if a and "href" in a.attrs:
-                    next_page = a["href"]
-                else:
-                    next_page = None
-            else:
-                next_page = None
 
-    return product_links
+def load_mefoarjudaica_product_urls():
+    return list(iter_mefoarjudaica_product_urls())
+
+
+def parse_ozvehadar_page(url, depth, res):
+    """The category sitemap (depth 0) or one page of a category"""
+    if depth == 0:
+        return {"listings": _category_sitemap_links(res, "h2")}
+
+    soup_obj = BeautifulSoup(res.content, "html.parser")
+
+    # Grab all products on this page
+    product_links = []
+    for product in soup_obj.select("ul.productGrid li.product"):
+        a_tag = product.select_one("h3.card-title a")
+        if a_tag and "href" in a_tag.attrs:
+            product_links.append(a_tag["href"])
+
+    return {"products": product_links, "next_page": _pagination_next_link(soup_obj)}
+
+
+def iter_ozvehadar_product_urls():
+    """Product URLs of ozvehadar, yielded as category pages are crawled"""
+    frontier = CrawlFrontier(
+        'ozvehadar',
+        seeds=["https://ozvehadar.us/sitemap/categories"],
+        parse=parse_ozvehadar_page,
+        interval=2,
+    )
+    return frontier.iter_products()
+
+
+def load_ozvehadar_product_urls():
+    return list(iter_ozvehadar_product_urls())
 
 
 def load_shaijudaica_product_urls():
@@ -355,45 +353,59 @@ def load_simchonim_sitemap_product_urls():
 
 
 
-def load_toys4u_products_urls():
-    BASE_URL = "https://toys4u.com"
-    url = "https://toys4u.com/categories/?page=1&limit=100"
-    all_products = []
+TOYS4U_BASE_URL = "https://toys4u.com"
 
-    while url:
-        print(f"Scraping: {url}")
 
-        res = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
-        soup = BeautifulSoup(res.text, "html.parser")
+def _toys4u_get(url):
+    return requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
 
-        for item in soup.select("ul.productGrid li.product"):
-            title_tag = item.select_one(".card-title a")
-            price_tag = item.select_one(".price--withoutTax")
-            image_tag = item.select_one(".card-image")
 
-            link = title_tag["href"] if title_tag else None
-            full_link = urljoin(BASE_URL, link) if link else None
+def parse_toys4u_listing(url, depth, res):
+    """One page of the all-products listing: product dicts and the next page"""
+    print(f"Scraping: {url}")
+    soup = BeautifulSoup(res.text, "html.parser")
+    products = []
 
-            category = None
-            if full_link:
-                parts = urlparse(full_link).path.strip("/").split("/")
-                category = parts[0] if parts else None
+    for item in soup.select("ul.productGrid li.product"):
+        title_tag = item.select_one(".card-title a")
+        price_tag = item.select_one(".price--withoutTax")
+        image_tag = item.select_one(".card-image")
+
+        link = title_tag["href"] if title_tag else None
+        full_link = urljoin(TOYS4U_BASE_URL, link) if link else None
+
+        category = None
+        if full_link:
+            parts = urlparse(full_link).path.strip("/").split("/")
+            category = parts[0] if parts else None
+
+        products.append({
+            "title": title_tag.get_text(strip=True) if title_tag else None,
+            "link": full_link,
+            "image": image_tag["src"] if image_tag else None,
+            "price": price_tag.get_text(strip=True) if price_tag else None,
+            "category": category,
+        })
 
-            all_products.append({
-                "title": title_tag.get_text(strip=True) if title_tag else None,
-                "link": full_link,
-                "image": image_tag["src"] if image_tag else None,
-                "price": price_tag.get_text(strip=True) if price_tag else None,
-                "category": category,
-            })
+    next_btn = soup.select_one(".pagination-item--next a")
+    next_page = urljoin(TOYS4U_BASE_URL, next_btn["href"]) if next_btn else None
+    return {"products": products, "next_page": next_page}
 
-        next_btn = soup.select_one(".pagination-item--next a")
-        url = urljoin(BASE_URL, next_btn["href"]) if next_btn else None
-        sleep(5)
-    return all_products
 
+def iter_toys4u_products_urls():
+    """Listing dicts of toys4u, yielded page by page through the crawl frontier"""
+    frontier = CrawlFrontier(
+        'toys4u',
+        seeds=["https://toys4u.com/categories/?page=1&limit=100"],
+        parse=parse_toys4u_listing,
+        get=_toys4u_get,
+        interval=5,
+    )
+    return frontier.iter_products()
 
 
+def load_toys4u_products_urls():
+    return list(iter_toys4u_products_urls())
 
 
 def load_feldheim_xml_data():
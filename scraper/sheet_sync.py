@@ -0,0 +1,463 @@
+"""
+Incremental Google Sheet sync for the product export
+
+A GoogleSheetRow map remembers which sheet row holds which product and an md5
+of the values last written there.  Re-exporting to an existing sheet then only
+sends changed, added and removed rows through values.batchUpdate instead of
+clearing A2:Z and rewriting every product.
+"""
+
+import hashlib
+import json
+import logging
+import queue
+import random
+import socket
+import ssl
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.db import connection
+from django.utils import timezone
+from googleapiclient.errors import HttpError
+
+from .models import GoogleSheetRow
+
+logger = logging.getLogger(__name__)
+
+SHEET_HEADERS = ['Website', 'Name', 'SKU', 'Price', 'Category', 'Vendor', 'InStock',
+                 'Description', 'Image Link', 'Link', 'Created At', 'Updated At']
+
+# Updated At moves on every scrape even when nothing else changed, so it is left
+# out of the hash.  It is still written whenever the row is re-sent.
+UNHASHED_COLUMNS = {SHEET_HEADERS.index('Updated At')}
+
+BLANK_ROW = [''] * len(SHEET_HEADERS)
+
+# Upload limits: Google recommends request bodies of at most 2 MB, and the
+# default Sheets quota is 60 write requests per minute per user
+MAX_PAYLOAD_BYTES = 2 * 1024 * 1024
+WRITE_REQUESTS_PER_MINUTE = 60
+MAX_CONCURRENT_UPLOADS = 4
+MAX_UPLOAD_RETRIES = 6
+MAX_BACKOFF_SECONDS = 64
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+BATCH_SIZE = 1000
+
+# Product columns read for the sheet, in SHEET_HEADERS order after the id
+SHEET_FIELDS = ('id', 'website', 'name', 'sku', 'price', 'category', 'vendor', 'in_stock',
+                'description', 'image_link', 'link', 'created_at', 'updated_at')
+
+# Batches the background producer may run ahead of the uploader
+PREFETCH_BATCHES = 2
+
+
+def build_sheet_row(values: Tuple, vendor_configs: Dict) -> List[str]:
+    """
+    Build the sheet row for a product.
+
+    Args:
+        values: Product values in SHEET_FIELDS order, without the id
+        vendor_configs: Map from ProductTransformer.load_vendor_configs()
+    """
+    (website, name, sku, price, category, vendor, in_stock,
+     description, image_link, link, created_at, updated_at) = values
+
+    vendor_config = vendor_configs.get((website or '').lower())
+    if vendor_config:
+        sku_value = vendor_config.apply_sku_transform(sku or '')  # SKU with vendor prefix
+    else:
+        sku_value = sku or ''
+
+    return [
+        website or '',
+        name or '',
+        sku_value,
+        price or '',
+        category or '',
+        vendor or '',
+        "Yes" if in_stock else "No",
+        description or '',
+        ", ".join(image_link.split(",")[:2]) if image_link else '',
+        link or '',
+        created_at.strftime('%Y-%m-%d %H:%M:%S') if created_at else '',
+        updated_at.strftime('%Y-%m-%d %H:%M:%S') if updated_at else '',
+    ]
+
+
+def iter_sheet_batches(products, vendor_configs: Dict, batch_size: int = 500) -> Iterator[List[Tuple[int, List[str]]]]:
+    """
+    Read products in primary-key ranges and yield batches of sheet rows.
+
+    Each website is walked with ``id > last_id`` keyset queries instead of
+    OFFSET slices, and only the exported columns are fetched.  Rows come out
+    grouped by website in id order, which follows created_at.
+
+    Args:
+        products: Product queryset to export
+        vendor_configs: Map from ProductTransformer.load_vendor_configs()
+        batch_size: Rows per batch (and per query)
+
+    Yields:
+        Lists of (product_id, sheet row values)
+    """
+    websites = list(products.order_by('website').values_list('website', flat=True).distinct())
+    for website in websites:
+        if website is None:
+            website_products = products.filter(website__isnull=True)
+        else:
+            website_products = products.filter(website=website)
+
+        last_id = 0
+        while True:
+            chunk = list(
+                website_products.filter(id__gt=last_id).order_by('id').values_list(*SHEET_FIELDS)[:batch_size]
+            )
+            if not chunk:
+                break
+            last_id = chunk[-1][0]
+            yield [(values[0], build_sheet_row(values[1:], vendor_configs)) for values in chunk]
+
+
+def prefetch_in_background(batches: Iterable, max_pending: int = PREFETCH_BATCHES) -> Iterator:
+    """
+    Produce batches in a background thread while the caller consumes them.
+
+    The producer runs at most ``max_pending`` batches ahead, so database reads
+    overlap with the sheet uploads without holding the whole export in memory.
+    Errors raised by the producer are re-raised in the caller.
+    """
+    pending = queue.Queue(maxsize=max_pending)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                pending.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for batch in batches:
+                if not put(('batch', batch)):
+                    return
+            put(('done', None))
+        except Exception as e:
+            put(('error', e))
+        finally:
+            connection.close()  # the thread's own DB connection
+
+    producer = threading.Thread(target=produce, name='sheet-row-producer', daemon=True)
+    producer.start()
+    try:
+        while True:
+            kind, payload = pending.get()
+            if kind == 'done':
+                return
+            if kind == 'error':
+                raise payload
+            yield payload
+    finally:
+        stop.set()
+
+
+def row_hash(row: List[str]) -> str:
+    """md5 of the hashed columns of a sheet row"""
+    hashed = [value for col, value in enumerate(row) if col not in UNHASHED_COLUMNS]
+    return hashlib.md5(json.dumps(hashed, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def has_row_map(file_id: str) -> bool:
+    """True if the sheet was written by a previous sync and can be updated incrementally"""
+    return GoogleSheetRow.objects.filter(sheet_file_id=file_id).exists()
+
+
+class SheetSyncPlan:
+    """
+    Difference between a sheet's row map and the current products.
+
+    Rows of removed products are blanked and their row numbers reused for added
+    products; remaining added products are appended after the last used row.
+    New products therefore do not keep the website / created_at ordering of a
+    full rewrite.
+    """
+
+    def __init__(self, file_id: str):
+        self.file_id = file_id
+        self.updates: List[Tuple[int, List[str]]] = []   # (row_number, values)
+        self.changed = 0
+        self.added = 0
+        self.removed = 0
+        self.unchanged = 0
+        self.max_row = 1  # header row
+
+        self._existing: Dict[int, GoogleSheetRow] = {}
+        self._to_create: List[GoogleSheetRow] = []
+        self._to_update: List[GoogleSheetRow] = []
+        self._to_delete: List[int] = []
+
+    @classmethod
+    def build(cls, file_id: str, rows: Iterable[Tuple[int, List[str]]]) -> 'SheetSyncPlan':
+        """
+        Diff (product_id, values) pairs against the stored row map.
+
+        Args:
+            file_id: Google Sheet file ID
+            rows: (product_id, sheet row values) for every product to export
+        """
+        plan = cls(file_id)
+        plan._existing = {
+            entry.product_id: entry
+            for entry in GoogleSheetRow.objects.filter(sheet_file_id=file_id).iterator(chunk_size=5000)
+        }
+        if plan._existing:
+            plan.max_row = max(entry.row_number for entry in plan._existing.values())
+
+        seen = set()
+        added = []
+        for product_id, values in rows:
+            seen.add(product_id)
+            digest = row_hash(values)
+            entry = plan._existing.get(product_id)
+            if entry is None:
+                added.append((product_id, values, digest))
+            elif entry.row_hash != digest:
+                entry.row_hash = digest
+                plan._to_update.append(entry)
+                plan.updates.append((entry.row_number, values))
+                plan.changed += 1
+            else:
+                plan.unchanged += 1
+
+        free_rows = []
+        for product_id, entry in plan._existing.items():
+            if product_id not in seen:
+                free_rows.append(entry.row_number)
+                plan._to_delete.append(entry.id)
+                plan.removed += 1
+        free_rows.sort(reverse=True)
+
+        for product_id, values, digest in added:
+            if free_rows:
+                row_number = free_rows.pop()
+            else:
+                plan.max_row += 1
+                row_number = plan.max_row
+            plan._to_create.append(GoogleSheetRow(
+                sheet_file_id=file_id, product_id=product_id,
+                row_number=row_number, row_hash=digest,
+            ))
+            plan.updates.append((row_number, values))
+            plan.added += 1
+
+        # Rows freed by removed products and not reused are blanked
+        for row_number in free_rows:
+            plan.updates.append((row_number, BLANK_ROW))
+
+        plan.updates.sort(key=lambda update: update[0])
+        return plan
+
+    def save(self):
+        """Persist the row map changes once the updates were written to the sheet"""
+        now = timezone.now()
+        for i in range(0, len(self._to_delete), BATCH_SIZE):
+            GoogleSheetRow.objects.filter(id__in=self._to_delete[i:i + BATCH_SIZE]).delete()
+        for entry in self._to_update:
+            entry.updated_at = now  # bulk_update() skips auto_now
+        GoogleSheetRow.objects.bulk_update(self._to_update, ['row_hash', 'updated_at'], batch_size=BATCH_SIZE)
+        GoogleSheetRow.objects.bulk_create(self._to_create, batch_size=BATCH_SIZE)
+
+
+def replace_row_map(file_id: str, entries: Iterable[Tuple[int, int, str]]):
+    """
+    Replace a sheet's row map after a full rewrite.
+
+    Args:
+        entries: (product_id, row_number, row_hash) for every written row
+    """
+    GoogleSheetRow.objects.filter(sheet_file_id=file_id).delete()
+    GoogleSheetRow.objects.bulk_create(
+        [
+            GoogleSheetRow(sheet_file_id=file_id, product_id=product_id,
+                           row_number=row_number, row_hash=digest)
+            for product_id, row_number, digest in entries
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+
+def coalesce_updates(updates: List[Tuple[int, List[str]]]) -> List[Dict]:
+    """Merge row updates (sorted by row) into ValueRanges of consecutive rows"""
+    ranges = []
+    start = previous = None
+    values = []
+    for row_number, row in updates:
+        if previous is not None and row_number == previous + 1:
+            values.append(row)
+        else:
+            if values:
+                ranges.append({'range': f'A{start}', 'values': values})
+            start, values = row_number, [row]
+        previous = row_number
+    if values:
+        ranges.append({'range': f'A{start}', 'values': values})
+    return ranges
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """True for rate limiting, server errors and dropped connections"""
+    if isinstance(error, HttpError):
+        return error.resp.status in RETRYABLE_STATUSES
+    return isinstance(error, (socket.timeout, ssl.SSLError, ConnectionError, TimeoutError))
+
+
+class SheetUploader:
+    """
+    Concurrent, quota-paced writer of sheet rows.
+
+    Rows are added in row order and grouped into values.batchUpdate requests
+    of at most MAX_PAYLOAD_BYTES.  Requests cover disjoint rows, so up to
+    ``max_workers`` of them are sent at once.  Request starts are spaced to
+    stay within the per-minute quota; a 429 widens that spacing and successful
+    requests narrow it back.  Failed requests are retried with exponential
+    backoff on 429/5xx and connection errors.
+
+    Usage:
+        with SheetUploader(service_factory, file_id) as uploader:
+            uploader.add(row_number, values)
+    """
+
+    def __init__(self, service_factory: Callable, file_id: str,
+                 max_workers: int = MAX_CONCURRENT_UPLOADS,
+                 requests_per_minute: int = WRITE_REQUESTS_PER_MINUTE,
+                 max_payload_bytes: int = MAX_PAYLOAD_BYTES,
+                 on_written: Optional[Callable[[int], None]] = None):
+        """
+        Args:
+            service_factory: Builds a Sheets service (one per upload thread,
+                since the underlying httplib2 client is not thread-safe)
+            file_id: Google Sheet file ID
+            on_written: Called from the adding thread with the number of rows
+                of each completed request
+        """
+        self.service_factory = service_factory
+        self.file_id = file_id
+        self.max_workers = max_workers
+        self.max_payload_bytes = max_payload_bytes
+        self.on_written = on_written
+        self.requests_sent = 0
+        self.rows_written = 0
+
+        self._base_interval = 60.0 / requests_per_minute
+        self._interval = self._base_interval
+        self._next_slot = 0.0
+        self._pace_lock = threading.Lock()
+        self._local = threading.local()
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='sheet-upload')
+        self._in_flight = set()
+        self._rows: List[Tuple[int, List[str]]] = []
+        self._payload_bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            for future in self._in_flight:
+                future.cancel()
+            self._executor.shutdown(wait=False)
+        return False
+
+    def add(self, row_number: int, values: List[str]):
+        """Queue one row; rows must be added in increasing row order"""
+        size = len(json.dumps(values, ensure_ascii=False).encode('utf-8'))
+        if self._rows and self._payload_bytes + size > self.max_payload_bytes:
+            self._flush()
+        self._rows.append((row_number, values))
+        self._payload_bytes += size
+
+    def add_many(self, updates: Iterable[Tuple[int, List[str]]]):
+        for row_number, values in updates:
+            self.add(row_number, values)
+
+    def close(self):
+        """Send the remaining rows and wait for every request to finish"""
+        if self._rows:
+            self._flush()
+        try:
+            while self._in_flight:
+                self._collect(return_when=FIRST_COMPLETED)
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def _flush(self):
+        rows = self._rows
+        self._rows = []
+        self._payload_bytes = 0
+
+        # Bound the rows held in memory by requests waiting for a worker
+        while len(self._in_flight) >= self.max_workers * 2:
+            self._collect(return_when=FIRST_COMPLETED)
+        self._in_flight.add(self._executor.submit(self._send, rows))
+
+    def _collect(self, return_when):
+        done, self._in_flight = wait(self._in_flight, return_when=return_when)
+        for future in done:
+            rows_count = future.result()  # re-raises upload errors
+            self.requests_sent += 1
+            self.rows_written += rows_count
+            if self.on_written:
+                self.on_written(rows_count)
+
+    def _service(self):
+        if not hasattr(self._local, 'service'):
+            self._local.service = self.service_factory()
+        return self._local.service
+
+    def _wait_for_slot(self):
+        with self._pace_lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def _adjust_pace(self, throttled: bool):
+        with self._pace_lock:
+            if throttled:
+                self._interval = min(self._interval * 2, MAX_BACKOFF_SECONDS)
+            else:
+                self._interval = max(self._interval * 0.9, self._base_interval)
+
+    def _send(self, rows: List[Tuple[int, List[str]]]) -> int:
+        data = coalesce_updates(rows)
+        for attempt in range(MAX_UPLOAD_RETRIES + 1):
+            self._wait_for_slot()
+            try:
+                self._service().spreadsheets().values().batchUpdate(
+                    spreadsheetId=self.file_id,
+                    body={'valueInputOption': 'RAW', 'data': data},
+                ).execute()
+                self._adjust_pace(throttled=False)
+                return len(rows)
+            except Exception as e:
+                if attempt == MAX_UPLOAD_RETRIES or not is_retryable_error(e):
+                    logger.error(f"[SheetSync] Writing rows {rows[0][0]}-{rows[-1][0]} failed: {e}")
+                    raise
+                if isinstance(e, HttpError) and e.resp.status == 429:
+                    self._adjust_pace(throttled=True)
+                delay = min(2 ** attempt, MAX_BACKOFF_SECONDS) + random.uniform(0, 1)
+                logger.warning(
+                    f"[SheetSync] Writing rows {rows[0][0]}-{rows[-1][0]} failed ({e}), "
+                    f"retry {attempt + 1}/{MAX_UPLOAD_RETRIES} in {delay:.1f}s"
+                )
+                time.sleep(delay)
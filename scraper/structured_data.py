@@ -0,0 +1,247 @@
+"""
+Structured product data (JSON-LD and microdata) without building a DOM
+
+Many product pages embed an application/ld+json Product block or itemprop
+microdata.  scan_structured_product() pulls both out of the raw HTML with
+regexes bounded to <script type="application/ld+json"> blocks and
+<meta>/<link> tags, which is far cheaper than parsing the page.
+
+Custom scrapers hand their extractors a ProductPage instead of a
+BeautifulSoup object.  The extraction specs (extraction_specs.py) read
+page.structured first and only run their XPaths for fields it is missing;
+the lxml tree is built on the first such lookup, so a page whose structured
+data covers every field is never parsed.
+"""
+
+import html
+import json
+import re
+from typing import Dict, Optional
+
+from bs4 import BeautifulSoup
+from bs4.dammit import UnicodeDammit
+from lxml import etree, html as lxml_html
+
+LD_JSON_RE = re.compile(
+    rb'<script[^>]*\btype\s*=\s*["\']?application/ld\+json["\']?[^>]*>(.*?)</script\s*>',
+    re.IGNORECASE | re.DOTALL,
+)
+ITEMPROP_TAG_RE = re.compile(rb'<(?:meta|link)\b[^>]*\bitemprop\s*=[^>]*>', re.IGNORECASE)
+ATTRIBUTE_RE = re.compile(rb'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))')
+TAG_RE = re.compile(r'<[^>]+>')
+
+# schema.org availability values that mean the product can be bought
+IN_STOCK_AVAILABILITY = ('InStock', 'LimitedAvailability', 'OnlineOnly', 'InStoreOnly', 'PreOrder', 'BackOrder')
+
+# itemprop (lowercased) -> field, for props carried in <meta content> / <link href>
+MICRODATA_PROPS = {
+    'name': 'name',
+    'sku': 'sku',
+    'description': 'description',
+    'image': 'image',
+    'price': 'price',
+    'pricecurrency': 'currency',
+    'availability': 'in_stock',
+}
+
+CURRENCY_SYMBOLS = {'USD': '$', 'CAD': '$', 'EUR': '€', 'GBP': '£', 'ILS': '₪'}
+
+
+def _text(value) -> str:
+    """Plain text of a JSON-LD string value (entities decoded, tags and extra spaces removed)"""
+    if not isinstance(value, str):
+        return ''
+    value = html.unescape(TAG_RE.sub(' ', value))
+    return re.sub(r'\s+', ' ', value).strip()
+
+
+def _first(value):
+    return value[0] if isinstance(value, list) and value else value
+
+
+def _availability(value) -> Optional[bool]:
+    if not isinstance(value, str) or not value:
+        return None
+    return value.rstrip('/').rsplit('/', 1)[-1] in IN_STOCK_AVAILABILITY
+
+
+def _is_product(node) -> bool:
+    node_type = node.get('@type')
+    types = node_type if isinstance(node_type, list) else [node_type]
+    return 'Product' in types
+
+
+def _iter_nodes(data):
+    if isinstance(data, list):
+        for item in data:
+            yield from _iter_nodes(item)
+    elif isinstance(data, dict):
+        yield data
+        if '@graph' in data:
+            yield from _iter_nodes(data['@graph'])
+
+
+def _from_json_ld(node: Dict) -> Dict:
+    product = {
+        'name': _text(node.get('name')),
+        'sku': _text(str(node['sku'])) if node.get('sku') is not None else '',
+        'gtin': _text(str(node.get('gtin12') or node.get('gtin13') or node.get('gtin') or '')),
+        'description': _text(node.get('description')),
+    }
+
+    image = _first(node.get('image'))
+    if isinstance(image, dict):
+        image = image.get('url') or image.get('contentUrl')
+    product['image'] = image if isinstance(image, str) else ''
+
+    brand = _first(node.get('brand'))
+    product['brand'] = _text(brand.get('name') if isinstance(brand, dict) else brand)
+
+    offer = _first(node.get('offers'))
+    if isinstance(offer, dict):
+        price = offer.get('price', offer.get('lowPrice'))
+        product['price'] = str(price) if price not in (None, '') else ''
+        product['currency'] = offer.get('priceCurrency') or ''
+        product['in_stock'] = _availability(offer.get('availability'))
+
+    return product
+
+
+def _from_microdata(content: bytes) -> Dict:
+    """itemprop values carried in <meta content> / <link href> attributes"""
+    product = {}
+    for tag in ITEMPROP_TAG_RE.findall(content):
+        attributes = {
+            name.decode('ascii', 'replace').lower(): (double or single or bare).decode('utf-8', 'replace')
+            for name, double, single, bare in ATTRIBUTE_RE.findall(tag)
+        }
+        key = MICRODATA_PROPS.get(attributes.get('itemprop', '').lower())
+        value = html.unescape(attributes.get('content') or attributes.get('href') or '').strip()
+        if key is None or not value or key in product:
+            continue
+        product[key] = _availability(value) if key == 'in_stock' else value
+    return product
+
+
+def scan_structured_product(content) -> Dict:
+    """
+    Product fields from the JSON-LD Product block and microdata of a page.
+
+    JSON-LD wins where both are present. Blocks that are not valid JSON are
+    ignored.
+
+    Returns:
+        dict with any of: name, sku, gtin, price, currency, description,
+        image, brand, in_stock (True / False); empty values are left out
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+
+    product = {}
+    for block in LD_JSON_RE.findall(content):
+        try:
+            data = json.loads(block.decode('utf-8', 'replace').strip())
+        except ValueError:
+            continue
+        for node in _iter_nodes(data):
+            if _is_product(node):
+                product = _from_json_ld(node)
+                break
+        if product:
+            break
+
+    for key, value in _from_microdata(content).items():
+        if product.get(key) in (None, ''):
+            product[key] = value
+
+    return {key: value for key, value in product.items() if value not in (None, '')}
+
+
+def structured_price(structured: Dict, with_symbol: bool) -> Optional[str]:
+    """
+    Structured price formatted like the page shows it
+
+    Args:
+        structured: Result of scan_structured_product
+        with_symbol: '$1,299.00' style instead of '1299.00'
+
+    Returns:
+        str, or None when there is no price (or, with a symbol, an unknown currency)
+    """
+    try:
+        value = float(structured['price'])
+    except (KeyError, ValueError):
+        return None
+    if not with_symbol:
+        return f"{value:.2f}"
+    symbol = CURRENCY_SYMBOLS.get(structured.get('currency', 'USD'))
+    if symbol is None:
+        return None
+    return f"{symbol}{value:,.2f}"
+
+
+class ProductPage:
+    """
+    A fetched product page for the extract_<site>_product_info functions.
+
+    .structured is the regex scan of the raw HTML and .tree the lxml document
+    the extraction specs run their XPaths against. Any other attribute (find,
+    select_one, select, ...) is looked up on a BeautifulSoup DOM. Each is
+    built on first use.
+    """
+
+    def __init__(self, content, parser: str = 'html.parser'):
+        self.content = content
+        self.parser = parser
+        self._structured = None
+        self._soup = None
+        self._tree = None
+
+    @property
+    def structured(self) -> Dict:
+        if self._structured is None:
+            self._structured = scan_structured_product(self.content)
+        return self._structured
+
+    @property
+    def dom_built(self) -> bool:
+        return self._soup is not None or self._tree is not None
+
+    @property
+    def tree(self):
+        """lxml document of the page (None for an empty or unparseable body)"""
+        if self._tree is None and self.content:
+            try:
+                self._tree = lxml_html.document_fromstring(self._markup())
+            except (etree.ParserError, ValueError):
+                self._tree = None
+        return self._tree
+
+    def _markup(self) -> str:
+        # lxml assumes latin-1 for bytes without a <meta charset>; decode the
+        # way BeautifulSoup would (UTF-8 first, then the detected encoding)
+        if isinstance(self.content, str):
+            return self.content
+        try:
+            markup = self.content.decode('utf-8')
+        except UnicodeDecodeError:
+            markup = UnicodeDammit(self.content, is_html=True).unicode_markup
+        # lxml rejects str input that still carries an XML encoding declaration
+        return re.sub(r'^\s*<\?xml[^>]*\?>', '', markup)
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        if self._soup is None:
+            self._soup = BeautifulSoup(self.content, self.parser)
+        return self._soup
+
+    def __getattr__(self, name):
+        # Only called for attributes not defined above
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.soup, name)
+
+
+def structured_product(soup) -> Dict:
+    """Structured data of a ProductPage ({} for a plain BeautifulSoup object)"""
+    return soup.structured if isinstance(soup, ProductPage) else {}
@@ -5,7 +5,7 @@ Handles SKU matching, CSV parsing, and product transformations
 
 import csv
 import re
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, List, Tuple, Optional
 from django.db.models import Q
 from .models import Product, VendorConfiguration, ProductSyncStatus, Website
 
@@ -382,6 +382,283 @@ class SKUMatcher:
         return query.first()
 
 
+class SKUMatchIndex:
+    """
+    In-memory SKU index for matching a whole website export in one pass.
+
+    match_all_products_by_sku() re-fetches the vendor config and re-queries the
+    vendor's products for every CSV row.  This index loads (id, sku) pairs once
+    and answers the same three matching levels as DataFrame joins over all
+    export SKUs at once (match_frame):
+
+        Level 1 – exact case-insensitive SKU
+        Level 2 – vendor prefix stripped, then exact case-insensitive SKU
+        Level 3 – normalised SKU (with and without the normalised prefix)
+
+    Without a vendor the index mirrors the unfiltered fallback: exact match
+    first, normalised match only when nothing matched exactly.
+    """
+
+    def __init__(self, vendor_website: str = None):
+        self.vendor_website = vendor_website
+        self.sku_prefix = ''
+        self._catalog = None
+
+        products = Product.objects.all()
+        if vendor_website:
+            try:
+                website_obj = Website.objects.get(name__iexact=vendor_website, is_active=True)
+                vendor_config = VendorConfiguration.objects.get(website=website_obj, is_active=True)
+                self.sku_prefix = vendor_config.sku_prefix or ''
+            except (Website.DoesNotExist, VendorConfiguration.DoesNotExist):
+                pass
+            products = products.filter(website__iexact=vendor_website)
+
+        self._products = [
+            (product_id, sku or '')
+            for product_id, sku in products.order_by('id').values_list('id', 'sku').iterator(chunk_size=5000)
+        ]
+        self._prefix_normalized = SKUMatcher.normalize_sku(self.sku_prefix)
+
+    def __len__(self):
+        return len(self._products)
+
+    @staticmethod
+    def normalize_series(skus):
+        """Vectorised SKUMatcher.normalize_sku() for a pandas Series of strings"""
+        return skus.str.upper().str.strip().str.replace(r'[-_/\s]+', '', regex=True)
+
+    @property
+    def catalog(self):
+        """DataFrame of the indexed products: product_id, sku, sku_upper, sku_norm"""
+        if self._catalog is None:
+            import pandas as pd
+
+            catalog = pd.DataFrame(self._products, columns=['product_id', 'sku'])
+            catalog['sku'] = catalog['sku'].astype(str)
+            catalog['sku_upper'] = catalog['sku'].str.upper()
+            catalog['sku_norm'] = self.normalize_series(catalog['sku'])
+            self._catalog = catalog
+        return self._catalog
+
+    def match_frame(self, website_skus):
+        """
+        Match many website SKUs at once.
+
+        Export SKUs are de-duplicated, normalised vectorised and joined against
+        the catalog DataFrame, so no per-row Python work is needed.
+
+        Args:
+            website_skus: Iterable / Series of SKUs as they appear on the website
+
+        Returns:
+            DataFrame with columns sku, product_id (one row per matched pair)
+        """
+        import pandas as pd
+
+        skus = pd.Series(website_skus, dtype=str).drop_duplicates()
+        export = pd.DataFrame({'sku': skus[skus != '']})
+        export['sku_upper'] = export['sku'].str.upper()
+        export['sku_norm'] = self.normalize_series(export['sku'])
+
+        catalog = self.catalog
+        exact = catalog[['product_id', 'sku_upper']]
+        normalized = catalog.loc[catalog['sku_norm'] != '', ['product_id', 'sku_norm']]
+
+        # Level 1 – exact case-insensitive match
+        frames = [export.merge(exact, on='sku_upper')[['sku', 'product_id']]]
+
+        if not self.vendor_website:
+            unmatched = export[~export['sku'].isin(frames[0]['sku'])]
+            frames.append(unmatched.merge(normalized, on='sku_norm')[['sku', 'product_id']])
+            return pd.concat(frames, ignore_index=True).drop_duplicates(ignore_index=True)
+
+        # Level 2 – strip vendor prefix then exact match
+        if self.sku_prefix:
+            prefixed = export[export['sku_upper'].str.startswith(self.sku_prefix.upper())]
+            base = pd.DataFrame({
+                'sku': prefixed['sku'],
+                'sku_upper': prefixed['sku'].str.slice(len(self.sku_prefix)).str.upper(),
+            })
+            base = base[base['sku_upper'] != '']
+            frames.append(base.merge(exact, on='sku_upper')[['sku', 'product_id']])
+
+        # Level 3 – normalised match, with and without the normalised prefix
+        frames.append(
+            export[export['sku_norm'] != ''].merge(normalized, on='sku_norm')[['sku', 'product_id']]
+        )
+        if self._prefix_normalized:
+            prefixed = export[export['sku_norm'].str.startswith(self._prefix_normalized)]
+            base = pd.DataFrame({
+                'sku': prefixed['sku'],
+                'sku_norm': prefixed['sku_norm'].str.slice(len(self._prefix_normalized)),
+            })
+            base = base[base['sku_norm'] != '']
+            frames.append(base.merge(normalized, on='sku_norm')[['sku', 'product_id']])
+
+        return pd.concat(frames, ignore_index=True).drop_duplicates(ignore_index=True)
+
+
+class ProductSyncUpdater:
+    """Apply ProductSyncStatus changes for many products with bulk queries"""
+
+    BATCH_SIZE = 1000
+
+    @staticmethod
+    def mark_on_website(matches: Dict[int, Tuple[str, str]]) -> int:
+        """
+        Mark products as synced to the website.
+
+        Equivalent to get_or_create() + mark_on_website() per product, but done
+        with one SELECT, one bulk_update and one bulk_create per batch.
+
+        Args:
+            matches: {product_id: (website_sku, website_product_id)}
+
+        Returns:
+            Number of sync status rows written
+        """
+        from django.utils import timezone
+
+        now = timezone.now()
+        product_ids = list(matches.keys())
+        written = 0
+
+        for i in range(0, len(product_ids), ProductSyncUpdater.BATCH_SIZE):
+            batch_ids = product_ids[i:i + ProductSyncUpdater.BATCH_SIZE]
+            existing = {
+                s.product_id: s
+                for s in ProductSyncStatus.objects.filter(product_id__in=batch_ids)
+            }
+
+            to_update = []
+            to_create = []
+            for product_id in batch_ids:
+                website_sku, website_product_id = matches[product_id]
+                sync_status = existing.get(product_id)
+                if sync_status is None:
+                    to_create.append(ProductSyncStatus(
+                        product_id=product_id,
+                        on_website=True,
+                        website_sku=website_sku,
+                        website_product_id=website_product_id,
+                        status='synced',
+                        last_synced_at=now,
+                    ))
+                    continue
+                sync_status.on_website = True
+                sync_status.website_sku = website_sku
+                sync_status.website_product_id = website_product_id
+                sync_status.status = 'synced'
+                sync_status.last_synced_at = now
+                sync_status.updated_at = now  # bulk_update() skips auto_now
+                to_update.append(sync_status)
+
+            if to_update:
+                ProductSyncStatus.objects.bulk_update(
+                    to_update,
+                    ['on_website', 'website_sku', 'website_product_id',
+                     'status', 'last_synced_at', 'updated_at'],
+                )
+            if to_create:
+                ProductSyncStatus.objects.bulk_create(to_create, ignore_conflicts=True)
+            written += len(to_update) + len(to_create)
+
+        return written
+
+    @staticmethod
+    def mark_exported(product_ids) -> int:
+        """
+        Stamp last_export_at and clear selected_for_export for exported products.
+
+        One UPDATE for all existing sync statuses plus one bulk_create for
+        products that were never tracked.
+
+        Returns:
+            Number of sync status rows updated
+        """
+        from django.utils import timezone
+
+        now = timezone.now()
+        product_ids = list(product_ids)
+        updated = ProductSyncStatus.objects.filter(product_id__in=product_ids).update(
+            last_export_at=now, selected_for_export=False, updated_at=now
+        )
+        if updated < len(product_ids):
+            tracked_ids = set(
+                ProductSyncStatus.objects.filter(product_id__in=product_ids)
+                .values_list('product_id', flat=True)
+            )
+            ProductSyncStatus.objects.bulk_create([
+                ProductSyncStatus(product_id=product_id, status='new', last_export_at=now)
+                for product_id in Product.objects.filter(id__in=product_ids).values_list('id', flat=True)
+                if product_id not in tracked_ids
+            ], ignore_conflicts=True)
+        return updated
+
+    @staticmethod
+    def mark_missing_from_website(vendor_config: VendorConfiguration, website_skus: set,
+                                  matched_product_ids=()) -> int:
+        """
+        Flag a vendor's products that are not in the website export.
+
+        The missing set is derived from one query over the vendor's (id, sku)
+        pairs, skipping disabled products and products already matched during
+        the import.  Missing products without a sync status are created as
+        'new'; those previously on the website become 'removed'.
+
+        Args:
+            vendor_config: VendorConfiguration of the vendor being compared
+            website_skus: SKUs present in the website export (as exported)
+            matched_product_ids: Product IDs matched to an export row
+
+        Returns:
+            Number of vendor products not on the website
+        """
+        from django.utils import timezone
+
+        matched_product_ids = set(matched_product_ids)
+        vendor_products = Product.objects.filter(
+            website__iexact=vendor_config.website.name
+        ).exclude(
+            sync_status__is_disabled=True
+        ).values_list('id', 'sku')
+
+        missing = {}
+        for product_id, sku in vendor_products.iterator(chunk_size=5000):
+            if product_id in matched_product_ids:
+                continue
+            website_format_sku = vendor_config.apply_sku_transform(sku or '')
+            if website_format_sku not in website_skus:
+                missing[product_id] = website_format_sku
+
+        now = timezone.now()
+        missing_ids = list(missing.keys())
+        for i in range(0, len(missing_ids), ProductSyncUpdater.BATCH_SIZE):
+            batch_ids = missing_ids[i:i + ProductSyncUpdater.BATCH_SIZE]
+            tracked_ids = set(
+                ProductSyncStatus.objects.filter(product_id__in=batch_ids)
+                .values_list('product_id', flat=True)
+            )
+
+            # Previously on website but now removed
+            ProductSyncStatus.objects.filter(
+                product_id__in=batch_ids, on_website=True
+            ).update(on_website=False, status='removed', updated_at=now)
+
+            ProductSyncStatus.objects.bulk_create([
+                ProductSyncStatus(
+                    product_id=product_id,
+                    on_website=False,
+                    status='new',
+                    website_sku=missing[product_id],
+                )
+                for product_id in batch_ids if product_id not in tracked_ids
+            ], ignore_conflicts=True)
+
+        return len(missing_ids)
+
+
 class CSVParser:
     """Parse CSV files for import/export"""
     
@@ -410,13 +687,61 @@ class CSVParser:
         
         return products
     
+    # Website export column -> DataFrame column
+    WEBSITE_EXPORT_COLUMNS = {
+        'ID': 'id',
+        'Name': 'name',
+        'Sku': 'sku',
+        'Barcode': 'barcode',
+        'ISBN': 'isbn',
+    }
+
+    @staticmethod
+    def read_website_export(file_path: str):
+        """
+        Columnar version of parse_website_export() for large website exports
+
+        Reads only the known columns as strings (no NA/number inference) and
+        strips them vectorised.  The DataFrame index is the 0-based data row.
+
+        Returns DataFrame with columns: id, name, sku, barcode, isbn
+        """
+        import pandas as pd
+
+        columns = CSVParser.WEBSITE_EXPORT_COLUMNS
+        try:
+            frame = pd.read_csv(
+                file_path,
+                encoding='utf-8',
+                dtype=str,
+                keep_default_na=False,
+                usecols=lambda column: column in columns,
+            )
+        except pd.errors.EmptyDataError:
+            frame = pd.DataFrame()
+        except Exception as e:
+            raise Exception(f"Error parsing CSV: {str(e)}")
+
+        frame = frame.rename(columns=columns)
+        for column in columns.values():
+            if column in frame:
+                frame[column] = frame[column].str.strip()
+            else:
+                frame[column] = ''
+
+        return frame[list(columns.values())].reset_index(drop=True)
+
     @staticmethod
-    def generate_upload_csv(products: List[Product], output_path: str) -> int:
+    def generate_upload_csv(products: Iterable[Product], output_path: str) -> int:
         """
         Generate upload-products-to-website.csv
         
+        Rows are streamed straight into the CSV writer.  Vendor configurations
+        are preloaded once; fetch products with select_related('sync_status')
+        so custom overrides need no extra query per product.
+        
         Args:
-            products: List of Product objects to export
+            products: Product objects (list, queryset or iterator) to export
             output_path: Path to save CSV file
             
         Returns:
@@ -435,8 +760,9 @@ class CSVParser:
                 writer = csv.DictWriter(f, fieldnames=headers)
                 writer.writeheader()
                 
+                vendor_configs = ProductTransformer.load_vendor_configs()
                 for product in products:
-                    row_data = ProductTransformer.transform_for_upload(product)
+                    row_data = ProductTransformer.transform_for_upload(product, vendor_configs)
                     if row_data:
                         writer.writerow(row_data)
                         count += 1
@@ -450,30 +776,58 @@ class ProductTransformer:
     """Transform products for website upload"""
     
     @staticmethod
-    def transform_for_upload(product: Product) -> Optional[Dict]:
+    def load_vendor_configs() -> Dict[str, VendorConfiguration]:
+        """
+        Preload active vendor configurations keyed by lower-cased website name
+        
+        Pass the result to transform_for_upload() when transforming many
+        products so the Website / VendorConfiguration lookups happen once.
+        """
+        return {
+            config.website.name.lower(): config
+            for config in VendorConfiguration.objects.filter(is_active=True).select_related('website')
+        }
+    
+    @staticmethod
+    def transform_for_upload(product: Product, vendor_configs: Dict[str, VendorConfiguration] = None) -> Optional[Dict]:
         """
         Transform a Product into upload CSV format
         
         Applies vendor configuration (SKU prefix, pricing, defaults)
+        
+        Args:
+            product: Product to transform
+            vendor_configs: Optional map from load_vendor_configs().  When given,
+                no queries are made for the vendor config and the sync status is
+                read from product.sync_status (use select_related('sync_status')).
         """
         try:
-            # Get vendor configuration
-            website = Website.objects.filter(name__iexact=product.website).first()
-            if not website:
-                return None
-            
-            try:
-                vendor_config = VendorConfiguration.objects.get(website=website, is_active=True)
-            except VendorConfiguration.DoesNotExist:
-                # No vendor config - skip or use defaults
-                return None
-            
-            # Get sync status for custom overrides
-            sync_status = None
-            try:
-                sync_status = ProductSyncStatus.objects.get(product=product)
-            except ProductSyncStatus.DoesNotExist:
-                pass
+            if vendor_configs is not None:
+                vendor_config = vendor_configs.get((product.website or '').lower())
+                if not vendor_config:
+                    return None
+                try:
+                    sync_status = product.sync_status
+                except ProductSyncStatus.DoesNotExist:
+                    sync_status = None
+            else:
+                # Get vendor configuration
+                website = Website.objects.filter(name__iexact=product.website).first()
+                if not website:
+                    return None
+                
+                try:
+                    vendor_config = VendorConfiguration.objects.get(website=website, is_active=True)
+                except VendorConfiguration.DoesNotExist:
+                    # No vendor config - skip or use defaults
+                    return None
+                
+                # Get sync status for custom overrides
+                sync_status = None
+                try:
+                    sync_status = ProductSyncStatus.objects.get(product=product)
+                except ProductSyncStatus.DoesNotExist:
+                    pass
             
             # Transform SKU
             transformed_sku = vendor_config.apply_sku_transform(product.sku or '')
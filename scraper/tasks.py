@@ -5,7 +5,10 @@ from .models import *
 import random
 import traceback
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from celery.exceptions import SoftTimeLimitExceeded
+from django.db import IntegrityError
+from django.db.models import F
 import json
 from .scraper_scripts.load_xml_data import (load_craftsandmore_product_urls,load_ozvehadar_product_urls,
                                             load_shaijudaica_product_urls,load_ritelite_product_urls,
@@ -13,10 +16,16 @@ from .scraper_scripts.load_xml_data import (load_craftsandmore_product_urls,load
                                             load_meiros_sitemap_product_urls, load_legacyjudaica_sitemap_product_urls,
                                             load_simchonim_sitemap_product_urls, load_mefoarjudaica_product_urls,
                                             load_kaftorjudaica_product_urls, get_zionjudaica_urls, load_toys4u_products_urls,
-                                            load_feldheim_xml_data)
+                                            load_feldheim_xml_data, iter_mefoarjudaica_product_urls,
+                                            iter_ozvehadar_product_urls, iter_toys4u_products_urls)
 from bs4 import BeautifulSoup
 import re
 import cloudscraper
+from .http_cache import fetch_page
+from .page_archive import archive_page
+from .cooperative_crawl import SiteCrawl, run_cooperative_crawl
+from .extraction_specs import extract_with_spec
+from .structured_data import ProductPage
 
 # Headers for requests
 HEADERS = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 13_6_1) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Safari/605.1.15'}
@@ -129,6 +138,44 @@ def extract_shopify_product_variants(product_data, website_name):
         print(f"Error extracting product variants: {e}")
         return []
 
+def refresh_shopify_stock_and_prices(products):
+    """
+    Stock-and-price refresh of one products.json page.
+
+    Reads only each variant's id, price and availability and bulk-updates the
+    price / in_stock of products that changed. Names, descriptions and images
+    are not processed; variants not in the database yet are left for the next
+    full run, which creates them with all fields.
+    
+    Args:
+        products: Product objects from the products.json page
+        
+    Returns:
+        tuple: (variants matched, products updated, variants not in the database)
+    """
+    variants = {}
+    for product_data in products:
+        for variant in product_data.get('variants', []):
+            if variant.get('id') is not None:
+                variants[str(variant['id'])] = (variant.get('price', ''), variant.get('available', False))
+    
+    existing = Product.objects.filter(product_variant_id__in=list(variants)).only('id', 'product_variant_id', 'price', 'in_stock')
+    
+    now = timezone.now()
+    changed = []
+    matched = 0
+    for product in existing:
+        price, in_stock = variants[product.product_variant_id]
+        matched += 1
+        if product.price != price or product.in_stock != in_stock:
+            product.price = price
+            product.in_stock = in_stock
+            product.updated_at = now  # bulk_update() skips auto_now
+            changed.append(product)
+    
+    Product.objects.bulk_update(changed, ['price', 'in_stock', 'updated_at'], batch_size=500)
+    return matched, len(changed), len(variants) - matched
+
 def scrape_shopify_products_common(session, website_base_url, custom_domain=None):
     """
     Common function to scrape products from Shopify JSON API
@@ -150,6 +197,23 @@ def scrape_shopify_products_common(session, website_base_url, custom_domain=None
     
     log_message(session, 'info', f'Starting Shopify JSON API scraping for {session.website.name}')
     
+    # Incremental runs only save products Shopify reports as updated since
+    # the last completed full or incremental run started (stock & price runs
+    # leave names, descriptions and new variants alone, so they don't count)
+    updated_since = None
+    if session.scrape_mode == 'incremental':
+        last_run = ScrapingSession.objects.filter(
+            website=session.website, status='completed', scrape_mode__in=['full', 'incremental']
+        ).exclude(id=session.id).order_by('-completed_at').first()
+        if last_run:
+            updated_since = last_run.run_started_at or last_run.started_at
+            log_message(session, 'info', f'Incremental run: saving products updated since {updated_since:%Y-%m-%d %H:%M} UTC')
+        else:
+            log_message(session, 'info', 'Incremental run without a previous completed run: saving all products')
+    skipped_unchanged = 0
+    # Only a run that got past the last page saw the whole catalogue
+    reached_end = False
+    
     while True:
         try:
             # Construct Shopify products JSON URL
@@ -171,6 +235,7 @@ def scrape_shopify_products_common(session, website_base_url, custom_domain=None
             
             if not products:
                 log_message(session, 'info', f'No more products found on page {page}. Scraping complete.')
+                reached_end = True
                 break
             
             log_message(session, 'info', f'Found {len(products)} products on page {page}')
@@ -179,9 +244,28 @@ def scrape_shopify_products_common(session, website_base_url, custom_domain=None
             session.total_products_found += len(products)
             session.save()
             
+            if session.scrape_mode == 'stock_price':
+                matched, updated, unknown = refresh_shopify_stock_and_prices(products)
+                session.products_scraped += matched
+                session.products_updated += updated
+                total_scraped += matched
+                session.last_processed_index = total_scraped
+                session.last_processed_url = url
+                session.save()
+                log_message(session, 'info', f'Stock/price refresh: {updated} of {matched} variants changed'
+                            + (f', {unknown} new variants left for the next full run' if unknown else ''))
+                page += 1
+                continue
+            
             # Process each product
             for idx, product_data in enumerate(products):
                 try:
+                    if updated_since:
+                        product_updated_at = parse_datetime(product_data.get('updated_at') or '')
+                        if product_updated_at and product_updated_at < updated_since:
+                            skipped_unchanged += 1
+                            continue
+                    
                     # Extract product information
                     product_info = extract_shopify_product_variants(product_data, session.website.name)
                     
@@ -191,6 +275,7 @@ def scrape_shopify_products_common(session, website_base_url, custom_domain=None
                     
                     # Save or update product with robust error handling
                     for prod_variant in product_info:
+                        prod_variant['last_seen_session'] = session
                         try:
                             if prod_variant['sku']:
                                 # Try to get by SKU first
@@ -297,6 +382,8 @@ def scrape_shopify_products_common(session, website_base_url, custom_domain=None
                               exception_details=traceback.format_exc())
                     continue
             
+            if updated_since:
+                log_message(session, 'info', f'Skipped {skipped_unchanged} unchanged products so far')
             page += 1
             
         except requests.exceptions.RequestException as req_error:
@@ -309,6 +396,9 @@ def scrape_shopify_products_common(session, website_base_url, custom_domain=None
                       product_url=url, exception_details=traceback.format_exc())
             break
     
+    if not reached_end:
+        return catalogue_incomplete(session, page)
+    
     return {
         'status': 'completed',
         'total_found': session.total_products_found,
@@ -355,11 +445,13 @@ def scrape_shopify_website_common(session_id, website_config, task_instance, res
                 custom_domain=website_config.get('custom_domain')
             )
             
-            # Mark session as completed
-            session.status = 'completed'
+            # Mark session as completed (failed if the catalogue was cut short)
+            session.status = finished_session_status(session, result)
             session.completed_at = timezone.now()
             session.save()
             
+            sweep_unseen_products(session, result)
+            
             # Update website state
             state.is_running = False
             state.save()
@@ -413,6 +505,96 @@ def scrape_shopify_website_common(session_id, website_config, task_instance, res
         return {'status': 'failed', 'message': str(e)}
 
 
+# ==================== REMOVAL SWEEP ====================
+
+# A full run must have seen at least this share of the website's in-stock
+# products before the rest are marked out of stock; a run that saw fewer was
+# most likely cut short (blocked, sitemap or API errors) rather than delisted
+SWEEP_MIN_SEEN_RATIO = 0.5
+
+def catalogue_incomplete(session, page):
+    """
+    Result of a paginated API scrape that stopped on an error before its last
+    page: the products on the pages never fetched were not seen.
+    """
+    return {
+        'status': 'incomplete',
+        'message': f'Stopped at page {page} before the end of the catalogue',
+        'total_found': session.total_products_found,
+        'scraped': session.products_scraped,
+        'created': session.products_created,
+        'updated': session.products_updated,
+        'failed': session.products_failed
+    }
+
+
+def finished_session_status(session, result):
+    """
+    Status of a session whose scrape returned: 'failed' for an incomplete
+    catalogue, so it is neither swept nor used as an incremental baseline
+    """
+    if result and result.get('status') == 'incomplete':
+        log_message(session, 'warning', f"{result['message']}: no products marked out of stock, "
+                    f"and the next incremental run starts from the last completed one")
+        return 'failed'
+    return 'completed'
+
+
+def resume_chain(session):
+    """
+    IDs of a session and the sessions it was manually resumed from
+
+    A resumed session only crawls from its predecessor's last index, so the
+    products found before the resume carry the earlier sessions' stamps.
+    """
+    chain = [session.id]
+    previous_id = (session.resume_data or {}).get('resumed_from_session')
+    while previous_id and previous_id not in chain:
+        chain.append(previous_id)
+        previous = ScrapingSession.objects.filter(id=previous_id).values_list('resume_data', flat=True).first()
+        previous_id = (previous or {}).get('resumed_from_session')
+    return chain
+
+
+def sweep_unseen_products(session, result):
+    """
+    Mark the website's products a completed full run did not see as out of stock.
+    
+    Every save path stamps last_seen_session on the products it finds, so
+    the products delisted by the vendor are the ones without this session's
+    stamp (or the stamp of a session it was resumed from); they are flagged
+    with a single UPDATE. Their page cache entries are dropped so that a
+    product coming back is saved, and put back in stock, in full.
+    
+    Args:
+        session: ScrapingSession that just completed
+        result: Result dict of the scrape
+        
+    Returns:
+        int: Number of products marked out of stock
+    """
+    from .http_cache import forget_pages
+    
+    if session.scrape_mode != 'full' or not result or result.get('status') != 'completed':
+        return 0
+    
+    chain = resume_chain(session)
+    products = Product.objects.filter(website=session.website.name)
+    seen = products.filter(last_seen_session__in=chain).count()
+    in_stock = products.filter(in_stock=True).count()
+    if not seen or seen < in_stock * SWEEP_MIN_SEEN_RATIO:
+        log_message(session, 'warning', f'Removal sweep skipped: the run saw {seen} products, '
+                    f'{in_stock} are in stock')
+        return 0
+    
+    unseen = products.filter(in_stock=True).exclude(last_seen_session__in=chain)
+    links = list(unseen.values_list('link', flat=True))
+    swept = unseen.update(in_stock=False, updated_at=timezone.now())
+    forget_pages(links)
+    log_message(session, 'info', f'Removal sweep: {swept} products not seen in this run marked out of stock')
+    return swept
+
+
 # ==================== PRODUCT SYNC TASKS ====================
 
 @shared_task(bind=True, soft_time_limit=1800, time_limit=1860)
@@ -426,8 +608,8 @@ def import_website_products_task(self, import_log_id, file_path, vendor_website=
         vendor_website: Filter by specific vendor/website name
     """
     from django.utils import timezone
-    from .models import WebsiteImportLog, Product, VendorConfiguration, ProductSyncStatus
-    from .sync_utils import CSVParser, SKUMatcher
+    from .models import WebsiteImportLog, VendorConfiguration
+    from .sync_utils import CSVParser, SKUMatchIndex, ProductSyncUpdater
     
     try:
         # Get import log
@@ -436,9 +618,9 @@ def import_website_products_task(self, import_log_id, file_path, vendor_website=
         import_log.celery_task_id = self.request.id
         import_log.save()
         
-        # Parse CSV file
+        # Parse CSV file (columnar: typed string columns, stripped vectorised)
         try:
-            website_products = CSVParser.parse_website_export(file_path)
+            website_products = CSVParser.read_website_export(file_path)
         except Exception as parse_error:
             import_log.status = 'failed'
             import_log.error_message = f"CSV parsing error: {str(parse_error)}"
@@ -449,76 +631,61 @@ def import_website_products_task(self, import_log_id, file_path, vendor_website=
         import_log.total_rows = len(website_products)
         import_log.save()
         
-        if not website_products:
+        if website_products.empty:
             import_log.status = 'failed'
             import_log.error_message = "No products found in CSV"
             import_log.save()
             return {'status': 'failed', 'message': 'No products found in CSV'}
         
-        matched_count = 0
-        processed_count = 0
-        skipped_count = 0
-        website_skus = set()
-        unmatched_products = []  # Track products that couldn't be matched
+        # Rows without a SKU are skipped
+        rows = website_products[website_products['sku'] != '']
+        website_skus = set(rows['sku'])
+        
+        # Load the vendor's SKUs once and join all unique export SKUs against them
+        sku_index = SKUMatchIndex(vendor_website)
+        sku_matches = sku_index.match_frame(rows['sku'])
+        
+        matched_mask = rows['sku'].isin(sku_matches['sku'])
+        matched_count = int(matched_mask.sum())
+        processed_count = len(website_products)
+        skipped_count = processed_count - matched_count
+        
+        # Track products that couldn't be matched
+        unmatched_rows = rows[~matched_mask]
+        unmatched_products = [
+            {
+                'sku': sku,
+                'name': name,
+                'id': website_product_id,
+                'row': idx + 2  # +2 because CSV has header row and is 1-indexed
+            }
+            for idx, sku, name, website_product_id in zip(
+                unmatched_rows.index, unmatched_rows['sku'], unmatched_rows['name'], unmatched_rows['id']
+            )
+        ]
+        
+        # product_id -> (website_sku, website_product_id); the last CSV row wins
+        row_matches = (
+            rows[['sku', 'id']].reset_index()
+            .merge(sku_matches, on='sku')
+            .sort_values('index', kind='stable')
+            .drop_duplicates('product_id', keep='last')
+        )
+        product_matches = {
+            int(product_id): (sku, website_product_id)
+            for product_id, sku, website_product_id in zip(
+                row_matches['product_id'], row_matches['sku'], row_matches['id']
+            )
+        }
         
-        # Process each row from CSV
-        for idx, csv_row in enumerate(website_products):
-            try:
-                website_sku = csv_row['sku']
-                website_product_id = csv_row['id']
-                product_name = csv_row['name']
-                
-                if not website_sku:
-                    skipped_count += 1
-                    processed_count += 1
-                    continue
-                
-                # Track website SKUs
-                website_skus.add(website_sku)
-                
-                # Match ALL database products for this SKU (handles duplicate-SKU scenario)
-                matched_products = SKUMatcher.match_all_products_by_sku(website_sku, website_product_id, vendor_website)
-                
-                if matched_products:
-                    for product in matched_products:
-                        sync_status, created = ProductSyncStatus.objects.get_or_create(
-                            product=product,
-                            defaults={
-                                'on_website': True,
-                                'website_sku': website_sku,
-                                'website_product_id': website_product_id,
-                                'status': 'synced'
-                            }
-                        )
-                        if not created:
-                            # Update existing sync status for every matching product
-                            sync_status.mark_on_website(website_sku, website_product_id)
-                    matched_count += 1
-                else:
-                    # Track unmatched product
-                    unmatched_products.append({
-                        'sku': website_sku,
-                        'name': product_name,
-                        'id': website_product_id,
-                        'row': idx + 2  # +2 because CSV has header row and is 1-indexed
-                    })
-                    skipped_count += 1
-                
-                processed_count += 1
-                
-                # Update progress every 10 rows
-                if processed_count % 10 == 0:
-                    progress = int((processed_count / len(website_products)) * 100)
-                    import_log.processed_rows = processed_count
-                    import_log.matched_products = matched_count
-                    import_log.skipped_rows = skipped_count
-                    import_log.progress_percentage = progress
-                    import_log.save()
-                
-            except Exception as row_error:
-                skipped_count += 1
-                processed_count += 1
-                continue
+        import_log.processed_rows = processed_count
+        import_log.matched_products = matched_count
+        import_log.skipped_rows = skipped_count
+        import_log.progress_percentage = 50
+        import_log.save()
+        
+        # Write all matched sync statuses in bulk
+        ProductSyncUpdater.mark_on_website(product_matches)
         
         # Now find products that are NOT on website (new products)
         # Filter by specific vendor if provided
@@ -532,43 +699,11 @@ def import_website_products_task(self, import_log_id, file_path, vendor_website=
         
         new_products_count = 0
         
-        for vendor_config in vendor_configs:
-            website = vendor_config.website
-            
-            # Get all products for this website (excluding disabled ones)
-            website_products_qs = Product.objects.filter(website__iexact=website.name)
-            
-            # Exclude disabled products from sync status
-            disabled_product_ids = ProductSyncStatus.objects.filter(
-                is_disabled=True
-            ).values_list('product_id', flat=True)
-            
-            website_products_qs = website_products_qs.exclude(id__in=disabled_product_ids)
-            
-            for product in website_products_qs:
-                # Transform SKU to website format
-                website_format_sku = vendor_config.apply_sku_transform(product.sku or '')
-                
-                # Check if this SKU is NOT in the website export
-                if website_format_sku not in website_skus:
-                    # This product is in our DB but NOT on the website
-                    sync_status, created = ProductSyncStatus.objects.get_or_create(
-                        product=product,
-                        defaults={
-                            'on_website': False,
-                            'status': 'new',
-                            'website_sku': website_format_sku
-                        }
-                    )
-                    
-                    if not created and sync_status.on_website:
-                        # Product was previously on website but now removed
-                        sync_status.on_website = False
-                        sync_status.status = 'removed'
-                        sync_status.save()
-                    
-                    if not sync_status.on_website:
-                        new_products_count += 1
+        for vendor_config in vendor_configs.select_related('website'):
+            # Products in our DB but NOT on the website, flagged set-wise
+            new_products_count += ProductSyncUpdater.mark_missing_from_website(
+                vendor_config, website_skus, matched_product_ids=product_matches.keys()
+            )
         
         # Complete import and save unmatched products list
         import_log.status = 'completed'
@@ -615,8 +750,8 @@ def export_products_to_website_task(self, product_ids, output_filename, export_l
         Dict with status and file path
     """
     from django.conf import settings
-    from .models import Product, ProductSyncStatus, ProductExportLog
-    from .sync_utils import CSVParser
+    from .models import Product, ProductExportLog
+    from .sync_utils import CSVParser, ProductSyncUpdater
     from django.utils import timezone
     import os
 
@@ -650,8 +785,11 @@ def export_products_to_website_task(self, product_ids, output_filename, export_l
             export_log.progress_percentage = 30
             export_log.save()
 
-        # Generate CSV
-        count = CSVParser.generate_upload_csv(list(products), output_path)
+        # Generate CSV, streaming products with their sync status pre-joined
+        count = CSVParser.generate_upload_csv(
+            products.select_related('sync_status').iterator(chunk_size=2000),
+            output_path,
+        )
 
         if count == 0:
             if export_log:
@@ -664,15 +802,8 @@ def export_products_to_website_task(self, product_ids, output_filename, export_l
             export_log.progress_percentage = 80
             export_log.save()
 
-        # Update sync status for exported products
-        for product in products:
-            sync_status, created = ProductSyncStatus.objects.get_or_create(
-                product=product,
-                defaults={'status': 'new'}
-            )
-            sync_status.last_export_at = timezone.now()
-            sync_status.selected_for_export = False  # Unselect after export
-            sync_status.save()
+        # Update sync status for exported products (and unselect them) in bulk
+        ProductSyncUpdater.mark_exported(product_ids)
 
         if export_log:
             export_log.status = 'completed'
@@ -700,6 +831,10 @@ def export_products_to_website_task(self, product_ids, output_filename, export_l
                 pass
         return {'status': 'failed', 'message': str(e)}
 
+# Custom scrapers that save from listing pages in non-full modes (kaftorjudaica
+# always does) and only fetch product pages for products not seen before
+LISTING_MODE_SCRAPERS = ['toys4u', 'kaftorjudaica']
+
 def scrape_custom_website_common(session_id, website_config, task_instance, resume_from_index=0):
     """
     Common custom scraper function for non-Shopify websites
@@ -728,15 +863,24 @@ def scrape_custom_website_common(session_id, website_config, task_instance, resu
         state.save()
         
         log_message(session, 'info', f'Starting custom HTML scraping session for {website.name}')
+        if session.scrape_mode != 'full' and website_config['scraper_type'] not in LISTING_MODE_SCRAPERS:
+            log_message(session, 'info', f'{session.get_scrape_mode_display()} mode is not supported by custom scrapers - running a full crawl')
         
         try:
             # Use the appropriate scraping function based on website
-            if website_config['scraper_type'] == 'meiros':
-                result = scrape_meiros_products_common(session, resume_from_index)
+            # (WooCommerce stores use the Store API and fall back to HTML when it is disabled)
+            if use_chunked_crawl(session, website_config['scraper_type'], resume_from_index):
+                result = ((website_config['scraper_type'] in WOOCOMMERCE_STORES
+                           and scrape_woocommerce_products_common(session, website_config['scraper_type']))
+                          or start_chunked_crawl(session, website_config['scraper_type']))
+            elif website_config['scraper_type'] == 'meiros':
+                result = (scrape_woocommerce_products_common(session, 'meiros')
+                          or scrape_meiros_products_common(session, resume_from_index))
             elif website_config['scraper_type'] == 'legacyjudaica':
                 result = scrape_legacyjudaica_products_common(session, resume_from_index)
             elif website_config['scraper_type'] == 'simchonim':
-                result = scrape_simchonim_products_common(session, resume_from_index)
+                result = (scrape_woocommerce_products_common(session, 'simchonim')
+                          or scrape_simchonim_products_common(session, resume_from_index))
             elif website_config['scraper_type'] == 'jewisheducationaltoys':
                 result = scrape_jewisheducationaltoys_products_common(session, resume_from_index)
             elif website_config['scraper_type'] == 'ritelite':
@@ -752,7 +896,8 @@ def scrape_custom_website_common(session_id, website_config, task_instance, resu
             elif website_config['scraper_type'] == 'craftsandmore':
                 result = scrape_craftsandmore_products_common(session, resume_from_index)
             elif website_config['scraper_type'] == 'zionjudaica':
-                result = scrape_zionjudaica_products_common(session, resume_from_index)
+                result = (scrape_woocommerce_products_common(session, 'zionjudaica')
+                          or scrape_zionjudaica_products_common(session, resume_from_index))
             elif website_config['scraper_type'] == 'toys4u':
                 result = scrape_toys4u_products_common(session, resume_from_index)
             elif website_config['scraper_type'] == 'feldheim':
@@ -760,11 +905,17 @@ def scrape_custom_website_common(session_id, website_config, task_instance, resu
             else:
                 result = {'status': 'failed', 'message': f'Unknown scraper type: {website_config["scraper_type"]}'}
             
-            # Mark session as completed
-            session.status = 'completed'
+            if result.get('status') == 'chunked':
+                # finalize_chunked_crawl completes the session after the last chunk
+                return result
+            
+            # Mark session as completed (failed if the catalogue was cut short)
+            session.status = finished_session_status(session, result)
             session.completed_at = timezone.now()
             session.save()
             
+            sweep_unseen_products(session, result)
+            
             # Update website state
             state.is_running = False
             state.save()
@@ -791,12 +942,14 @@ def scrape_custom_website_common(session_id, website_config, task_instance, resu
             if website_config['scraper_type'] == 'meiros':
                 scrape_meiros.apply_async(
                     args=[session_id, session.last_processed_index + 1],
-                    countdown=30
+                    countdown=30,
+                    queue=session.dispatch_queue or None
                 )
             elif website_config['scraper_type'] == 'legacyjudaica':
                 scrape_legacyjudaica.apply_async(
                     args=[session_id, session.last_processed_index + 1],
-                    countdown=30
+                    countdown=30,
+                    queue=session.dispatch_queue or None
                 )
             
             log_message(session, 'info', f'Auto-resume task scheduled')
@@ -832,122 +985,335 @@ def _is_task_alive_internal(task_id):
     Avoids circular imports (utils.py already imports from tasks.py).
 
     Returns:
-        True  – task is STARTED (actively running)
-        False – task is dead (SUCCESS / FAILURE / REVOKED, or no ID)
+        True  – task is running (fresh heartbeat)
+        False – task is dead (SUCCESS / FAILURE / REVOKED, expired heartbeat, or no ID)
         None  – PENDING (ambiguous: could be queued OR dead worker)
     """
     if not task_id:
         return False
-    try:
-        from celery import current_app as _app
-        state = _app.AsyncResult(task_id).state
-        if state in ('SUCCESS', 'FAILURE', 'REVOKED'):
-            return False
-        if state == 'STARTED':
-            return True
-        return None  # PENDING
-    except Exception:
-        return False
+    from .heartbeat import get_task_liveness
+    return get_task_liveness([task_id])[task_id]
 
 
 # Website-specific scraper functions
-# Queue management for limiting concurrent scrapers to maximum 2
+# Queue management for limiting concurrent scrapers to SCRAPER_MAX_CONCURRENT (2 by default)
 def check_concurrent_scrapers():
     """
     Count scrapers that are GENUINELY running (alive Celery tasks).
     Ignores ScrapingState records whose tasks have died (stale DB entries).
+    Sessions sharing a task (a cooperative crawl) count as one scraper.
     """
-    running_states = ScrapingState.objects.filter(
-        is_running=True
-    ).select_related('current_session')
-
-    alive_count = 0
+    from .heartbeat import get_task_liveness
+    
+    running_states = [
+        state for state in ScrapingState.objects.filter(
+            is_running=True
+        ).select_related('current_session')
+        if state.current_session
+    ]
+    liveness = get_task_liveness(state.current_session.celery_task_id for state in running_states)
+
+    alive_tasks = set()
     for state in running_states:
-        if not state.current_session:
-            continue
-        task_alive = _is_task_alive_internal(state.current_session.celery_task_id)
+        task_id = state.current_session.celery_task_id
+        task_alive = liveness.get(task_id, False)
         session_age_min = (
             (timezone.now() - state.current_session.started_at).total_seconds() / 60
         )
         # Count as alive if: confirmed STARTED, or PENDING but recent (< 15 min)
         if task_alive is True or (task_alive is None and session_age_min < 15):
-            alive_count += 1
+            alive_tasks.add(task_id)
 
-    return alive_count
+    return len(alive_tasks)
 
 
 def can_start_scraper():
-    """Check if we can start a new scraper (max 2 concurrent alive tasks)"""
-    return check_concurrent_scrapers() < 2
+    """Check if we can start a new scraper (at most SCRAPER_MAX_CONCURRENT alive tasks)"""
+    from django.conf import settings
+    return check_concurrent_scrapers() < settings.SCRAPER_MAX_CONCURRENT
 
-# Custom websites
-def extract_feldheim_product_info(soup, product_url, website_name):
+
+def requeue_until_slot_free(task, session_id, resume_arg):
+    """
+    Retry a scraper that found no free slot in 30 seconds, in the lane it was
+    dispatched to, and point its session at the retry so liveness checks
+    follow the new task.
+    """
+    from django.conf import settings
+    
+    session = ScrapingSession.objects.get(id=session_id)
+    log_message(session, 'info', f'Scraper queued - waiting for available slot (max {settings.SCRAPER_MAX_CONCURRENT} concurrent scrapers)')
+    
+    retry = task.apply_async(
+        args=[session_id, resume_arg],
+        countdown=30,
+        queue=session.dispatch_queue or None
+    )
+    session.celery_task_id = retry.id
+    session.run_started_at = None
+    session.save()
+    return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+
+def skip_unchanged_page(session, idx, page):
+    """
+    Count a product page that is unchanged since it was last saved as scraped
+    and record progress, without extracting or saving the product again.
     """
-    Extract product information from feldheim.com product page HTML using BeautifulSoup
+    reason = 'not modified (304)' if page.not_modified else 'content unchanged'
+    log_message(session, 'info', f'Skipped product, page {reason}: {page.url}', product_url=page.url)
     
+    Product.objects.filter(website=session.website.name, link=page.url).update(last_seen_session=session)
+    session.products_scraped += 1
+    session.last_processed_index = idx
+    session.last_processed_url = page.url
+    session.save()
+
+# ==================== WOOCOMMERCE STORE API ====================
+
+# WooCommerce stores scraped through the Store API instead of one HTML page
+# per product. Fields are mapped to match their extract_<site>_product_info:
+#   price_symbol  – price keeps the currency symbol, as shown on the page
+#   description   – Store API field holding the page's description text
+#   category      – use the deepest product category (the breadcrumb's last item)
+#   sku_id        – product_variant_id from the SKU when there is one
+WOOCOMMERCE_STORES = {
+    'meiros': {
+        'base_url': 'https://meiros.com',
+        'price_symbol': False,
+        'description': 'description',
+        'category': False,
+        'sku_id': True,
+    },
+    'simchonim': {
+        'base_url': 'https://simchonim.com',
+        'price_symbol': True,
+        'description': 'short_description',
+        'category': False,
+        'sku_id': False,
+    },
+    'zionjudaica': {
+        'base_url': 'https://zionjudaica.com',
+        'price_symbol': True,
+        'description': 'description',
+        'category': True,
+        'sku_id': False,
+    },
+}
+
+WOOCOMMERCE_PER_PAGE = 100
+
+def format_woocommerce_price(prices, with_symbol):
+    """
+    Format Store API prices (integer strings in minor units) as the page shows them
+
     Args:
-        soup: BeautifulSoup object of the product page
-        product_url: Object dict title, link, image
+        prices: 'prices' object of a Store API product
+        with_symbol: Prefix the currency symbol
+
+    Returns:
+        str: e.g. '$19.99' or '19.99', '' if the product has no price
+    """
+    amount = prices.get('sale_price') or prices.get('price')
+    if not amount:
+        return ''
+    minor_unit = int(prices.get('currency_minor_unit', 2))
+    value = int(amount) / (10 ** minor_unit)
+    price = f"{value:,.{minor_unit}f}" if with_symbol else f"{value:.{minor_unit}f}"
+    if with_symbol:
+        price = f"{prices.get('currency_prefix', '')}{price}{prices.get('currency_suffix', '')}"
+    return price
+
+def extract_woocommerce_product(product_data, website_name, scraper_type):
+    """
+    Map a WooCommerce Store API product to the product dictionary its HTML extractor returns
+
+    Args:
+        product_data: Single product object from /wp-json/wc/store/products
         website_name: Name of the website
-        
+        scraper_type: Key of WOOCOMMERCE_STORES
+
     Returns:
         dict: Product information dictionary
     """
     try:
-        # Extract title
-        def get_text(el):
-            return el.get_text(strip=True) if el else None
+        import html
+        store = WOOCOMMERCE_STORES[scraper_type]
 
-        # ✅ price (from meta)
-        price_tag = soup.select_one('meta[itemprop="price"]')
-        price = price_tag["content"] if price_tag else None
+        product_url = product_data.get('permalink', '')
+        title = html.unescape(product_data.get('name', ''))
+        sku = product_data.get('sku', '')
+        price = format_woocommerce_price(product_data.get('prices') or {}, store['price_symbol'])
 
-        # ✅ category / author (based on your selector)
-        category_tag = soup.select_one("a.brand-link")
-        category = get_text(category_tag)
+        # Description HTML to text
+        description_html = product_data.get(store['description']) or ''
+        description = html.unescape(re.sub(r'<[^>]+>', ' ', description_html))
+        description = re.sub(r'\s+', ' ', description).strip()
 
-        # ✅ stock (true / false)
-        stock_tag = soup.select_one("p.stock span")
-        stock_text = get_text(stock_tag)
-        in_stock = True if stock_text and "in stock" in stock_text.lower() else False
+        images = product_data.get('images') or []
+        image_link = images[0].get('src', '') if images else ''
 
-        # ✅ description (clean text)
-        desc_container = soup.select_one('[data-id="description"] .prose')
-        description = desc_container.get_text(separator=" ", strip=True) if desc_container else None
-
-        title = product_url["title"] if product_url else ''
+        category = ''
+        categories = product_data.get('categories') or []
+        if store['category'] and categories:
+            category = html.unescape(categories[-1].get('name', ''))
 
-        
-        
-        sku  = product_url["link"].rstrip("/").split("/")[-1]
+        # Same ID scheme as the HTML extractor, so both engines update the same rows
+        if store['sku_id'] and sku:
+            product_variant_id = f"{website_name}_{sku}"
+        else:
+            product_variant_id = link_variant_id(website_name, product_url)
 
-        # Extract image link
-        image_link = product_url["image"]
-        
-        # Generate unique product variant ID (using URL + SKU)
-        product_variant_id = f"{website_name}_{sku}" if sku else f"{website_name}_{hash(product_url['link'])}"
-        
-        # Check if product is in stock (assume in stock if price exists)
-        # in_stock = bool(price)
-        
         product_info = {
             'product_variant_id': product_variant_id,
             'name': title,
             'sku': sku,
             'price': price,
-            'vendor': '',  # feldheim.com doesn't seem to have vendor info
-            'category': category,  # We could extract this from URL or breadcrumbs if needed
+            'vendor': '',
+            'category': category,
             'description': description,
-            'in_stock': in_stock,
-            'link': product_url["link"],
+            'in_stock': bool(product_data.get('is_in_stock', bool(price))),
+            'link': product_url,
             'image_link': image_link,
             'website': website_name
         }
-        
+
         return product_info
+
+    except Exception as e:
+        print(f"Error extracting {scraper_type} Store API product: {e}")
+        return None
+
+def scrape_woocommerce_products_common(session, scraper_type):
+    """
+    Scrape a WooCommerce store through the Store API, 100 products per request.
+    A whole store takes a few requests, so resumed sessions start over.
+
+    Args:
+        session: ScrapingSession object
+        scraper_type: Key of WOOCOMMERCE_STORES
+
+    Returns:
+        dict: Scraping results, or None if the store has the Store API disabled
+        and the HTML scraper has to be used instead
+    """
+    base_url = WOOCOMMERCE_STORES[scraper_type]['base_url']
+    page = 1
+    processed = 0
+    reached_end = False
+
+    log_message(session, 'info', f'Starting WooCommerce Store API scraping for {session.website.name}')
+
+    while True:
+        url = f"{base_url}/wp-json/wc/store/products?per_page={WOOCOMMERCE_PER_PAGE}&page={page}"
+        try:
+            if page > 1:
+                delay = random.randint(5, 15)
+                log_message(session, 'info', f'Waiting {delay} seconds before next request...')
+                time.sleep(delay)
+
+            log_message(session, 'info', f'Fetching page {page}: {url}')
+            response = requests.get(url, headers=HEADERS, timeout=30)
+
+            if page == 1:
+                # Disabled or blocked API: 401/403/404, or an HTML page instead of JSON
+                try:
+                    products = response.json() if response.status_code == 200 else None
+                except ValueError:
+                    products = None
+                if not isinstance(products, list):
+                    log_message(session, 'warning', f'Store API not available (HTTP {response.status_code}), falling back to HTML scraping')
+                    return None
+                total = response.headers.get('X-WP-Total')
+                session.total_products_found = int(total) if total and total.isdigit() else len(products)
+                session.save()
+            else:
+                # Past the last page WooCommerce answers 400 (page out of range)
+                if response.status_code == 400:
+                    products = []
+                else:
+                    response.raise_for_status()
+                    products = response.json()
+
+            if not products:
+                log_message(session, 'info', f'No more products found on page {page}. Scraping complete.')
+                reached_end = True
+                break
+
+            log_message(session, 'info', f'Found {len(products)} products on page {page}')
+
+            for product_data in products:
+                processed += 1
+                product_info = extract_woocommerce_product(product_data, session.website.name, scraper_type)
+                if not product_info:
+                    session.products_failed += 1
+                    continue
+                product_info['last_seen_session'] = session
+
+                try:
+                    if save_extracted_product(product_info):
+                        session.products_created += 1
+                        log_message(session, 'success', f'Created new product: {product_info["name"]}',
+                                product_url=product_info['link'], product_sku=product_info['sku'])
+                    else:
+                        session.products_updated += 1
+                        log_message(session, 'success', f'Updated product: {product_info["name"]}',
+                                product_url=product_info['link'], product_sku=product_info['sku'])
+                    session.products_scraped += 1
+
+                except Exception as db_error:
+                    session.products_failed += 1
+                    log_message(session, 'error', f'Database error for product: {str(db_error)}',
+                            product_url=product_info['link'], product_sku=product_info['sku'],
+                            exception_details=traceback.format_exc())
+
+            # Update session progress once per page
+            session.last_processed_index = processed
+            session.last_processed_url = url
+            session.save()
+
+            if len(products) < WOOCOMMERCE_PER_PAGE:
+                reached_end = True
+                break
+            page += 1
+
+        except requests.exceptions.RequestException as req_error:
+            if page == 1:
+                log_message(session, 'warning', f'Store API request failed ({str(req_error)}), falling back to HTML scraping')
+                return None
+            log_message(session, 'error', f'Request error for page {page}: {str(req_error)}',
+                      product_url=url, exception_details=traceback.format_exc())
+            break
+
+    if not reached_end:
+        return catalogue_incomplete(session, page)
+
+    return {
+        'status': 'completed',
+        'total_found': session.total_products_found,
+        'scraped': session.products_scraped,
+        'created': session.products_created,
+        'updated': session.products_updated,
+        'failed': session.products_failed
+    }
+
+# Custom websites
+def extract_feldheim_product_info(soup, product_url, website_name):
+    """
+    Extract product information from a feldheim.com product page (EXTRACTION_SPECS['feldheim'])
+    
+    Args:
+        soup: ProductPage of the product page
+        product_url: Object dict title, link, image
+        website_name: Name of the website
+        
+    Returns:
+        dict: Product information dictionary
+    """
+    try:
+        return extract_with_spec('feldheim', soup, product_url, website_name)
         
     except Exception as e:
-        print(f"Error extracting meiros product info: {e}")
+        print(f"Error extracting feldheim product info: {e}")
         return None
 
 def scrape_feldheim_products_common(session, resume_from_index=0):
@@ -993,10 +1359,15 @@ def scrape_feldheim_products_common(session, resume_from_index=0):
                 
                 # Make request to product page
                 scraper = cloudscraper.create_scraper()
-                response = scraper.get(product_url["link"])
+                page = fetch_page(product_url["link"], get=scraper.get, timeout=None)
+                archive_page(session, idx, product_url, page)
+                if page.unchanged:
+                    skip_unchanged_page(session, idx, page)
+                    continue
+                response = page.response
                 
                 # Parse HTML with BeautifulSoup
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = ProductPage(response.content)
                 
                 # Extract product information
                 product_info = extract_feldheim_product_info(soup, product_url, session.website.name)
@@ -1006,6 +1377,8 @@ def scrape_feldheim_products_common(session, resume_from_index=0):
                     log_message(session, 'warning', f'Failed to extract product info for: {product_url["link"]}')
                     continue
                 
+                product_info['last_seen_session'] = session
+                
                 # Save or update product in database
                 try:
                     # Try to get existing product by variant ID
@@ -1042,6 +1415,7 @@ def scrape_feldheim_products_common(session, resume_from_index=0):
                                 raise create_error
                     
                     session.products_scraped += 1
+                    page.store()
                     
                     # Update session progress
                     session.last_processed_index = idx
@@ -1087,10 +1461,10 @@ def scrape_feldheim_products_common(session, resume_from_index=0):
 
 def extract_toys4u_product_info(soup, product_url, website_name):
     """
-    Extract product information from toys4u.com product page HTML using BeautifulSoup
+    Extract product information from a toys4u.com product page (EXTRACTION_SPECS['toys4u'])
     
     Args:
-        soup: BeautifulSoup object of the product page
+        soup: ProductPage of the product page
         product_url: object dict have title, link, image, price, category
         website_name: Name of the website
         
@@ -1098,51 +1472,69 @@ def extract_toys4u_product_info(soup, product_url, website_name):
         dict: Product information dictionary
     """
     try:
-        # Extract title
-        def get_text(selector):
-            el = soup.select_one(selector)
-            return el.get_text(strip=True) if el else ''
-
-        sku = get_text(".productView-info-value--sku")
-        upc = get_text(".productView-info-value--upc")
-        mpn = get_text(".productView-info-value--mpn")
-
-        description_container = soup.select_one("#tab-description .productView-description-tabContent")
-        description = description_container.get_text(separator=" ", strip=True) if description_container else ''
+        return extract_with_spec('toys4u', soup, product_url, website_name)
+        
+    except Exception as e:
+        print(f"Error extracting toys4u product info: {e}")
+        return None
 
-        title = product_url["title"] if product_url else ''
+def refresh_toys4u_from_listing(session, product_urls):
+    """
+    Listing-only refresh for toys4u.
 
+    The category listings already carry title, price, image and category, so
+    products already in the database are bulk-updated from them without
+    fetching their pages. Only products not in the database yet need their
+    page for SKU and description.
     
-        category = product_url["category"]
-
-        image_link = product_url["image"]
-        
-        
-        # Generate unique product variant ID (using URL + SKU)
-        product_variant_id = f"{website_name}_{sku}" if sku else f"{website_name}_{hash(product_url['link'])}"
-        
-        # Check if product is in stock (assume in stock if price exists)
-        # in_stock = bool(price)
+    Args:
+        session: ScrapingSession object
+        product_urls: Listing items from load_toys4u_products_urls()
         
-        product_info = {
-            'product_variant_id': product_variant_id,
-            'name': title,
-            'sku': sku,
-            'price': product_url["price"],
-            'vendor': '',  # toys4u.com doesn't seem to have vendor info
-            'category': category,  # We could extract this from URL or breadcrumbs if needed
-            'description': description,
-            'in_stock': True,
-            'link': product_url["link"],
-            'image_link': image_link,
-            'website': website_name
+    Returns:
+        list: Listing items of new products, to deep-fetch
+    """
+    existing = {}
+    for product in Product.objects.filter(website=session.website.name).only(
+        'id', 'link', 'name', 'price', 'category', 'image_link', 'in_stock'
+    ):
+        existing.setdefault(product.link, []).append(product)
+    
+    now = timezone.now()
+    changed = []
+    seen_ids = []
+    new_items = []
+    for item in product_urls:
+        products = existing.get(item["link"])
+        if not products:
+            new_items.append(item)
+            continue
+        seen_ids.extend(product.id for product in products)
+        
+        values = {
+            'name': item["title"],
+            'price': item["price"],
+            'category': item["category"],
+            'image_link': item["image"],
+            'in_stock': True,  # listed products are in stock, as on the product page
         }
-        
-        return product_info
-        
-    except Exception as e:
-        print(f"Error extracting meiros product info: {e}")
-        return None
+        for product in products:
+            if any(getattr(product, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(product, field, value)
+                product.updated_at = now  # bulk_update() skips auto_now
+                changed.append(product)
+        session.products_scraped += 1
+    
+    Product.objects.bulk_update(changed, ['name', 'price', 'category', 'image_link', 'in_stock', 'updated_at'], batch_size=500)
+    for start in range(0, len(seen_ids), 500):
+        Product.objects.filter(id__in=seen_ids[start:start + 500]).update(last_seen_session=session)
+    session.products_updated += len(changed)
+    session.save()
+    
+    log_message(session, 'info', f'Listing refresh: {len(product_urls) - len(new_items)} known products, '
+                f'{len(changed)} changed, {len(new_items)} new products to fetch')
+    return new_items
 
 def scrape_toys4u_products_common(session, resume_from_index=0):
     """
@@ -1174,6 +1566,13 @@ def scrape_toys4u_products_common(session, resume_from_index=0):
         session.total_products_found = len(product_urls)
         session.save()
         
+        # Scheduled (non-full) runs update known products from the listing and
+        # only fetch pages of new products. The new-product list is rebuilt on
+        # every run, so a resumed listing run starts it from the beginning.
+        if session.scrape_mode != 'full':
+            product_urls = refresh_toys4u_from_listing(session, product_urls)
+            resume_from_index = 0
+        
         # Process products starting from resume index
         for idx, product_url in enumerate(product_urls[resume_from_index:], start=resume_from_index):
             try:
@@ -1186,11 +1585,16 @@ def scrape_toys4u_products_common(session, resume_from_index=0):
                 log_message(session, 'info', f'Processing product {idx + 1}/{len(product_urls)}: {product_url["link"]}')
                 
                 # Make request to product page
-                response = requests.get(product_url["link"], headers=HEADERS, timeout=30)
+                page = fetch_page(product_url["link"], headers=HEADERS)
+                archive_page(session, idx, product_url, page)
+                if page.unchanged:
+                    skip_unchanged_page(session, idx, page)
+                    continue
+                response = page.response
                 response.raise_for_status()
                 
                 # Parse HTML with BeautifulSoup
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = ProductPage(response.content)
                 
                 # Extract product information
                 product_info = extract_toys4u_product_info(soup, product_url, session.website.name)
@@ -1200,6 +1604,8 @@ def scrape_toys4u_products_common(session, resume_from_index=0):
                     log_message(session, 'warning', f'Failed to extract product info for: {product_url["link"]}')
                     continue
                 
+                product_info['last_seen_session'] = session
+                
                 # Save or update product in database
                 try:
                     # Try to get existing product by variant ID
@@ -1236,6 +1642,7 @@ def scrape_toys4u_products_common(session, resume_from_index=0):
                                 raise create_error
                     
                     session.products_scraped += 1
+                    page.store()
                     
                     # Update session progress
                     session.last_processed_index = idx
@@ -1280,10 +1687,10 @@ def scrape_toys4u_products_common(session, resume_from_index=0):
 
 def extract_jewisheducationaltoys_product_info(soup, product_url, website_name):
     """
-    Extract product information from meiros.com product page HTML using BeautifulSoup
+    Extract product information from a jewisheducationaltoys.com product page (EXTRACTION_SPECS['jewisheducationaltoys'])
     
     Args:
-        soup: BeautifulSoup object of the product page
+        soup: ProductPage of the product page
         product_url: URL of the product page
         website_name: Name of the website
         
@@ -1291,73 +1698,10 @@ def extract_jewisheducationaltoys_product_info(soup, product_url, website_name):
         dict: Product information dictionary
     """
     try:
-        # Extract title
-        title_elem = soup.find('font', class_='productnamecolorLARGE colors_productname')
-        title = title_elem.get_text(strip=True) if title_elem else ''
-
-        b_tags = soup.find_all('b')
-        upc = ''
-
-        for b in b_tags:
-            if 'UPC:' in b.get_text():
-                # UPC value is likely in the next sibling text
-                next_sibling = b.next_sibling
-                if next_sibling:
-                    upc = str(next_sibling).strip()
-                break
-        sku = upc
-        
-        # Extract description
-        description = ''
-        desc_elem = soup.find('span', id='product_description')
-        if desc_elem:
-                description = desc_elem.get_text(strip=True)
-
-        availability = soup.find('meta', itemprop='availability')
-        in_stock = availability and 'InStock' in availability.get('content', '')
-
-        category = ''
-        b_tag = soup.find('td', class_='vCSS_breadcrumb_td').find('b')
-
-        # Find all <a> tags inside <b>
-        links = b_tag.find_all('a')
-
-        # Get the last breadcrumb text
-        category = links[-1].get_text(strip=True)
-
-        # Extract image link
-        image_link = ''
-        img_tag = soup.find('img', id='product_photo')
-        image_link = img_tag['src']
-
-        # Optional: Add protocol if missing
-        if image_link.startswith("//"):
-            image_link = "https:" + image_link
-        
-        # Generate unique product variant ID (using URL + SKU)
-        product_variant_id = f"{website_name}_{sku}" if sku else f"{website_name}_{hash(product_url)}"
-        
-        # Check if product is in stock (assume in stock if price exists)
-        # in_stock = bool(price)
-        
-        product_info = {
-            'product_variant_id': product_variant_id,
-            'name': title,
-            'sku': sku,
-            'price': 'Login Required',
-            'vendor': '',  # meiros.com doesn't seem to have vendor info
-            'category': category,  # We could extract this from URL or breadcrumbs if needed
-            'description': description,
-            'in_stock': in_stock,
-            'link': product_url,
-            'image_link': image_link,
-            'website': website_name
-        }
-        
-        return product_info
+        return extract_with_spec('jewisheducationaltoys', soup, product_url, website_name)
         
     except Exception as e:
-        print(f"Error extracting meiros product info: {e}")
+        print(f"Error extracting jewisheducationaltoys product info: {e}")
         return None
 
 def scrape_jewisheducationaltoys_products_common(session, resume_from_index=0):
@@ -1402,11 +1746,16 @@ def scrape_jewisheducationaltoys_products_common(session, resume_from_index=0):
                 log_message(session, 'info', f'Processing product {idx + 1}/{len(product_urls)}: {product_url}')
                 
                 # Make request to product page
-                response = requests.get(product_url, headers=HEADERS, timeout=30)
+                page = fetch_page(product_url, headers=HEADERS)
+                archive_page(session, idx, product_url, page)
+                if page.unchanged:
+                    skip_unchanged_page(session, idx, page)
+                    continue
+                response = page.response
                 response.raise_for_status()
                 
                 # Parse HTML with BeautifulSoup
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = ProductPage(response.content)
                 
                 # Extract product information
                 product_info = extract_jewisheducationaltoys_product_info(soup, product_url, session.website.name)
@@ -1416,6 +1765,8 @@ def scrape_jewisheducationaltoys_products_common(session, resume_from_index=0):
                     log_message(session, 'warning', f'Failed to extract product info for: {product_url}')
                     continue
                 
+                product_info['last_seen_session'] = session
+                
                 # Save or update product in database
                 try:
                     # Try to get existing product by variant ID
@@ -1452,6 +1803,7 @@ def scrape_jewisheducationaltoys_products_common(session, resume_from_index=0):
                                 raise create_error
                     
                     session.products_scraped += 1
+                    page.store()
                     
                     # Update session progress
                     session.last_processed_index = idx
@@ -1496,10 +1848,10 @@ def scrape_jewisheducationaltoys_products_common(session, resume_from_index=0):
     
 def extract_ritelite_product_info(soup, product_url, website_name):
     """
-    Extract product information from ritelite.com product page HTML using BeautifulSoup
+    Extract product information from a ritelite.com product page (EXTRACTION_SPECS['ritelite'])
     
     Args:
-        soup: BeautifulSoup object of the product page
+        soup: ProductPage of the product page
         product_url: URL of the product page
         website_name: Name of the website
         
@@ -1507,62 +1859,10 @@ def extract_ritelite_product_info(soup, product_url, website_name):
         dict: Product information dictionary
     """
     try:
-        # Extract title
-        title_elem = soup.find("h3", class_="mainhead myriad-pro-normal")
-        title = title_elem.get_text(strip=True) if title_elem else ''
-        
-        # Extract price
-        price = ''
-        first_price_span = soup.find("span", class_="myriad-pro-bold")
-        if first_price_span:
-            price_text = first_price_span.get_text(strip=True).replace("MSRP", "").strip()
-            price = re.sub(r'[^\d\.]', '', price_text)
-            
-            
-        
-        # Extract SKU
-        sku_elem = soup.find("h4", class_="mainhead myriad-pro-bold uppercase text-center")
-        sku = sku_elem.get_text(strip=True) if sku_elem else ''
-        sku = re.sub(r'\bitem\b', '', sku, flags=re.IGNORECASE).strip()
-        
-        # Extract description
-        description = ''
-        desc_elem = soup.find("div", class_="col-xs-12 col-lg-12 col-md-12 nopadding myriad margin-top-10")
-        if desc_elem:
-                description = desc_elem.get_text(strip=True)
-        
-        # Extract image link
-        image_link = ''
-        img_tag = soup.find("img", class_="zoom_02")
-        if img_tag:
-            base_url = "https://ritelite.com"
-            image_link = base_url + img_tag.get("src")
-
-        
-        # Generate unique product variant ID (using URL + SKU)
-        product_variant_id = f"{website_name}_{sku}" if sku else f"{website_name}_{hash(product_url)}"
-        category = product_url.split("Category/")[1].split("/")[0]
-        # Check if product is in stock (assume in stock if price exists)
-        in_stock = bool(price)
-        
-        product_info = {
-            'product_variant_id': product_variant_id,
-            'name': title,
-            'sku': sku,
-            'price': price,
-            'vendor': '',  # meiros.com doesn't seem to have vendor info
-            'category': category,  # We could extract this from URL or breadcrumbs if needed
-            'description': description,
-            'in_stock': in_stock,
-            'link': product_url,
-            'image_link': image_link,
-            'website': website_name
-        }
-        
-        return product_info
+        return extract_with_spec('ritelite', soup, product_url, website_name)
         
     except Exception as e:
-        print(f"Error extracting meiros product info: {e}")
+        print(f"Error extracting ritelite product info: {e}")
         return None
 
 def scrape_ritelite_products_common(session, resume_from_index=0):
@@ -1607,11 +1907,16 @@ def scrape_ritelite_products_common(session, resume_from_index=0):
                 log_message(session, 'info', f'Processing product {idx + 1}/{len(product_urls)}: {product_url}')
                 
                 # Make request to product page
-                response = requests.get(product_url, headers=HEADERS, timeout=30)
+                page = fetch_page(product_url, headers=HEADERS)
+                archive_page(session, idx, product_url, page)
+                if page.unchanged:
+                    skip_unchanged_page(session, idx, page)
+                    continue
+                response = page.response
                 response.raise_for_status()
                 
                 # Parse HTML with BeautifulSoup
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = ProductPage(response.content)
                 
                 # Extract product information
                 product_info = extract_ritelite_product_info(soup, product_url, session.website.name)
@@ -1621,6 +1926,8 @@ def scrape_ritelite_products_common(session, resume_from_index=0):
                     log_message(session, 'warning', f'Failed to extract product info for: {product_url}')
                     continue
                 
+                product_info['last_seen_session'] = session
+                
                 # Save or update product in database
                 try:
                     # Try to get existing product by variant ID
@@ -1657,6 +1964,7 @@ def scrape_ritelite_products_common(session, resume_from_index=0):
                                 raise create_error
                     
                     session.products_scraped += 1
+                    page.store()
                     
                     # Update session progress
                     session.last_processed_index = idx
@@ -1701,10 +2009,10 @@ def scrape_ritelite_products_common(session, resume_from_index=0):
 
 def extract_shaijudaica_product_info(soup, product_url, website_name):
     """
-    Extract product information from shaijudaica.co.il product page HTML using BeautifulSoup
+    Extract product information from a shaijudaica.co.il product page (EXTRACTION_SPECS['shaijudaica'])
     
     Args:
-        soup: BeautifulSoup object of the product page
+        soup: ProductPage of the product page
         product_url: URL of the product page
         website_name: Name of the website
         
@@ -1712,62 +2020,10 @@ def extract_shaijudaica_product_info(soup, product_url, website_name):
         dict: Product information dictionary
     """
     try:
-        # Extract title
-        title_elem = soup.select_one("#item_current_title")
-        title = title_elem.get_text(strip=True) if title_elem else ''
-        
-        # Extract price
-        price = ''
-        price_elem = soup.find("span", class_="price_value")
-        price = price_elem.get_text(strip=True) if price_elem else ''
-            
-            
-        
-        # Extract SKU
-        sku_elem = soup.select_one(".code_item")
-        sku = sku_elem.get_text(strip=True) if sku_elem else ''
-        
-        # Extract description
-        description = ''
-        desc_elem = soup.select_one("#item_current_sub_title")
-        if desc_elem:
-                description = desc_elem.get_text(strip=True)
-        
-        # Extract image link
-        image_link = ''
-        img_tag = soup.select_one("#item_show_carousel img")
-        if img_tag:
-            image_link = img_tag.get("src")
-
-        
-        # Generate unique product variant ID (using URL + SKU)
-        product_variant_id = f"{website_name}_{sku}" if sku else f"{website_name}_{hash(product_url)}"
-        category = ''
-        li_tags = soup.select("#bread_crumbs li")
-
-        if len(li_tags) >= 2:
-            category = li_tags[-2].get_text(strip=True)
-        # Check if product is in stock (assume in stock if price exists)
-        in_stock = bool(price)
-        
-        product_info = {
-            'product_variant_id': product_variant_id,
-            'name': title,
-            'sku': sku,
-            'price': price,
-            'vendor': '',  # meiros.com doesn't seem to have vendor info
-            'category': category,  # We could extract this from URL or breadcrumbs if needed
-            'description': description,
-            'in_stock': in_stock,
-            'link': product_url,
-            'image_link': image_link,
-            'website': website_name
-        }
-        
-        return product_info
+        return extract_with_spec('shaijudaica', soup, product_url, website_name)
         
     except Exception as e:
-        print(f"Error extracting meiros product info: {e}")
+        print(f"Error extracting shaijudaica product info: {e}")
         return None
 
 def scrape_shaijudaica_products_common(session, resume_from_index=0):
@@ -1812,11 +2068,16 @@ def scrape_shaijudaica_products_common(session, resume_from_index=0):
                 log_message(session, 'info', f'Processing product {idx + 1}/{len(product_urls)}: {product_url}')
                 
                 # Make request to product page
-                response = requests.get(product_url, headers=HEADERS, timeout=30)
+                page = fetch_page(product_url, headers=HEADERS)
+                archive_page(session, idx, product_url, page)
+                if page.unchanged:
+                    skip_unchanged_page(session, idx, page)
+                    continue
+                response = page.response
                 response.raise_for_status()
                 
                 # Parse HTML with BeautifulSoup
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = ProductPage(response.content)
                 
                 # Extract product information
                 product_info = extract_shaijudaica_product_info(soup, product_url, session.website.name)
@@ -1826,6 +2087,8 @@ def scrape_shaijudaica_products_common(session, resume_from_index=0):
                     log_message(session, 'warning', f'Failed to extract product info for: {product_url}')
                     continue
                 
+                product_info['last_seen_session'] = session
+                
                 # Save or update product in database
                 try:
                     # Try to get existing product by variant ID
@@ -1862,6 +2125,7 @@ def scrape_shaijudaica_products_common(session, resume_from_index=0):
                                 raise create_error
                     
                     session.products_scraped += 1
+                    page.store()
                     
                     # Update session progress
                     session.last_processed_index = idx
@@ -1906,10 +2170,10 @@ def scrape_shaijudaica_products_common(session, resume_from_index=0):
 
 def extract_meiros_product_info(soup, product_url, website_name):
     """
-    Extract product information from meiros.com product page HTML using BeautifulSoup
+    Extract product information from a meiros.com product page (EXTRACTION_SPECS['meiros'])
     
     Args:
-        soup: BeautifulSoup object of the product page
+        soup: ProductPage of the product page
         product_url: URL of the product page
         website_name: Name of the website
         
@@ -1917,65 +2181,7 @@ def extract_meiros_product_info(soup, product_url, website_name):
         dict: Product information dictionary
     """
     try:
-        # Extract title
-        title_elem = soup.find('h2', class_='pd-top__main-right__title')
-        title = title_elem.get_text(strip=True) if title_elem else ''
-        
-        # Extract price
-        price_elem = soup.find('span', class_='pd-top__main-right__price')
-        price = ''
-        if price_elem:
-            # Remove currency symbol and clean price
-            price_text = price_elem.get_text(strip=True)
-            price = re.sub(r'[^\d\.]', '', price_text)
-        
-        # Extract SKU
-        sku_elem = soup.find('span', class_='pd-top__main-right__bpinner-label sku')
-        sku = sku_elem.get_text(strip=True) if sku_elem else ''
-        
-        # Extract description
-        description = ''
-        desc_elem = soup.find('div', class_='description-inner__text')
-        if desc_elem:
-            desc_text_elem = desc_elem.find('p', class_='description-inner__text-text')
-            if desc_text_elem:
-                description = desc_text_elem.get_text(strip=True)
-        
-        # Extract image link
-        image_link = ''
-        img_elem = soup.find('div', class_='slick-track')
-        if img_elem:
-            # Find the image link from the anchor tag
-            link_elem = img_elem.find('a', class_='pd-top__main-slider-img')
-            if link_elem and link_elem.get('href'):
-                image_link = link_elem.get('href')
-            elif img_elem.find('img'):
-                # Fallback to img src if no href found
-                img_tag = img_elem.find('img')
-                if img_tag and img_tag.get('src'):
-                    image_link = img_tag.get('src')
-        
-        # Generate unique product variant ID (using URL + SKU)
-        product_variant_id = f"{website_name}_{sku}" if sku else f"{website_name}_{hash(product_url)}"
-        
-        # Check if product is in stock (assume in stock if price exists)
-        in_stock = bool(price)
-        
-        product_info = {
-            'product_variant_id': product_variant_id,
-            'name': title,
-            'sku': sku,
-            'price': price,
-            'vendor': '',  # meiros.com doesn't seem to have vendor info
-            'category': '',  # We could extract this from URL or breadcrumbs if needed
-            'description': description,
-            'in_stock': in_stock,
-            'link': product_url,
-            'image_link': image_link,
-            'website': website_name
-        }
-        
-        return product_info
+        return extract_with_spec('meiros', soup, product_url, website_name)
         
     except Exception as e:
         print(f"Error extracting meiros product info: {e}")
@@ -2023,11 +2229,16 @@ def scrape_meiros_products_common(session, resume_from_index=0):
                 log_message(session, 'info', f'Processing product {idx + 1}/{len(product_urls)}: {product_url}')
                 
                 # Make request to product page
-                response = requests.get(product_url, headers=HEADERS, timeout=30)
+                page = fetch_page(product_url, headers=HEADERS)
+                archive_page(session, idx, product_url, page)
+                if page.unchanged:
+                    skip_unchanged_page(session, idx, page)
+                    continue
+                response = page.response
                 response.raise_for_status()
                 
                 # Parse HTML with BeautifulSoup
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = ProductPage(response.content)
                 
                 # Extract product information
                 product_info = extract_meiros_product_info(soup, product_url, session.website.name)
@@ -2037,6 +2248,8 @@ def scrape_meiros_products_common(session, resume_from_index=0):
                     log_message(session, 'warning', f'Failed to extract product info for: {product_url}')
                     continue
                 
+                product_info['last_seen_session'] = session
+                
                 # Save or update product in database
                 try:
                     # Try to get existing product by variant ID
@@ -2073,6 +2286,7 @@ def scrape_meiros_products_common(session, resume_from_index=0):
                                 raise create_error
                     
                     session.products_scraped += 1
+                    page.store()
                     
                     # Update session progress
                     session.last_processed_index = idx
@@ -2117,10 +2331,10 @@ def scrape_meiros_products_common(session, resume_from_index=0):
 
 def extract_legacyjudaica_product_info(soup, product_url, website_name):
     """
-    Extract product information from legacyjudaica.com product page HTML using BeautifulSoup
+    Extract product information from a legacyjudaica.com product page (EXTRACTION_SPECS['legacyjudaica'])
     
     Args:
-        soup: BeautifulSoup object of the product page
+        soup: ProductPage of the product page
         product_url: URL of the product page
         website_name: Name of the website
         
@@ -2128,76 +2342,7 @@ def extract_legacyjudaica_product_info(soup, product_url, website_name):
         dict: Product information dictionary
     """
     try:
-        # Extract title
-        title_elem = soup.find('div', class_='product-name')
-        title = ''
-        if title_elem:
-            h1_elem = title_elem.find('h1')
-            if h1_elem:
-                title = h1_elem.get_text(strip=True)
-        
-        # Extract price
-        price_elem = soup.find('div', class_='product-price')
-        price = ''
-        if price_elem:
-            price_span = price_elem.find('span', class_=lambda x: x and 'price-value' in x)
-            if price_span:
-                price_text = price_span.get_text(strip=True)
-                price = re.sub(r'[^\d\.]', '', price_text)
-        
-        # Extract SKU
-        sku_elem = soup.find('div', class_='sku')
-        sku = ''
-        if sku_elem:
-            value_span = sku_elem.find('span', class_='value')
-            if value_span:
-                sku = value_span.get_text(strip=True)
-        
-        # Extract vendor/manufacturer
-        vendor = ''
-        manufacturer_elem = soup.find('div', class_='manufacturers')
-        if manufacturer_elem:
-            value_span = manufacturer_elem.find('span', class_='value')
-            if value_span:
-                vendor_link = value_span.find('a')
-                if vendor_link:
-                    vendor = vendor_link.get_text(strip=True)
-        
-        # Extract description
-        description = ''
-        desc_elem = soup.find('div', class_='short-description')
-        if desc_elem:
-            description = desc_elem.get_text(strip=True)
-        
-        # Extract image link - find first product image
-        image_link = ''
-        # Try to find main product image
-        a_tag = soup.find('a', class_='picture-link')
-
-        # Get the data-full-image-url attribute
-        image_link = a_tag.get('data-full-image-url')
-        
-        # Generate unique product variant ID (using URL + SKU)
-        product_variant_id = f"{website_name}_{sku}" if sku else f"{website_name}_{hash(product_url)}"
-        
-        # Check if product is in stock (assume in stock if price exists)
-        in_stock = bool(price)
-        
-        product_info = {
-            'product_variant_id': product_variant_id,
-            'name': title,
-            'sku': sku,
-            'price': price,
-            'vendor': vendor,
-            'category': vendor,  # Use vendor as category since there's no separate category
-            'description': description,
-            'in_stock': in_stock,
-            'link': product_url,
-            'image_link': image_link,
-            'website': website_name
-        }
-        
-        return product_info
+        return extract_with_spec('legacyjudaica', soup, product_url, website_name)
         
     except Exception as e:
         print(f"Error extracting legacyjudaica product info: {e}")
@@ -2245,11 +2390,16 @@ def scrape_legacyjudaica_products_common(session, resume_from_index=0):
                 log_message(session, 'info', f'Processing product {idx + 1}/{len(product_urls)}: {product_url}')
                 
                 # Make request to product page
-                response = requests.get(product_url, headers=HEADERS, timeout=30)
+                page = fetch_page(product_url, headers=HEADERS)
+                archive_page(session, idx, product_url, page)
+                if page.unchanged:
+                    skip_unchanged_page(session, idx, page)
+                    continue
+                response = page.response
                 response.raise_for_status()
                 
                 # Parse HTML with BeautifulSoup
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = ProductPage(response.content)
                 
                 # Extract product information
                 product_info = extract_legacyjudaica_product_info(soup, product_url, session.website.name)
@@ -2259,6 +2409,8 @@ def scrape_legacyjudaica_products_common(session, resume_from_index=0):
                     log_message(session, 'warning', f'Failed to extract product info for: {product_url}')
                     continue
                 
+                product_info['last_seen_session'] = session
+                
                 # Save or update product in database
                 try:
                     # Try to get existing product by variant ID
@@ -2295,6 +2447,7 @@ def scrape_legacyjudaica_products_common(session, resume_from_index=0):
                                 raise create_error
                     
                     session.products_scraped += 1
+                    page.store()
                     
                     # Update session progress
                     session.last_processed_index = idx
@@ -2339,10 +2492,10 @@ def scrape_legacyjudaica_products_common(session, resume_from_index=0):
 
 def extract_simchonim_product_info(soup, product_url, website_name):
     """
-    Extract product information from simchonim.com product page HTML using BeautifulSoup
+    Extract product information from a simchonim.com product page (EXTRACTION_SPECS['simchonim'])
     
     Args:
-        soup: BeautifulSoup object of the product page
+        soup: ProductPage of the product page
         product_url: URL of the product page
         website_name: Name of the website
         
@@ -2350,57 +2503,10 @@ def extract_simchonim_product_info(soup, product_url, website_name):
         dict: Product information dictionary
     """
     try:
-        title_tag = soup.find('h1', class_='product_title entry-title')
-        title = title_tag.get_text(strip=True) if title_tag else None
-
-        # Description
-        desc_div = soup.find('div', class_='woocommerce-product-details__short-description')
-        description = desc_div.get_text(separator=' ', strip=True) if desc_div else None
-
-        # Price
-        price_span = soup.find('span', class_='woocommerce-Price-amount')
-        price = price_span.get_text(strip=True) if price_span else None
-
-        # SKU
-        sku_span = soup.find('span', class_='sku')
-        sku = sku_span.get_text(strip=True) if sku_span else None
-
-        # Image URL
-        image_div = soup.find('div', class_='woocommerce-product-gallery__image')
-        image_url = None
-        if image_div:
-            img_tag = image_div.find('img')
-            if img_tag and img_tag.get('src'):
-                image_url = img_tag['src']
-
-        
-        vendor = ''
-        
-        
-        # Generate unique product variant ID (using URL + SKU)
-        product_variant_id = f"{website_name}_{hash(product_url)}"
-        
-        # Check if product is in stock (assume in stock if price exists)
-        in_stock = bool(price)
-        
-        product_info = {
-            'product_variant_id': product_variant_id,
-            'name': title,
-            'sku': sku,
-            'price': price,
-            'vendor': vendor,
-            'category': vendor,  # Use vendor as category since there's no separate category
-            'description': description,
-            'in_stock': in_stock,
-            'link': product_url,
-            'image_link': image_url,
-            'website': website_name
-        }
-        
-        return product_info
+        return extract_with_spec('simchonim', soup, product_url, website_name)
         
     except Exception as e:
-        print(f"Error extracting legacyjudaica product info: {e}")
+        print(f"Error extracting simchonim product info: {e}")
         return None
 
 def scrape_simchonim_products_common(session, resume_from_index=0):
@@ -2445,11 +2551,16 @@ def scrape_simchonim_products_common(session, resume_from_index=0):
                 log_message(session, 'info', f'Processing product {idx + 1}/{len(product_urls)}: {product_url}')
                 
                 # Make request to product page
-                response = requests.get(product_url, headers=HEADERS, timeout=30)
+                page = fetch_page(product_url, headers=HEADERS)
+                archive_page(session, idx, product_url, page)
+                if page.unchanged:
+                    skip_unchanged_page(session, idx, page)
+                    continue
+                response = page.response
                 response.raise_for_status()
                 
                 # Parse HTML with BeautifulSoup
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = ProductPage(response.content)
                 
                 # Extract product information
                 product_info = extract_simchonim_product_info(soup, product_url, session.website.name)
@@ -2459,6 +2570,8 @@ def scrape_simchonim_products_common(session, resume_from_index=0):
                     log_message(session, 'warning', f'Failed to extract product info for: {product_url}')
                     continue
                 
+                product_info['last_seen_session'] = session
+                
                 # Save or update product in database
                 try:
                     # Try to get existing product by variant ID
@@ -2495,6 +2608,7 @@ def scrape_simchonim_products_common(session, resume_from_index=0):
                                 raise create_error
                     
                     session.products_scraped += 1
+                    page.store()
                     
                     # Update session progress
                     session.last_processed_index = idx
@@ -2539,10 +2653,10 @@ def scrape_simchonim_products_common(session, resume_from_index=0):
 
 def extract_mefoarjudaica_product_info(soup, product_url, website_name):
     """
-    Extract product information from mefoarjudaica.com product page HTML using BeautifulSoup
+    Extract product information from a mefoarjudaica.com product page (EXTRACTION_SPECS['mefoarjudaica'])
     
     Args:
-        soup: BeautifulSoup object of the product page
+        soup: ProductPage of the product page
         product_url: URL of the product page
         website_name: Name of the website
         
@@ -2550,79 +2664,10 @@ def extract_mefoarjudaica_product_info(soup, product_url, website_name):
         dict: Product information dictionary
     """
     try:
-        title_tag = soup.find('h1', class_='productView-title')
-        title = title_tag.get_text(strip=True) if title_tag else None
-
-        # Description
-        description = ''
-        desc_div = soup.find(id="tab-description-panel")
-        description = desc_div.get_text(separator=' ', strip=True) if desc_div else None
-
-        # Price
-        price_span = soup.find("span", class_="price price--withoutTax")
-        price = price_span.get_text(strip=True) if price_span else None
-
-        # SKU
-        sku_span = soup.find("dd", class_="productView-info-value", attrs={"data-product-sku": True})
-        sku = sku_span.get_text(strip=True) if sku_span else None
-
-
-        # Image URL
-        # From <img src="">
-        image_links = set()
-        image_urls  = []
-        for a in soup.find_all("a", href=True):
-            if a["href"].endswith((".png", ".jpg", ".jpeg", ".webp")):
-                image_links.add(a["href"])
-
-        # From <img src="">
-        for img in soup.find_all("img", src=True):
-            if img["src"].endswith((".png", ".jpg", ".jpeg", ".webp")):
-                image_links.add(img["src"])
-
-        # From <img data-lazy="">
-        for img in soup.find_all("img", {"data-lazy": True}):
-            if img["data-lazy"].endswith((".png", ".jpg", ".jpeg", ".webp")):
-                image_links.add(img["data-lazy"])
-        image_urls = list(image_links)
-
-        
-        category = ''
-        lis = soup.select("breadcrumbs li")
-
-        # Get second last li
-        second_last = lis[-2] if len(lis) > 2 else None
-
-        # Extract the text (strip spaces)
-        category = ''
-        if second_last:
-            category = second_last.get_text(strip=True)
-        
-        
-        # Generate unique product variant ID (using URL + SKU)
-        product_variant_id = f"{website_name}_{hash(product_url)}"
-        
-        # Check if product is in stock (assume in stock if price exists)
-        in_stock = bool(price)
-        
-        product_info = {
-            'product_variant_id': product_variant_id,
-            'name': title,
-            'sku': sku,
-            'price': price,
-            'vendor': '',
-            'category': category,  # Use vendor as category since there's no separate category
-            'description': description,
-            'in_stock': in_stock,
-            'link': product_url,
-            'image_link': ",".join(image_urls[:2]),
-            'website': website_name
-        }
-        
-        return product_info
+        return extract_with_spec('mefoarjudaica', soup, product_url, website_name)
         
     except Exception as e:
-        print(f"Error extracting legacyjudaica product info: {e}")
+        print(f"Error extracting mefoarjudaica product info: {e}")
         return None
 
 def scrape_mefoarjudaica_products_common(session, resume_from_index=0):
@@ -2667,11 +2712,16 @@ def scrape_mefoarjudaica_products_common(session, resume_from_index=0):
                 log_message(session, 'info', f'Processing product {idx + 1}/{len(product_urls)}: {product_url}')
                 
                 # Make request to product page
-                response = requests.get(product_url, headers=HEADERS, timeout=30)
+                page = fetch_page(product_url, headers=HEADERS)
+                archive_page(session, idx, product_url, page)
+                if page.unchanged:
+                    skip_unchanged_page(session, idx, page)
+                    continue
+                response = page.response
                 response.raise_for_status()
                 
                 # Parse HTML with BeautifulSoup
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = ProductPage(response.content)
                 
                 # Extract product information
                 product_info = extract_ozvehadar_product_info(soup, product_url, session.website.name)
@@ -2681,6 +2731,8 @@ def scrape_mefoarjudaica_products_common(session, resume_from_index=0):
                     log_message(session, 'warning', f'Failed to extract product info for: {product_url}')
                     continue
                 
+                product_info['last_seen_session'] = session
+                
                 # Save or update product in database
                 try:
                     # Try to get existing product by variant ID
@@ -2717,6 +2769,7 @@ def scrape_mefoarjudaica_products_common(session, resume_from_index=0):
                                 raise create_error
                     
                     session.products_scraped += 1
+                    page.store()
                     
                     # Update session progress
                     session.last_processed_index = idx
@@ -2794,7 +2847,7 @@ def extract_kaftorjudaica_product_info(product_url, website_name):
         
         
         # Generate unique product variant ID (using URL + SKU)
-        product_variant_id = f"{website_name}_{hash(product_url['link'])}"
+        product_variant_id = link_variant_id(website_name, product_url['link'])
         
         # Check if product is in stock (assume in stock if price exists)
         in_stock = bool(price)
@@ -2875,6 +2928,8 @@ def scrape_kaftorjudaica_products_common(session, resume_from_index=0):
                     log_message(session, 'warning', f'Failed to extract product info for: {product_url}')
                     continue
                 
+                product_info['last_seen_session'] = session
+                
                 # Save or update product in database
                 try:
                     # Try to get existing product by variant ID
@@ -2955,10 +3010,10 @@ def scrape_kaftorjudaica_products_common(session, resume_from_index=0):
 
 def extract_ozvehadar_product_info(soup, product_url, website_name):
     """
-    Extract product information from ozvehadar.us product page HTML using BeautifulSoup
+    Extract product information from a ozvehadar.us product page (EXTRACTION_SPECS['ozvehadar'])
     
     Args:
-        soup: BeautifulSoup object of the product page
+        soup: ProductPage of the product page
         product_url: URL of the product page
         website_name: Name of the website
         
@@ -2966,96 +3021,28 @@ def extract_ozvehadar_product_info(soup, product_url, website_name):
         dict: Product information dictionary
     """
     try:
-        title_tag = soup.find('h1', class_='productView-title')
-        title = title_tag.get_text(strip=True) if title_tag else None
-
-        # Description
-        description = ''
-        desc_div = soup.find(id="tab-description")
-        description = desc_div.get_text(separator=' ', strip=True) if desc_div else None
-
-        # Price
-        price_span = soup.find("span", class_="price price--withoutTax")
-        price = price_span.get_text(strip=True) if price_span else None
-
-        # SKU
-        sku_span = soup.find("dd", {"data-product-sku": True})
-        sku = sku_span.get_text(strip=True) if sku_span else None
-
-        # Image URL
-        # From <img src="">
-        image_links = set()
-        image_urls  = []
-        for a in soup.find_all("a", href=True):
-            if a["href"].endswith((".png", ".jpg", ".jpeg", ".webp")):
-                image_links.add(a["href"])
-
-        # From <img src="">
-        for img in soup.find_all("img", src=True):
-            if img["src"].endswith((".png", ".jpg", ".jpeg", ".webp")):
-                image_links.add(img["src"])
-
-        # From <img data-lazy="">
-        for img in soup.find_all("img", {"data-lazy": True}):
-            if img["data-lazy"].endswith((".png", ".jpg", ".jpeg", ".webp")):
-                image_links.add(img["data-lazy"])
-        image_urls = list(image_links)
-
+        return extract_with_spec('ozvehadar', soup, product_url, website_name)
         
-        category = ''
-        lis = soup.select("ol.breadcrumbs li")
-
-        # Get second last li
-        second_last = lis[-2] if len(lis) > 2 else None
+    except Exception as e:
+        print(f"Error extracting ozvehadar product info: {e}")
+        return None
 
-        # Extract the text (strip spaces)
-        category = ''
-        if second_last:
-            category = second_last.get_text(strip=True)
-        
+def scrape_ozvehadar_products_common(session, resume_from_index=0):
+    """
+    Custom scraping function for ozvehadar.us using BeautifulSoup
+    
+    Args:
+        session: ScrapingSession object
+        resume_from_index: Index to resume from (for resumption)
         
-        # Generate unique product variant ID (using URL + SKU)
-        product_variant_id = f"{website_name}_{hash(product_url)}"
-        
-        # Check if product is in stock (assume in stock if price exists)
-        in_stock = bool(price)
-        
-        product_info = {
-            'product_variant_id': product_variant_id,
-            'name': title,
-            'sku': sku,
-            'price': price,
-            'vendor': '',
-            'category': category,  # Use vendor as category since there's no separate category
-            'description': description,
-            'in_stock': in_stock,
-            'link': product_url,
-            'image_link': ",".join(image_urls[:2]),
-            'website': website_name
-        }
-        
-        return product_info
-        
-    except Exception as e:
-        print(f"Error extracting legacyjudaica product info: {e}")
-        return None
-
-def scrape_ozvehadar_products_common(session, resume_from_index=0):
-    """
-    Custom scraping function for ozvehadar.us using BeautifulSoup
-    
-    Args:
-        session: ScrapingSession object
-        resume_from_index: Index to resume from (for resumption)
-        
-    Returns:
-        dict: Scraping results
-    """
-    log_message(session, 'info', f'Starting custom HTML scraping for {session.website.name}')
-    
-    try:
-        # Get product URLs from sitemap
-        product_urls = load_ozvehadar_product_urls()
+    Returns:
+        dict: Scraping results
+    """
+    log_message(session, 'info', f'Starting custom HTML scraping for {session.website.name}')
+    
+    try:
+        # Get product URLs from sitemap
+        product_urls = load_ozvehadar_product_urls()
         
         if not product_urls:
             log_message(session, 'error', 'No product URLs found in sitemap')
@@ -3082,11 +3069,16 @@ def scrape_ozvehadar_products_common(session, resume_from_index=0):
                 log_message(session, 'info', f'Processing product {idx + 1}/{len(product_urls)}: {product_url}')
                 
                 # Make request to product page
-                response = requests.get(product_url, headers=HEADERS, timeout=30)
+                page = fetch_page(product_url, headers=HEADERS)
+                archive_page(session, idx, product_url, page)
+                if page.unchanged:
+                    skip_unchanged_page(session, idx, page)
+                    continue
+                response = page.response
                 response.raise_for_status()
                 
                 # Parse HTML with BeautifulSoup
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = ProductPage(response.content)
                 
                 # Extract product information
                 product_info = extract_ozvehadar_product_info(soup, product_url, session.website.name)
@@ -3096,6 +3088,8 @@ def scrape_ozvehadar_products_common(session, resume_from_index=0):
                     log_message(session, 'warning', f'Failed to extract product info for: {product_url}')
                     continue
                 
+                product_info['last_seen_session'] = session
+                
                 # Save or update product in database
                 try:
                     # Try to get existing product by variant ID
@@ -3132,6 +3126,7 @@ def scrape_ozvehadar_products_common(session, resume_from_index=0):
                                 raise create_error
                     
                     session.products_scraped += 1
+                    page.store()
                     
                     # Update session progress
                     session.last_processed_index = idx
@@ -3176,10 +3171,10 @@ def scrape_ozvehadar_products_common(session, resume_from_index=0):
 
 def extract_craftsandmore_product_info(soup, product_url, website_name):
     """
-    Extract product information from craftsandmore.com product page HTML using BeautifulSoup
+    Extract product information from a craftsandmore.com product page (EXTRACTION_SPECS['craftsandmore'])
     
     Args:
-        soup: BeautifulSoup object of the product page
+        soup: ProductPage of the product page
         product_url: URL of the product page
         website_name: Name of the website
         
@@ -3187,68 +3182,10 @@ def extract_craftsandmore_product_info(soup, product_url, website_name):
         dict: Product information dictionary
     """
     try:
-        title_tag = soup.select_one("h1.product_title.entry-title.wd-entities-title")
-        title = title_tag.get_text(strip=True) if title_tag else None
-
-        # Description
-        description = ''
-        desc_div = soup.find("div", class_=["markdown", "prose", "dark:prose-invert", "w-full", "break-words", "light"])
-        description = desc_div.get_text(separator=' ', strip=True) if desc_div else None
-
-        # Price
-        price_span = soup.find("p", class_="price")
-        price = price_span.get_text(strip=True) if price_span else None
-
-        # SKU
-        sku_span = soup.find("span", class_="sku_wrapper")
-        sku = sku_span.get_text(strip=True) if sku_span else None
-        sku = sku.replace('Item# ', '').strip()
-
-        
-
-        # Image URL
-        fig = soup.select_one('figure.woocommerce-product-gallery__image')
-        image_link = ''
-
-        if fig:
-            a_tag = fig.find('a')
-            if a_tag and a_tag.get('href'):
-                image_link = a_tag['href']
-
-        
-
-        category = ''
-        # find all <a> tags inside the breadcrumb nav
-        links = soup.select("nav.woocommerce-breadcrumb a")
-
-        # get second last link text
-        if len(links) >= 2:
-            category = links[-1].get_text(strip=True)
-            
-        # Generate unique product variant ID (using URL + SKU)
-        product_variant_id = f"{website_name}_{hash(product_url)}"
-        
-        # Check if product is in stock (assume in stock if price exists)
-        in_stock = bool(price)
-        
-        product_info = {
-            'product_variant_id': product_variant_id,
-            'name': title,
-            'sku': sku,
-            'price': price,
-            'vendor': '',
-            'category': category,  # Use vendor as category since there's no separate category
-            'description': description,
-            'in_stock': in_stock,
-            'link': product_url,
-            'image_link': image_link,
-            'website': website_name
-        }
-        
-        return product_info
+        return extract_with_spec('craftsandmore', soup, product_url, website_name)
         
     except Exception as e:
-        print(f"Error extracting legacyjudaica product info: {e}")
+        print(f"Error extracting craftsandmore product info: {e}")
         return None
 
 def scrape_craftsandmore_products_common(session, resume_from_index=0):
@@ -3293,11 +3230,16 @@ def scrape_craftsandmore_products_common(session, resume_from_index=0):
                 log_message(session, 'info', f'Processing product {idx + 1}/{len(product_urls)}: {product_url}')
                 
                 # Make request to product page
-                response = requests.get(product_url, headers=HEADERS, timeout=30)
+                page = fetch_page(product_url, headers=HEADERS)
+                archive_page(session, idx, product_url, page)
+                if page.unchanged:
+                    skip_unchanged_page(session, idx, page)
+                    continue
+                response = page.response
                 response.raise_for_status()
                 
                 # Parse HTML with BeautifulSoup
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = ProductPage(response.content)
                 
                 # Extract product information
                 product_info = extract_craftsandmore_product_info(soup, product_url, session.website.name)
@@ -3307,6 +3249,8 @@ def scrape_craftsandmore_products_common(session, resume_from_index=0):
                     log_message(session, 'warning', f'Failed to extract product info for: {product_url}')
                     continue
                 
+                product_info['last_seen_session'] = session
+                
                 # Save or update product in database
                 try:
                     # Try to get existing product by variant ID
@@ -3343,6 +3287,7 @@ def scrape_craftsandmore_products_common(session, resume_from_index=0):
                                 raise create_error
                     
                     session.products_scraped += 1
+                    page.store()
                     
                     # Update session progress
                     session.last_processed_index = idx
@@ -3387,10 +3332,10 @@ def scrape_craftsandmore_products_common(session, resume_from_index=0):
 
 def extract_zionjudaica_product_info(soup, product_url, website_name):
     """
-    Extract product information from zionjudaica.com product page HTML using BeautifulSoup
+    Extract product information from a zionjudaica.com product page (EXTRACTION_SPECS['zionjudaica'])
     
     Args:
-        soup: BeautifulSoup object of the product page
+        soup: ProductPage of the product page
         product_url: URL of the product page
         website_name: Name of the website
         
@@ -3398,61 +3343,10 @@ def extract_zionjudaica_product_info(soup, product_url, website_name):
         dict: Product information dictionary
     """
     try:
-
-
-
-        title_tag = soup.select_one("h1.fusion-title-heading")
-        title = title_tag.get_text(strip=True) if title_tag else None
-
-        # Description
-        description = ''
-        desc_div = soup.select_one("#productContent p")
-        description = desc_div.get_text(strip=True) if desc_div else None
-
-        # Price
-        
-        
-        price = (soup.select_one("p.price ins bdi") or soup.select_one("p.price bdi")).get_text(strip=True)
-
-        # SKU
-        sku_span = soup.select_one(".sku")
-        sku = sku_span.get_text(strip=True) if sku_span else None
-
-        
-
-        # Image URL
-        image_link = ''
-
-        image = soup.select_one(".woocommerce-product-gallery__image a[href]")
-        image_link = image["href"] if image else ''
-
-        
-
-        category = soup.select("ol.awb-breadcrumb-list li a span")[-1].get_text(strip=True)
-        # Generate unique product variant ID (using URL + SKU)
-        product_variant_id = f"{website_name}_{hash(product_url)}"
-        
-        # Check if product is in stock (assume in stock if price exists)
-        in_stock = bool(price)
-        
-        product_info = {
-            'product_variant_id': product_variant_id,
-            'name': title,
-            'sku': sku,
-            'price': price,
-            'vendor': '',
-            'category': category,  # Use vendor as category since there's no separate category
-            'description': description,
-            'in_stock': in_stock,
-            'link': product_url,
-            'image_link': image_link,
-            'website': website_name
-        }
-        
-        return product_info
+        return extract_with_spec('zionjudaica', soup, product_url, website_name)
         
     except Exception as e:
-        print(f"Error extracting legacyjudaica product info: {e}")
+        print(f"Error extracting zionjudaica product info: {e}")
         return None
 
 def scrape_zionjudaica_products_common(session, resume_from_index=0):
@@ -3497,11 +3391,16 @@ def scrape_zionjudaica_products_common(session, resume_from_index=0):
                 log_message(session, 'info', f'Processing product {idx + 1}/{len(product_urls)}: {product_url}')
                 
                 # Make request to product page
-                response = requests.get(product_url, headers=HEADERS, timeout=30)
+                page = fetch_page(product_url, headers=HEADERS)
+                archive_page(session, idx, product_url, page)
+                if page.unchanged:
+                    skip_unchanged_page(session, idx, page)
+                    continue
+                response = page.response
                 response.raise_for_status()
                 
                 # Parse HTML with BeautifulSoup
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = ProductPage(response.content)
                 
                 # Extract product information
                 product_info = extract_zionjudaica_product_info(soup, product_url, session.website.name)
@@ -3511,6 +3410,8 @@ def scrape_zionjudaica_products_common(session, resume_from_index=0):
                     log_message(session, 'warning', f'Failed to extract product info for: {product_url}')
                     continue
                 
+                product_info['last_seen_session'] = session
+                
                 # Save or update product in database
                 try:
                     # Try to get existing product by variant ID
@@ -3547,6 +3448,7 @@ def scrape_zionjudaica_products_common(session, resume_from_index=0):
                                 raise create_error
                     
                     session.products_scraped += 1
+                    page.store()
                     
                     # Update session progress
                     session.last_processed_index = idx
@@ -3594,17 +3496,9 @@ def scrape_zionjudaica_products_common(session, resume_from_index=0):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_ezpekalach(self, session_id, resume_from_page=1):
     """Scraper for ezpekalach.com with queue management"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_ezpekalach.apply_async(
-            args=[session_id, resume_from_page],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_ezpekalach, session_id, resume_from_page)
     
     website_config = {
         'base_url': 'ezpekalach.com',
@@ -3614,17 +3508,9 @@ def scrape_ezpekalach(self, session_id, resume_from_page=1):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_alef_to_tav_collection(self, session_id, resume_from_page=1):
     """Scraper for alef-to-tav Collection with queue management"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_alef_to_tav_collection.apply_async(
-            args=[session_id, resume_from_page],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_alef_to_tav_collection, session_id, resume_from_page)
     
     website_config = {
         'base_url': 'alef-to-tav.com',
@@ -3635,17 +3521,9 @@ def scrape_alef_to_tav_collection(self, session_id, resume_from_page=1):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_chazakkinder_collection(self, session_id, resume_from_page=1):
     """Scraper for chazakkinder Collection with queue management"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_chazakkinder_collection.apply_async(
-            args=[session_id, resume_from_page],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_chazakkinder_collection, session_id, resume_from_page)
     
     website_config = {
         'base_url': 'www.chazakkinder.com',
@@ -3656,17 +3534,9 @@ def scrape_chazakkinder_collection(self, session_id, resume_from_page=1):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_thekoshercook_collection(self, session_id, resume_from_page=1):
     """Scraper for thekoshercook Collection with queue management"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_thekoshercook_collection.apply_async(
-            args=[session_id, resume_from_page],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_thekoshercook_collection, session_id, resume_from_page)
     
     website_config = {
         'base_url': 'www.thekoshercook.com',
@@ -3677,17 +3547,9 @@ def scrape_thekoshercook_collection(self, session_id, resume_from_page=1):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_waterdale_collection(self, session_id, resume_from_page=1):
     """Scraper for Waterdale Collection with queue management"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_waterdale_collection.apply_async(
-            args=[session_id, resume_from_page],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_waterdale_collection, session_id, resume_from_page)
     
     website_config = {
         'base_url': 'waterdalecollection.com',
@@ -3698,17 +3560,9 @@ def scrape_waterdale_collection(self, session_id, resume_from_page=1):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_nermitzvah(self, session_id, resume_from_page=1):
     """Scraper for Waterdale Collection with queue management"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_nermitzvah.apply_async(
-            args=[session_id, resume_from_page],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_nermitzvah, session_id, resume_from_page)
     
     website_config = {
         'base_url': 'www.nermitzvah.com',
@@ -3719,17 +3573,9 @@ def scrape_nermitzvah(self, session_id, resume_from_page=1):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_menuchapublishers(self, session_id, resume_from_page=1):
     """Scraper for Menucha Publishers with queue management"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_menuchapublishers.apply_async(
-            args=[session_id, resume_from_page],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_menuchapublishers, session_id, resume_from_page)
     
     website_config = {
         'base_url': 'menuchapublishers.com',
@@ -3740,17 +3586,9 @@ def scrape_menuchapublishers(self, session_id, resume_from_page=1):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_btshalom(self, session_id, resume_from_page=1):
     """Scraper for BT Shalom with queue management"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_btshalom.apply_async(
-            args=[session_id, resume_from_page],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_btshalom, session_id, resume_from_page)
     
     website_config = {
         'base_url': 'btshalom.com',
@@ -3761,17 +3599,9 @@ def scrape_btshalom(self, session_id, resume_from_page=1):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_malchutjudaica(self, session_id, resume_from_page=1):
     """Scraper for Malchut Judaica with queue management"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_malchutjudaica.apply_async(
-            args=[session_id, resume_from_page],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_malchutjudaica, session_id, resume_from_page)
     
     website_config = {
         'base_url': 'malchutjudaica.com',
@@ -3782,17 +3612,9 @@ def scrape_malchutjudaica(self, session_id, resume_from_page=1):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_feldart(self, session_id, resume_from_page=1):
     """Scraper for Feldart with queue management"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_feldart.apply_async(
-            args=[session_id, resume_from_page],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_feldart, session_id, resume_from_page)
     
     website_config = {
         'base_url': 'feldart.com',
@@ -3803,17 +3625,9 @@ def scrape_feldart(self, session_id, resume_from_page=1):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_colourscrafts(self, session_id, resume_from_page=1):
     """Scraper for Feldart with queue management"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_colourscrafts.apply_async(
-            args=[session_id, resume_from_page],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_colourscrafts, session_id, resume_from_page)
     
     website_config = {
         'base_url': 'colourscrafts.com',
@@ -3824,17 +3638,9 @@ def scrape_colourscrafts(self, session_id, resume_from_page=1):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_israelbookshoppublications(self, session_id, resume_from_page=1):
     """Scraper for israelbookshoppublications with queue management"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_feldart.apply_async(
-            args=[session_id, resume_from_page],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_feldart, session_id, resume_from_page)
     
     website_config = {
         'base_url': 'israelbookshoppublications.com',
@@ -3846,17 +3652,9 @@ def scrape_israelbookshoppublications(self, session_id, resume_from_page=1):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_judaicapress(self, session_id, resume_from_page=1):
     """Scraper for judaicapress with queue management"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_feldart.apply_async(
-            args=[session_id, resume_from_page],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_feldart, session_id, resume_from_page)
     
     website_config = {
         'base_url': 'judaicapress.com',
@@ -3867,17 +3665,9 @@ def scrape_judaicapress(self, session_id, resume_from_page=1):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_hausdecornj(self, session_id, resume_from_page=1):
     """Scraper for hausdecornj with queue management"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_feldart.apply_async(
-            args=[session_id, resume_from_page],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_feldart, session_id, resume_from_page)
     
     website_config = {
         'base_url': 'hausdecornj.com',
@@ -3889,17 +3679,9 @@ def scrape_hausdecornj(self, session_id, resume_from_page=1):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_majesticgiftware(self, session_id, resume_from_page=1):
     """Scraper for majesticgiftware with queue management"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_feldart.apply_async(
-            args=[session_id, resume_from_page],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_feldart, session_id, resume_from_page)
     
     website_config = {
         'base_url': 'majesticgiftware.com',
@@ -3910,17 +3692,9 @@ def scrape_majesticgiftware(self, session_id, resume_from_page=1):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_sephardicwarehouse(self, session_id, resume_from_page=1):
     """Scraper for sephardicwarehouse with queue management"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_feldart.apply_async(
-            args=[session_id, resume_from_page],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_feldart, session_id, resume_from_page)
     
     website_config = {
         'base_url': 'sephardicwarehouse.com',
@@ -3931,17 +3705,9 @@ def scrape_sephardicwarehouse(self, session_id, resume_from_page=1):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_torahjudaica(self, session_id, resume_from_page=1):
     """Scraper for torahjudaica with queue management"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_feldart.apply_async(
-            args=[session_id, resume_from_page],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_feldart, session_id, resume_from_page)
     
     website_config = {
         'base_url': 'torahjudaica.com',
@@ -3952,17 +3718,9 @@ def scrape_torahjudaica(self, session_id, resume_from_page=1):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_gramcoschoolsupplies(self, session_id, resume_from_page=1):
     """Scraper for gramcoschoolsupplies with queue management"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_gramcoschoolsupplies.apply_async(
-            args=[session_id, resume_from_page],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_gramcoschoolsupplies, session_id, resume_from_page)
     
     website_config = {
         'base_url': 'www.gramcoschoolsupplies.com',
@@ -3973,17 +3731,9 @@ def scrape_gramcoschoolsupplies(self, session_id, resume_from_page=1):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_davidjudaica(self, session_id, resume_from_page=1):
     """Scraper for davidjudaica.shop with queue management"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_davidjudaica.apply_async(
-            args=[session_id, resume_from_page],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_davidjudaica, session_id, resume_from_page)
     
     website_config = {
         'base_url': 'www.davidjudaica.shop',
@@ -3994,17 +3744,9 @@ def scrape_davidjudaica(self, session_id, resume_from_page=1):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_classictouchdecor(self, session_id, resume_from_page=1):
     """Scraper for classictouchdecor.com with queue management"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_classictouchdecor.apply_async(
-            args=[session_id, resume_from_page],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_classictouchdecor, session_id, resume_from_page)
     
     website_config = {
         'base_url': 'www.classictouchdecor.com',
@@ -4016,17 +3758,9 @@ def scrape_classictouchdecor(self, session_id, resume_from_page=1):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_meiros(self, session_id, resume_from_index=0):
     """Custom scraper for meiros.com with queue management and BeautifulSoup"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_meiros.apply_async(
-            args=[session_id, resume_from_index],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_meiros, session_id, resume_from_index)
     
     website_config = {
         'scraper_type': 'meiros',
@@ -4038,17 +3772,9 @@ def scrape_meiros(self, session_id, resume_from_index=0):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_ritelite(self, session_id, resume_from_index=0):
     """Custom scraper for ritelite.com with queue management and BeautifulSoup"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_ritelite.apply_async(
-            args=[session_id, resume_from_index],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_ritelite, session_id, resume_from_index)
     
     website_config = {
         'scraper_type': 'ritelite',
@@ -4060,17 +3786,9 @@ def scrape_ritelite(self, session_id, resume_from_index=0):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_shaijudaica(self, session_id, resume_from_index=0):
     """Custom scraper for shaijudaica.co.il with queue management and BeautifulSoup"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_shaijudaica.apply_async(
-            args=[session_id, resume_from_index],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_shaijudaica, session_id, resume_from_index)
     
     website_config = {
         'scraper_type': 'shaijudaica',
@@ -4082,17 +3800,9 @@ def scrape_shaijudaica(self, session_id, resume_from_index=0):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_jewisheducationaltoys(self, session_id, resume_from_index=0):
     """Custom scraper for jewisheducationaltoys.com with queue management and BeautifulSoup"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_jewisheducationaltoys.apply_async(
-            args=[session_id, resume_from_index],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_jewisheducationaltoys, session_id, resume_from_index)
     
     website_config = {
         'scraper_type': 'jewisheducationaltoys',
@@ -4104,17 +3814,9 @@ def scrape_jewisheducationaltoys(self, session_id, resume_from_index=0):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_legacyjudaica(self, session_id, resume_from_index=0):
     """Custom scraper for legacyjudaica.com with queue management and BeautifulSoup"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_legacyjudaica.apply_async(
-            args=[session_id, resume_from_index],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_legacyjudaica, session_id, resume_from_index)
     
     website_config = {
         'scraper_type': 'legacyjudaica',
@@ -4126,17 +3828,9 @@ def scrape_legacyjudaica(self, session_id, resume_from_index=0):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_simchonim(self, session_id, resume_from_index=0):
     """Custom scraper for simchonim.com with queue management and BeautifulSoup"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_simchonim.apply_async(
-            args=[session_id, resume_from_index],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_simchonim, session_id, resume_from_index)
     
     website_config = {
         'scraper_type': 'simchonim',
@@ -4148,17 +3842,9 @@ def scrape_simchonim(self, session_id, resume_from_index=0):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_kaftorjudaica(self, session_id, resume_from_index=0):
     """Custom scraper for kaftorjudaica.com with queue management and BeautifulSoup"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_kaftorjudaica.apply_async(
-            args=[session_id, resume_from_index],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_kaftorjudaica, session_id, resume_from_index)
     
     website_config = {
         'scraper_type': 'kaftorjudaica',
@@ -4169,17 +3855,9 @@ def scrape_kaftorjudaica(self, session_id, resume_from_index=0):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_mefoarjudaica(self, session_id, resume_from_index=0):
     """Custom scraper for mefoarjudaica.com with queue management and BeautifulSoup"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_mefoarjudaica.apply_async(
-            args=[session_id, resume_from_index],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_mefoarjudaica, session_id, resume_from_index)
     
     website_config = {
         'scraper_type': 'mefoarjudaica',
@@ -4191,17 +3869,9 @@ def scrape_mefoarjudaica(self, session_id, resume_from_index=0):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_ozvehadar(self, session_id, resume_from_index=0):
     """Custom scraper for ozvehadar.us with queue management and BeautifulSoup"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_ozvehadar.apply_async(
-            args=[session_id, resume_from_index],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_ozvehadar, session_id, resume_from_index)
     
     website_config = {
         'scraper_type': 'ozvehadar',
@@ -4213,17 +3883,9 @@ def scrape_ozvehadar(self, session_id, resume_from_index=0):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_craftsandmore(self, session_id, resume_from_index=0):
     """Custom scraper for craftsandmore.com with queue management and BeautifulSoup"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_craftsandmore.apply_async(
-            args=[session_id, resume_from_index],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_craftsandmore, session_id, resume_from_index)
     
     website_config = {
         'scraper_type': 'craftsandmore',
@@ -4235,17 +3897,9 @@ def scrape_craftsandmore(self, session_id, resume_from_index=0):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_zionjudaica(self, session_id, resume_from_index=0):
     """Custom scraper for zionjudaica.com with queue management and BeautifulSoup"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_zionjudaica.apply_async(
-            args=[session_id, resume_from_index],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_zionjudaica, session_id, resume_from_index)
     
     website_config = {
         'scraper_type': 'zionjudaica',
@@ -4257,17 +3911,9 @@ def scrape_zionjudaica(self, session_id, resume_from_index=0):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_toys4u(self, session_id, resume_from_index=0):
     """Custom scraper for toys4u.com with queue management and BeautifulSoup"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_toys4u.apply_async(
-            args=[session_id, resume_from_index],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_toys4u, session_id, resume_from_index)
     
     website_config = {
         'scraper_type': 'toys4u',
@@ -4279,17 +3925,9 @@ def scrape_toys4u(self, session_id, resume_from_index=0):
 @shared_task(bind=True, soft_time_limit=7200, time_limit=7260)
 def scrape_feldheim(self, session_id, resume_from_index=0):
     """Custom scraper for feldheim.com with queue management and BeautifulSoup"""
-    # Check if we can start (max 2 concurrent scrapers)
+    # Check if we can start (max SCRAPER_MAX_CONCURRENT concurrent scrapers)
     if not can_start_scraper():
-        session = ScrapingSession.objects.get(id=session_id)
-        log_message(session, 'info', 'Scraper queued - waiting for available slot (max 2 concurrent scrapers)')
-        
-        # Retry after 30 seconds
-        scrape_feldheim.apply_async(
-            args=[session_id, resume_from_index],
-            countdown=30
-        )
-        return {'status': 'queued', 'message': 'Waiting for available scraper slot'}
+        return requeue_until_slot_free(scrape_feldheim, session_id, resume_from_index)
     
     website_config = {
         'scraper_type': 'feldheim',
@@ -4308,10 +3946,11 @@ logger = logging.getLogger(__name__)
              soft_time_limit=120, time_limit=180)
 def recover_stuck_sessions_task(self):
     """
-    Periodic Celery Beat task: runs every 5 minutes to recover stuck scraping sessions.
+    Periodic Celery Beat task: runs every minute to recover stuck scraping sessions.
 
     A session is considered stuck if:
     - Its Celery task is dead (FAILURE / REVOKED / SUCCESS) but the DB still shows running/pending
+    - Its Celery task is STARTED but its heartbeat expired (the worker died)
     - Its Celery task is PENDING and the session has been in that state for > 15 minutes
       (indicates the worker died while processing it)
     - Its ScrapingState.is_running=True but there is no valid current_session
@@ -4326,6 +3965,759 @@ def recover_stuck_sessions_task(self):
         return {'status': 'error', 'message': str(e)}
 
 
+# ==================== RE-EXTRACTION FROM THE PAGE ARCHIVE ====================
+
+# Extractors that parse an archived product page (kaftorjudaica builds its
+# products from listing data and has no pages in the archive)
+ARCHIVE_EXTRACTORS = {
+    'feldheim': extract_feldheim_product_info,
+    'toys4u': extract_toys4u_product_info,
+    'jewisheducationaltoys': extract_jewisheducationaltoys_product_info,
+    'ritelite': extract_ritelite_product_info,
+    'shaijudaica': extract_shaijudaica_product_info,
+    'meiros': extract_meiros_product_info,
+    'legacyjudaica': extract_legacyjudaica_product_info,
+    'simchonim': extract_simchonim_product_info,
+    'mefoarjudaica': extract_mefoarjudaica_product_info,
+    'ozvehadar': extract_ozvehadar_product_info,
+    'craftsandmore': extract_craftsandmore_product_info,
+    'zionjudaica': extract_zionjudaica_product_info,
+}
+
+
+def get_archive_extractor(website):
+    """Extractor for a website's archived pages, or None if it has none"""
+    scraper_function = (website.scraper_function or '').lower()
+    for scraper_type, extractor in ARCHIVE_EXTRACTORS.items():
+        if scraper_type in scraper_function:
+            return extractor
+    return None
+
+
+def save_extracted_product(product_info):
+    """
+    Create or update a product by its variant ID
+
+    Returns:
+        bool: True if the product was created, False if it was updated
+    """
+    try:
+        product = Product.objects.get(product_variant_id=product_info['product_variant_id'])
+    except Product.DoesNotExist:
+        Product.objects.create(**product_info)
+        return True
+
+    for key, value in product_info.items():
+        if key not in ['website']:
+            setattr(product, key, value)
+    product.save()
+    return False
+
+
+@shared_task(bind=True, soft_time_limit=1800, time_limit=1860)
+def scrape_from_archive(self, session_id):
+    """
+    Re-run extraction over the pages archived by an earlier session, reading
+    them from disk instead of the network. resume_data of the session names
+    the source session ('reextracted_from_session').
+    """
+    from .page_archive import read_blob
+
+    session = ScrapingSession.objects.get(id=session_id)
+    source_session_id = session.resume_data.get('reextracted_from_session')
+
+    session.status = 'running'
+    session.celery_task_id = self.request.id
+    session.save()
+
+    try:
+        extractor = get_archive_extractor(session.website)
+        if extractor is None:
+            raise ValueError(f'{session.website.name} has no archived page extractor')
+
+        pages = ArchivedPage.objects.filter(session_id=source_session_id).order_by('position')
+        session.total_products_found = pages.count()
+        session.save()
+        log_message(session, 'info', f'Re-extracting {session.total_products_found} archived pages from session #{source_session_id}')
+
+        for idx, archived in enumerate(pages.iterator()):
+            try:
+                soup = ProductPage(read_blob(archived.content_hash))
+                product_info = extractor(soup, archived.source, session.website.name)
+
+                if not product_info:
+                    session.products_failed += 1
+                    log_message(session, 'warning', f'Failed to extract product info for: {archived.url}',
+                                product_url=archived.url)
+                    continue
+
+                if save_extracted_product(product_info):
+                    session.products_created += 1
+                else:
+                    session.products_updated += 1
+                session.products_scraped += 1
+
+            except Exception as page_error:
+                session.products_failed += 1
+                log_message(session, 'error', f'Error re-extracting {archived.url}: {str(page_error)}',
+                            product_url=archived.url, exception_details=traceback.format_exc())
+
+            finally:
+                # Progress every 50 pages; no per-page delay to pace a save against
+                if idx % 50 == 0:
+                    session.last_processed_index = idx
+                    session.last_processed_url = archived.url
+                    session.save()
+
+        session.status = 'completed'
+        session.completed_at = timezone.now()
+        session.save()
+        log_message(session, 'info',
+                    f'Re-extraction completed! Total: {session.total_products_found}, '
+                    f'Scraped: {session.products_scraped}, '
+                    f'Created: {session.products_created}, '
+                    f'Updated: {session.products_updated}, '
+                    f'Failed: {session.products_failed}')
+        return {'status': 'completed', 'scraped': session.products_scraped, 'failed': session.products_failed}
+
+    except Exception as e:
+        session.status = 'failed'
+        session.completed_at = timezone.now()
+        session.save()
+        log_message(session, 'error', f'Re-extraction failed: {str(e)}', exception_details=traceback.format_exc())
+        return {'status': 'failed', 'message': str(e)}
+
+
+@shared_task(bind=True, soft_time_limit=1800, time_limit=1860)
+def prune_page_archive_task(self):
+    """Daily Beat task: drop archived pages of old sessions and unreferenced blobs"""
+    from .page_archive import prune_page_archive
+    rows_deleted, blobs_deleted = prune_page_archive()
+    logger.info(f"[PageArchive] Pruned {rows_deleted} index row(s) and {blobs_deleted} blob(s)")
+    return {'status': 'ok', 'rows_deleted': rows_deleted, 'blobs_deleted': blobs_deleted}
+
+
+# ==================== CHUNKED CRAWLS ====================
+
+# Full runs of big custom crawls fan out over the scraping workers: the
+# product URLs are split into crawl_chunk tasks (a chord whose callback,
+# finalize_chunked_crawl, completes the session), so any idle worker can
+# take a chunk and no task runs into the 2 hour limit. Requests to a vendor
+# stay CRAWL_DOMAIN_INTERVAL seconds apart across the whole cluster
+# (rate_limit.py) in place of each loop's random 5-15 s delay. As chunks of
+# one vendor share its request slots, at most CHUNKED_CRAWL_CONCURRENCY of
+# them run at a time; the others wait in the queue (see chunk_may_start).
+CHUNKED_CRAWL_LOADERS = {
+    'feldheim': load_feldheim_xml_data,
+    'toys4u': load_toys4u_products_urls,
+    'jewisheducationaltoys': load_jewisheducationaltoys_sitemap_product_urls,
+    'ritelite': load_ritelite_product_urls,
+    'shaijudaica': load_shaijudaica_product_urls,
+    'meiros': load_meiros_sitemap_product_urls,
+    'legacyjudaica': load_legacyjudaica_sitemap_product_urls,
+    'simchonim': load_simchonim_sitemap_product_urls,
+    'mefoarjudaica': load_mefoarjudaica_product_urls,
+    'ozvehadar': load_ozvehadar_product_urls,
+    'craftsandmore': load_craftsandmore_product_urls,
+    'zionjudaica': get_zionjudaica_urls,
+}
+CRAWL_CHUNK_SIZE = 100
+# Websites with fewer products keep crawling in a single task
+CHUNKED_CRAWL_MIN_PRODUCTS = 500
+CRAWL_DOMAIN_INTERVAL = 10  # seconds, the mean of the single-task delay
+# Two, so the next chunk is already fetching when one ends; more would only
+# split the vendor's request slots further and hold workers that sleep
+CHUNKED_CRAWL_CONCURRENCY = 2
+CHUNK_WAIT_COUNTDOWN = 30  # seconds before a waiting chunk checks its turn again
+# Twice the time a chunk needs for its share of the vendor's request slots
+CRAWL_CHUNK_TIME_LIMIT = 2 * CRAWL_CHUNK_SIZE * CRAWL_DOMAIN_INTERVAL * CHUNKED_CRAWL_CONCURRENCY
+# Session counters are written every this many pages of a chunk
+CHUNK_PROGRESS_EVERY = 10
+
+
+def use_chunked_crawl(session, scraper_type, resume_from_index=0):
+    """Whether a custom scrape runs as chunk tasks (fresh full runs of big websites)"""
+    return (
+        scraper_type in CHUNKED_CRAWL_LOADERS
+        and session.scrape_mode == 'full'
+        and resume_from_index == 0
+        and Product.objects.filter(website=session.website.name).count() >= CHUNKED_CRAWL_MIN_PRODUCTS
+    )
+
+
+def start_chunked_crawl(session, scraper_type):
+    """
+    Load the product URLs and dispatch them as a chord of crawl_chunk tasks.
+    
+    Task IDs are assigned up front and stored in session.resume_data
+    ['chunked'] before dispatch, so stop and recovery can follow the chunks;
+    session.celery_task_id points at the finalize callback.
+    
+    Returns:
+        dict: {'status': 'chunked', ...}, or a failed result if no URLs were found
+    """
+    from celery import chord
+    from celery.utils import uuid
+    
+    product_urls = CHUNKED_CRAWL_LOADERS[scraper_type]()
+    if not product_urls:
+        log_message(session, 'error', 'No product URLs found in sitemap')
+        return {'status': 'failed', 'message': 'No product URLs found in sitemap'}
+    
+    starts = list(range(0, len(product_urls), CRAWL_CHUNK_SIZE))
+    chunk_ids = [uuid() for _ in starts]
+    finalize_id = uuid()
+    queue = session.dispatch_queue or 'scraping'
+    
+    session.total_products_found = len(product_urls)
+    session.celery_task_id = finalize_id
+    session.resume_data = {
+        **session.resume_data,
+        'chunked': {'chunks': len(starts), 'chunk_size': CRAWL_CHUNK_SIZE, 'task_ids': chunk_ids},
+    }
+    session.save()
+    
+    header = [
+        crawl_chunk.s(session.id, scraper_type, start, product_urls[start:start + CRAWL_CHUNK_SIZE]).set(
+            task_id=chunk_id, queue=queue
+        )
+        for start, chunk_id in zip(starts, chunk_ids)
+    ]
+    chord(header)(finalize_chunked_crawl.s(session.id).set(task_id=finalize_id, queue='default'))
+    
+    log_message(session, 'info', f'Found {len(product_urls)} product URLs; crawling them as {len(starts)} '
+                f'chunks of {CRAWL_CHUNK_SIZE} on the {queue} queue')
+    return {'status': 'chunked', 'chunks': len(starts), 'total_found': len(product_urls)}
+
+
+def fetch_product_page(product_url, get=None):
+    """Conditional GET of a product page, as the scrape_<site>_products_common loops do it"""
+    link = product_url['link'] if isinstance(product_url, dict) else product_url
+    if get is not None:
+        return fetch_page(link, get=get, timeout=None)
+    return fetch_page(link, headers=HEADERS)
+
+
+def crawl_product_url(session, idx, product_url, scraper_type, get=None):
+    """
+    Fetch, extract and save one product page of a chunked crawl.
+    
+    The chunk counterpart of one iteration of the scrape_<site>_products_common
+    loops, except that the session is not saved here (chunks run in parallel
+    and add their counts with F() expressions).
+    
+    Returns:
+        str: 'created', 'updated', 'unchanged' or 'failed'
+    """
+    page = fetch_product_page(product_url, get=get)
+    return save_crawled_page(session, idx, product_url, page, scraper_type)
+
+
+def save_crawled_page(session, idx, product_url, page, scraper_type):
+    """
+    Archive a fetched product page, then extract and save its product
+    (the second half of crawl_product_url)
+    
+    Returns:
+        str: 'created', 'updated', 'unchanged' or 'failed'
+    """
+    link = product_url['link'] if isinstance(product_url, dict) else product_url
+    
+    archive_page(session, idx, product_url, page)
+    if page.unchanged:
+        Product.objects.filter(website=session.website.name, link=link).update(last_seen_session=session)
+        log_message(session, 'info', f'Skipped product, page unchanged: {link}', product_url=link)
+        return 'unchanged'
+    response = page.response
+    response.raise_for_status()
+    
+    product_info = ARCHIVE_EXTRACTORS[scraper_type](ProductPage(response.content), product_url, session.website.name)
+    if not product_info:
+        log_message(session, 'warning', f'Failed to extract product info for: {link}')
+        return 'failed'
+    
+    product_info['last_seen_session'] = session
+    try:
+        created = save_extracted_product(product_info)
+    except IntegrityError:
+        # Another chunk created the same variant in the meantime
+        created = save_extracted_product(product_info)
+    page.store()
+    
+    log_message(session, 'success', f'{"Created new" if created else "Updated"} product: {product_info["name"]}',
+                product_url=link, product_sku=product_info['sku'])
+    return 'created' if created else 'updated'
+
+
+def run_crawl_step(session, link, step, *args):
+    """
+    Run one page of a chunked or cooperative crawl, logging its errors the
+    way the scrape_<site>_products_common loops do
+    
+    Returns:
+        str: The step's outcome, or 'failed' if it raised
+    """
+    try:
+        return step(*args)
+    except requests.exceptions.RequestException as req_error:
+        log_message(session, 'error', f'Request error for product {link}: {str(req_error)}',
+                  product_url=link, exception_details=traceback.format_exc())
+    except SoftTimeLimitExceeded:
+        raise
+    except Exception as product_error:
+        log_message(session, 'error', f'Error processing product {link}: {str(product_error)}',
+                  product_url=link, exception_details=traceback.format_exc())
+    return 'failed'
+
+
+def count_outcome(counts, outcome):
+    if outcome == 'failed':
+        counts['failed'] += 1
+    else:
+        counts['scraped'] += 1
+        if outcome in ('created', 'updated'):
+            counts[outcome] += 1
+
+
+def add_chunk_counts(session_id, counts):
+    """Add a chunk's (or cooperative crawl's) pending counts to its session and reset them"""
+    ScrapingSession.objects.filter(id=session_id).update(
+        products_scraped=F('products_scraped') + counts['scraped'],
+        products_created=F('products_created') + counts['created'],
+        products_updated=F('products_updated') + counts['updated'],
+        products_failed=F('products_failed') + counts['failed'],
+    )
+    for key in counts:
+        counts[key] = 0
+
+
+def chunk_may_start(session, task_id):
+    """
+    Whether a chunk may start: every chunk more than CHUNKED_CRAWL_CONCURRENCY
+    places before it has finished, so the running chunks of a crawl always lie
+    within a window of that size (no two chunks can race past the limit).
+    
+    Chunks that are not part of the session's chord (run directly) always may.
+    """
+    from .heartbeat import get_task_liveness
+    
+    chunk_ids = ((session.resume_data or {}).get('chunked') or {}).get('task_ids') or []
+    if task_id not in chunk_ids:
+        return True
+    earlier = chunk_ids[:max(0, chunk_ids.index(task_id) - CHUNKED_CRAWL_CONCURRENCY + 1)]
+    liveness = get_task_liveness(earlier)
+    return all(liveness.get(chunk_id) is False for chunk_id in earlier)
+
+
+@shared_task(bind=True, max_retries=None, soft_time_limit=CRAWL_CHUNK_TIME_LIMIT, time_limit=CRAWL_CHUNK_TIME_LIMIT + 60)
+def crawl_chunk(self, session_id, scraper_type, start_index, product_urls):
+    """
+    Crawl one chunk of a chunked crawl (see start_chunked_crawl)
+    
+    Args:
+        session_id: ID of the scraping session
+        scraper_type: Key of CHUNKED_CRAWL_LOADERS
+        start_index: Position of the chunk's first URL in the session's URL list
+        product_urls: The chunk's URL list items
+        
+    Returns:
+        dict: status ('completed', 'stopped' or 'failed') and the chunk's counts
+    """
+    from .heartbeat import HeartbeatThread, beat, start_heartbeat, stop_heartbeat
+    from .rate_limit import wait_for_slot
+    from urllib.parse import urlparse
+    
+    session = ScrapingSession.objects.select_related('website').get(id=session_id)
+    counts = {'scraped': 0, 'created': 0, 'updated': 0, 'failed': 0}
+    totals = dict(counts)
+    status = 'completed'
+    
+    if session.status == 'running' and not chunk_may_start(session, self.request.id):
+        # Wait in the queue rather than in a worker; the chord keeps the task ID
+        raise self.retry(countdown=CHUNK_WAIT_COUNTDOWN)
+    
+    get = cloudscraper.create_scraper().get if scraper_type == 'feldheim' else None
+    
+    # Heartbeat of the chunk itself, and of the session's task ID (the
+    # finalize callback) so liveness checks see the crawl as running
+    start_heartbeat(self.request.id)
+    crawl_heartbeat = None
+    if session.celery_task_id:
+        try:
+            beat(session.celery_task_id)
+            crawl_heartbeat = HeartbeatThread(session.celery_task_id)
+            crawl_heartbeat.start()
+        except Exception as e:
+            logger.warning(f"[Heartbeat] Could not start crawl heartbeat for session {session_id}: {e}")
+    try:
+        for idx, product_url in enumerate(product_urls, start=start_index):
+            link = product_url['link'] if isinstance(product_url, dict) else product_url
+            
+            # Stopped from the dashboard, or failed by recovery
+            if not ScrapingSession.objects.filter(id=session_id, status='running').exists():
+                status = 'stopped'
+                break
+            
+            wait_for_slot(urlparse(link).netloc, CRAWL_DOMAIN_INTERVAL)
+            log_message(session, 'info', f'Processing product {idx + 1}/{session.total_products_found}: {link}')
+            
+            outcome = run_crawl_step(session, link, crawl_product_url, session, idx, product_url, scraper_type, get)
+            count_outcome(counts, outcome)
+            
+            if (idx - start_index + 1) % CHUNK_PROGRESS_EVERY == 0:
+                for key, value in counts.items():
+                    totals[key] += value
+                add_chunk_counts(session_id, counts)
+    
+    except SoftTimeLimitExceeded:
+        status = 'failed'
+        log_message(session, 'warning', f'Chunk starting at product {start_index + 1} hit its time limit')
+    
+    finally:
+        for key, value in counts.items():
+            totals[key] += value
+        add_chunk_counts(session_id, counts)
+        stop_heartbeat(self.request.id)
+        if crawl_heartbeat is not None:
+            # Other chunks may still be running: let the key expire instead of clearing it
+            crawl_heartbeat.stop()
+    
+    return {'status': status, 'start_index': start_index, **totals}
+
+
+@shared_task(bind=True)
+def finalize_chunked_crawl(self, chunk_results, session_id):
+    """
+    Chord callback of a chunked crawl: complete the session once every chunk has run
+    
+    A crawl with a chunk that did not complete is still marked completed
+    (its pages were saved), but skips the removal sweep.
+    """
+    from .heartbeat import start_heartbeat, stop_heartbeat
+    
+    start_heartbeat(self.request.id)
+    try:
+        return _finalize_chunked_crawl(chunk_results, session_id)
+    finally:
+        stop_heartbeat(self.request.id)
+
+
+def _finalize_chunked_crawl(chunk_results, session_id):
+    session = ScrapingSession.objects.select_related('website').get(id=session_id)
+    state, created = ScrapingState.objects.get_or_create(website=session.website)
+    
+    if session.status == 'running':
+        incomplete = [result for result in chunk_results if not result or result.get('status') != 'completed']
+        if incomplete:
+            log_message(session, 'warning', f'{len(incomplete)} of {len(chunk_results)} chunks did not complete')
+        result = complete_crawl_session(session, 'failed' if incomplete else 'completed')
+    else:
+        result = {'status': session.status}
+    
+    if state.current_session_id in (None, session.id):
+        state.is_running = False
+        state.save()
+    
+    return result
+
+
+def complete_crawl_session(session, status):
+    """
+    Mark the session of a chunked or cooperative crawl completed and run the
+    removal sweep, which only acts on a 'completed' status (a crawl that was
+    cut short keeps its pages but marks nothing out of stock)
+    
+    Returns:
+        dict: The crawl's result
+    """
+    # Counts were added with F() updates
+    session.refresh_from_db()
+    result = {
+        'status': status,
+        'total_found': session.total_products_found,
+        'scraped': session.products_scraped,
+        'created': session.products_created,
+        'updated': session.products_updated,
+        'failed': session.products_failed
+    }
+    
+    session.status = 'completed'
+    session.completed_at = timezone.now()
+    session.save()
+    
+    sweep_unseen_products(session, result)
+    
+    log_message(session, 'info', 
+               f'Scraping completed! Total: {session.total_products_found}, '
+               f'Scraped: {session.products_scraped}, '
+               f'Created: {session.products_created}, '
+               f'Updated: {session.products_updated}, '
+               f'Failed: {session.products_failed}')
+    return result
+
+
+# ==================== COOPERATIVE CRAWLS ====================
+
+# Full crawls of several custom HTML websites driven from one event loop in
+# a single worker process (cooperative_crawl.py): every website keeps its own
+# request spacing and all of them share one bounded database write stage.
+# Started with utils.start_cooperative_crawl; the sessions share the task
+# (celery_task_id) and are marked with resume_data['cooperative'].
+COOPERATIVE_CRAWL_TIME_LIMIT = 6 * 3600
+# Websites whose product URLs are streamed from their crawl frontier
+# (crawl_frontier.py), so fetching starts with the first category page
+STREAMING_CRAWL_LOADERS = {
+    'toys4u': iter_toys4u_products_urls,
+    'mefoarjudaica': iter_mefoarjudaica_product_urls,
+    'ozvehadar': iter_ozvehadar_product_urls,
+}
+
+
+def cooperative_scraper_type(website):
+    """Key of CHUNKED_CRAWL_LOADERS for a website, or None if it can't join a cooperative crawl"""
+    scraper_function = (website.scraper_function or '').lower()
+    for scraper_type in CHUNKED_CRAWL_LOADERS:
+        if scraper_type in scraper_function:
+            return scraper_type
+    return None
+
+
+class SessionSiteCrawl(SiteCrawl):
+    """A website of a cooperative crawl, saving to its ScrapingSession"""
+    
+    interval = CRAWL_DOMAIN_INTERVAL
+    
+    def __init__(self, session, scraper_type):
+        super().__init__(session.website.name)
+        self.session = session
+        self.scraper_type = scraper_type
+        self.counts = {'scraped': 0, 'created': 0, 'updated': 0, 'failed': 0}
+        self.store_api_result = None
+        self.get = cloudscraper.create_scraper().get if scraper_type == 'feldheim' else None
+        self.streaming = False
+    
+    def load(self):
+        # WooCommerce stores are read from the Store API in a few requests,
+        # which save their products themselves; pages are crawled only when
+        # the API is disabled
+        if self.scraper_type in WOOCOMMERCE_STORES:
+            self.store_api_result = scrape_woocommerce_products_common(self.session, self.scraper_type)
+            if self.store_api_result:
+                return []
+        if self.scraper_type in STREAMING_CRAWL_LOADERS:
+            self.streaming = True
+            return STREAMING_CRAWL_LOADERS[self.scraper_type]()
+        return CHUNKED_CRAWL_LOADERS[self.scraper_type]()
+    
+    def url(self, item):
+        return item['link'] if isinstance(item, dict) else item
+    
+    def loaded(self, items):
+        if self.store_api_result:
+            return
+        if self.streaming:
+            # The total grows as the frontier finds products
+            self.session.total_products_found = 0
+            self.session.save()
+            log_message(self.session, 'info', 'Crawling category pages, product pages are fetched as they are found')
+            return
+        if not items:
+            raise ValueError('No product URLs found in sitemap')
+        self.session.total_products_found = len(items)
+        self.session.save()
+        log_message(self.session, 'info', f'Found {len(items)} product URLs')
+    
+    def is_active(self):
+        # Stopped from the dashboard, or failed by recovery
+        return ScrapingSession.objects.filter(id=self.session.id, status='running').exists()
+    
+    def fetch(self, item):
+        return fetch_product_page(item, get=self.get)
+    
+    def save(self, position, item, page):
+        link = self.url(item)
+        if self.streaming:
+            self.session.total_products_found = position + 1
+        log_message(self.session, 'info', f'Processing product {position + 1}/{self.session.total_products_found}: {link}')
+        
+        if isinstance(page, Exception):
+            outcome = run_crawl_step(self.session, link, _raise_fetch_error, page)
+        else:
+            outcome = run_crawl_step(self.session, link, save_crawled_page, self.session, position, item, page,
+                                     self.scraper_type)
+        count_outcome(self.counts, outcome)
+        
+        if (position + 1) % CHUNK_PROGRESS_EVERY == 0:
+            add_chunk_counts(self.session.id, self.counts)
+            ScrapingSession.objects.filter(id=self.session.id).update(
+                last_processed_index=position, last_processed_url=link,
+                total_products_found=self.session.total_products_found
+            )
+    
+    def finish(self, status, error=''):
+        add_chunk_counts(self.session.id, self.counts)
+        session = self.session
+        if status == 'completed' and self.store_api_result and self.store_api_result['status'] == 'incomplete':
+            status, error = 'failed', self.store_api_result['message']
+        if self.streaming:
+            ScrapingSession.objects.filter(id=session.id).update(total_products_found=session.total_products_found)
+            if status == 'completed' and not session.total_products_found:
+                status, error = 'failed', 'No product URLs found in sitemap'
+        
+        if status == 'failed':
+            ScrapingSession.objects.filter(id=session.id, status='running').update(
+                status='failed', completed_at=timezone.now()
+            )
+            log_message(session, 'error', f'Task failed with unexpected error: {error}')
+        elif ScrapingSession.objects.filter(id=session.id, status='running').exists():
+            complete_crawl_session(session, status)
+        
+        state = ScrapingState.objects.get(website=session.website)
+        if state.current_session_id in (None, session.id):
+            state.is_running = False
+            state.save()
+
+
+def _raise_fetch_error(error):
+    raise error
+
+
+@shared_task(bind=True, soft_time_limit=COOPERATIVE_CRAWL_TIME_LIMIT, time_limit=COOPERATIVE_CRAWL_TIME_LIMIT + 60)
+def crawl_websites_together(self, session_ids):
+    """
+    Cooperative full crawl of several custom HTML websites in this process
+    
+    Args:
+        session_ids: Pending sessions created by utils.start_cooperative_crawl
+        
+    Returns:
+        dict: {'status': 'completed', 'websites': {name: status}}
+    """
+    from .heartbeat import start_heartbeat, stop_heartbeat
+    
+    start_heartbeat(self.request.id)
+    sites = []
+    try:
+        sessions = ScrapingSession.objects.select_related('website').filter(id__in=session_ids, status='pending')
+        for session in sessions:
+            session.status = 'running'
+            session.celery_task_id = self.request.id
+            session.run_started_at = timezone.now()
+            session.save()
+            
+            state, created = ScrapingState.objects.get_or_create(website=session.website)
+            state.is_running = True
+            state.current_session = session
+            state.last_run = timezone.now()
+            state.save()
+            
+            log_message(session, 'info', f'Starting cooperative crawl of {session.website.name} '
+                        f'({len(session_ids)} websites in one worker)')
+            sites.append(SessionSiteCrawl(session, cooperative_scraper_type(session.website)))
+        
+        return {'status': 'completed', 'websites': run_cooperative_crawl(sites)}
+    
+    except SoftTimeLimitExceeded:
+        for site in sites:
+            if ScrapingSession.objects.filter(id=site.session.id, status='running').update(
+                status='failed', completed_at=timezone.now()
+            ):
+                log_message(site.session, 'warning', 'Cooperative crawl hit its time limit - resume the session to continue')
+                ScrapingState.objects.filter(website=site.session.website, current_session=site.session).update(
+                    is_running=False
+                )
+        return {'status': 'failed', 'message': 'Time limit exceeded'}
+    
+    finally:
+        stop_heartbeat(self.request.id)
+
+
+# ==================== SCHEDULED SCRAPES ====================
+
+@shared_task(bind=True, name='scraper.tasks.run_scheduled_scrape',
+             soft_time_limit=120, time_limit=180)
+def run_scheduled_scrape(self, schedule_id):
+    """
+    Celery Beat entry point for a ScrapeSchedule.
+
+    Skips the run outside the schedule's off-peak window, when the website is
+    inactive, or when a session for the website is still active (the duplicate
+    check in start_scraping_session), so overlapping triggers never stack up.
+    """
+    from scraper.utils import start_scraping_session
+    
+    try:
+        schedule = ScrapeSchedule.objects.select_related('website').get(id=schedule_id)
+    except ScrapeSchedule.DoesNotExist:
+        logger.warning(f"[Schedule] Schedule #{schedule_id} no longer exists")
+        return {'status': 'skipped', 'message': 'Schedule not found'}
+    
+    now = timezone.now()
+    if not schedule.is_active or not schedule.website.is_active:
+        result = {'success': False, 'message': 'Schedule or website is inactive'}
+    elif not schedule.in_window(now):
+        result = {'success': False, 'message': f'Outside off-peak window {schedule.window_start}-{schedule.window_end} UTC'}
+    else:
+        result = start_scraping_session(schedule.website.id, mode=schedule.scrape_mode)
+    
+    schedule.last_run_at = now
+    schedule.last_result = result['message'][:500]
+    if result.get('success'):
+        schedule.last_session_id = result['session_id']
+    ScrapeSchedule.objects.filter(id=schedule.id).update(
+        last_run_at=schedule.last_run_at,
+        last_result=schedule.last_result,
+        last_session=schedule.last_session_id,
+    )
+    
+    logger.info(f"[Schedule] {schedule.website.name} ({schedule.scrape_mode}): {result['message']}")
+    return {'status': 'started' if result.get('success') else 'skipped', 'message': result['message']}
+
+
+# ── Heartbeats: scrape_* tasks keep a short-lived Redis key fresh while running ──
+from celery.signals import task_prerun, task_postrun
+
+
+@task_prerun.connect
+def start_scrape_heartbeat(sender=None, task_id=None, args=None, **kwargs):
+    from .heartbeat import HEARTBEAT_TASK_PREFIX, start_heartbeat
+    if sender is None or not sender.name.startswith(HEARTBEAT_TASK_PREFIX):
+        return
+    start_heartbeat(task_id)
+    
+    # Point the session at the running task (auto-resumes re-dispatch under a
+    # new ID) and record when it actually started, for duration estimates
+    if args:
+        try:
+            ScrapingSession.objects.filter(id=args[0]).update(celery_task_id=task_id)
+            ScrapingSession.objects.filter(id=args[0], run_started_at__isnull=True).update(
+                run_started_at=timezone.now()
+            )
+        except Exception as e:
+            logger.warning(f"[Heartbeat] Could not record start of task {task_id}: {e}")
+
+
+@task_postrun.connect
+def stop_scrape_heartbeat(sender=None, task_id=None, **kwargs):
+    from .heartbeat import HEARTBEAT_TASK_PREFIX, stop_heartbeat
+    if sender is not None and sender.name.startswith(HEARTBEAT_TASK_PREFIX):
+        stop_heartbeat(task_id)
+
+
+# ── gevent pool: cooperative database access and soft time limits (green.py) ──
+@task_prerun.connect
+def enter_green_task(sender=None, task_id=None, **kwargs):
+    from .green import enter_task
+    if sender is not None and sender.name.startswith('scraper.tasks.'):
+        enter_task(sender, task_id)
+
+
+@task_postrun.connect
+def leave_green_task(sender=None, task_id=None, **kwargs):
+    from .green import leave_task
+    leave_task(task_id)
+
+
 # ── Worker-ready signal: runs recovery immediately when Celery starts ─────────
 from celery.signals import worker_ready
 
@@ -4334,24 +4726,17 @@ from celery.signals import worker_ready
 def on_worker_ready(sender, **kwargs):
     """
     Triggered when a Celery worker comes online.
-    Immediately scans for and fixes stuck sessions left over from the previous
-    worker run (e.g. after a crash, deploy, or OOM kill).
+    Queues a scan for stuck sessions left over from the previous worker run
+    (e.g. after a crash, deploy, or OOM kill) instead of running it here, so
+    worker startup never waits on it. The scan is delayed until heartbeats of
+    tasks from the previous run have expired.
     """
     try:
-        # Small delay to let Django app fully initialise
-        import time as _time
-        _time.sleep(2)
-
-        import django
-        django.setup()
-
-        from scraper.utils import recover_stuck_sessions
-        count = recover_stuck_sessions()
-        logger.info(
-            f"[WorkerReady] Startup recovery complete — {count} stuck session(s) recovered"
-        )
+        from .heartbeat import HEARTBEAT_TTL
+        recover_stuck_sessions_task.apply_async(countdown=HEARTBEAT_TTL, queue='default')
+        logger.info(f"[WorkerReady] Startup recovery queued (runs in {HEARTBEAT_TTL}s)")
     except Exception as e:
-        logger.error(f"[WorkerReady] Error during startup recovery: {e}")
+        logger.error(f"[WorkerReady] Error queueing startup recovery: {e}")
 
 
 @shared_task(bind=True, soft_time_limit=3600, time_limit=3660)
@@ -4366,9 +4751,16 @@ def export_products_to_google_sheet(self, export_id, website_filter='all'):
     """
     import xlsxwriter
     from io import BytesIO
+    from functools import partial
     from django.utils import timezone
+    from googleapiclient.discovery import build
     from googleapiclient.http import MediaIoBaseUpload
     from .google_auth import google_auth_manager
+    from .sync_utils import ProductTransformer
+    from .sheet_sync import (
+        SHEET_HEADERS, SheetSyncPlan, SheetUploader, has_row_map, iter_sheet_batches, prefetch_in_background,
+        replace_row_map, row_hash
+    )
     
     try:
         # Get the export record
@@ -4435,10 +4827,17 @@ def export_products_to_google_sheet(self, export_id, website_filter='all'):
             logger.warning(f"Error checking for existing sheet: {e}")
             existing_file_id = None
         
+        # Sheets written by a previous sync have a row map: only changed rows are sent
+        incremental = bool(existing_file_id) and has_row_map(existing_file_id)
+        vendor_configs = ProductTransformer.load_vendor_configs()
+        
+        # Sheet rows are read and built in a background thread while earlier batches upload
+        sheet_batches = prefetch_in_background(iter_sheet_batches(products, vendor_configs, batch_size=2000))
+        
         if existing_file_id:
             # Update existing sheet
             file_id = existing_file_id
-            logger.info(f"Updating existing Google Sheet: {file_id}")
+            logger.info(f"Updating existing Google Sheet: {file_id} ({'incremental' if incremental else 'full rewrite'})")
             
             # Update progress to 85%
             export_record.progress_percentage = 85
@@ -4470,12 +4869,13 @@ def export_products_to_google_sheet(self, export_id, website_filter='all'):
                     }
                 ).execute()
             
-            # Clear existing data (keep header)
-            logger.info("Clearing existing data...")
-            sheets_service.spreadsheets().values().clear(
-                spreadsheetId=file_id,
-                range='A2:Z'  # Clear from row 2 onwards, keep headers
-            ).execute()
+            if not incremental:
+                # Clear existing data (keep header)
+                logger.info("Clearing existing data...")
+                sheets_service.spreadsheets().values().clear(
+                    spreadsheetId=file_id,
+                    range='A2:Z'  # Clear from row 2 onwards, keep headers
+                ).execute()
             
         else:
             # Create new sheet
@@ -4487,8 +4887,7 @@ def export_products_to_google_sheet(self, export_id, website_filter='all'):
             worksheet = workbook.add_worksheet('Products')
             
             # Add headers
-            headers = ['Website', 'Name', 'SKU', 'Price', 'Category', 'Vendor', 'InStock', 'Description', 'Image Link', 'Link', 'Created At', 'Updated At']
-            for col, header in enumerate(headers):
+            for col, header in enumerate(SHEET_HEADERS):
                 worksheet.write(0, col, header)
             
             workbook.close()
@@ -4525,8 +4924,17 @@ def export_products_to_google_sheet(self, export_id, website_filter='all'):
                 body={'type': 'anyone', 'role': 'writer'}
             ).execute()
         
+        sync_plan = None
+        if incremental:
+            sync_plan = SheetSyncPlan.build(file_id, (row for batch in sheet_batches for row in batch))
+            logger.info(
+                f"Sheet diff: {sync_plan.changed} changed, {sync_plan.added} added, "
+                f"{sync_plan.removed} removed, {sync_plan.unchanged} unchanged"
+            )
+        
         # IMPORTANT: Ensure sheet has enough rows (for both new and existing sheets)
-        required_rows = total_products + 100
+        last_row = sync_plan.max_row if sync_plan else total_products + 1
+        required_rows = max(total_products, last_row) + 100
         logger.info(f"Ensuring sheet has at least {required_rows} rows...")
         
         # Get fresh metadata to check current size
@@ -4556,83 +4964,42 @@ def export_products_to_google_sheet(self, export_id, website_filter='all'):
         else:
             logger.info(f"Sheet already has {current_row_count} rows, no expansion needed")
         
-        # Prepare and write data in batches to avoid SSL timeout
-        logger.info("Preparing and writing product data in batches...")
-        processed_count = 0
-        batch_size = 500  # Write 500 rows at a time to avoid SSL timeout
-        current_row = 2  # Start from row 2 (after header)
-        
-        for i in range(0, total_products, batch_size):
-            batch_products = products[i:i + batch_size]
-            batch_values = []
+        # Upload threads each get their own Sheets client
+        sheets_service_factory = partial(build, 'sheets', 'v4', credentials=credentials)
+        
+        if sync_plan:
+            # Write only the changed, added and removed rows
+            if sync_plan.updates:
+                logger.info(f"Writing {len(sync_plan.updates)} changed rows...")
+                with SheetUploader(sheets_service_factory, file_id) as uploader:
+                    uploader.add_many(sync_plan.updates)
+                logger.info(f"Sent {uploader.requests_sent} update request(s)")
+            sync_plan.save()
+            export_record.processed_products = total_products
+            export_record.progress_percentage = 95
+            export_record.save()
+        else:
+            # Write data in payload-sized batches, several uploads in flight at once
+            logger.info("Preparing and writing product data in batches...")
+            current_row = 2  # Start from row 2 (after header)
+            row_map = []  # (product_id, row_number, row_hash) for the next incremental sync
+            export_record.processed_products = 0
             
-            for product in batch_products:
-                # Get SKU with vendor prefix
-                sku_value = product.sku or ''
-                try:
-                    from .models import Website, VendorConfiguration
-                    website_obj = Website.objects.get(name__iexact=product.website)
-                    vendor_config = VendorConfiguration.objects.get(website=website_obj, is_active=True)
-                    sku_value = vendor_config.apply_sku_transform(product.sku or '')
-                except (Website.DoesNotExist, VendorConfiguration.DoesNotExist):
-                    sku_value = product.sku or ''
-                
-                row = [
-                    product.website or '',
-                    product.name or '',
-                    sku_value,  # SKU with vendor prefix included
-                    product.price or '',
-                    product.category or '',
-                    product.vendor or '',
-                    "Yes" if product.in_stock else "No",
-                    product.description or '',
-                    ", ".join(product.image_link.split(",")[:2]) if product.image_link else '',
-                    product.link or '',
-                    product.created_at.strftime('%Y-%m-%d %H:%M:%S') if product.created_at else '',
-                    product.updated_at.strftime('%Y-%m-%d %H:%M:%S') if product.updated_at else ''
-                ]
-                batch_values.append(row)
-                processed_count += 1
+            def record_progress(rows_count):
+                export_record.processed_products += rows_count
+                export_record.progress_percentage = 85 + int((export_record.processed_products / total_products) * 10)  # 85-95%
+                export_record.save()
             
-            # Write this batch to sheet
-            if batch_values:
-                try:
-                    logger.info(f"Writing batch {i//batch_size + 1}: rows {current_row} to {current_row + len(batch_values) - 1}")
-                    sheets_service.spreadsheets().values().update(
-                        spreadsheetId=file_id,
-                        range=f'A{current_row}',
-                        valueInputOption='RAW',
-                        body={'values': batch_values}
-                    ).execute()
-                    current_row += len(batch_values)
-                    
-                    # Update progress
-                    progress = 85 + int((processed_count / total_products) * 10)  # 85-95%
-                    export_record.processed_products = processed_count
-                    export_record.progress_percentage = progress
-                    export_record.save()
-                    
-                    # Small delay between batches to avoid rate limiting
-                    import time
-                    time.sleep(0.5)
-                    
-                except Exception as batch_error:
-                    logger.error(f"Error writing batch starting at row {current_row}: {str(batch_error)}")
-                    # Try one more time with smaller batch
-                    if len(batch_values) > 100:
-                        logger.info("Retrying with smaller sub-batches...")
-                        for sub_i in range(0, len(batch_values), 100):
-                            sub_batch = batch_values[sub_i:sub_i + 100]
-                            sheets_service.spreadsheets().values().update(
-                                spreadsheetId=file_id,
-                                range=f'A{current_row}',
-                                valueInputOption='RAW',
-                                body={'values': sub_batch}
-                            ).execute()
-                            current_row += len(sub_batch)
-                            time.sleep(0.5)
-                    else:
-                        raise batch_error
+            with SheetUploader(sheets_service_factory, file_id, on_written=record_progress) as uploader:
+                for batch in sheet_batches:
+                    for product_id, row in batch:
+                        uploader.add(current_row, row)
+                        row_map.append((product_id, current_row, row_hash(row)))
+                        current_row += 1
+            logger.info(f"Wrote rows 2 to {current_row - 1} in {uploader.requests_sent} request(s)")
+            
+            replace_row_map(file_id, row_map)
+            last_row = current_row - 1
         
         # Set row height
         logger.info("Formatting sheet...")
@@ -4646,7 +5013,7 @@ def export_products_to_google_sheet(self, export_id, website_filter='all'):
                                 "sheetId": sheet_id,
                                 "dimension": "ROWS",
                                 "startIndex": 1,
-                                "endIndex": total_products + 2
+                                "endIndex": last_row + 1
                             },
                             "properties": {
                                 "pixelSize": 25
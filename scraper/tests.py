@@ -1,3 +1,295 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from . import scheduler, tasks
+from .crawl_frontier import CrawlFrontier
+from .http_cache import url_hash
+from .models import CrawlFrontierURL, PageCacheEntry, Product, ProductSyncStatus, ScrapingSession, Website, link_variant_id
+from .sync_utils import ProductSyncUpdater
+from .tasks import sweep_unseen_products
+
+
+class ProductVariantIdGuardTests(TestCase):
+    """Product.save() rejects IDs built with the per-process hash() of the link"""
+
+    def test_hash_of_link_is_rejected(self):
+        link = 'https://meiros.com/p/1'
+        for variant_id in (f'meiros_{hash(link)}', 'meiros_-4611686018427387904', 'meiros_1234567890'):
+            with self.assertRaises(ValueError):
+                Product.objects.create(website='meiros', product_variant_id=variant_id, link=link)
+        self.assertFalse(Product.objects.exists())
+
+    def test_stable_ids_are_saved(self):
+        link = 'https://meiros.com/p/1'
+        Product.objects.create(website='meiros', product_variant_id=link_variant_id('meiros', link), link=link)
+        Product.objects.create(website='meiros', product_variant_id='meiros_7290001234567', sku='7290001234567', link=link)
+        Product.objects.create(website='feldart', product_variant_id=40123456789012, link='https://feldart.com/products/a')
+        self.assertEqual(Product.objects.count(), 3)
+
+
+class SweepUnseenProductsTests(TestCase):
+    """Removal sweep after a completed full run (tasks.sweep_unseen_products)"""
+
+    def setUp(self):
+        self.website = Website.objects.create(name='meiros', url='https://meiros.com', scraper_function='scrape_meiros')
+        self.previous = ScrapingSession.objects.create(website=self.website, status='completed')
+        self.products = [
+            Product.objects.create(website='meiros', product_variant_id=f'meiros_S{idx}', sku=f'S{idx}',
+                                   link=f'https://meiros.com/p/{idx}', in_stock=True, last_seen_session=self.previous)
+            for idx in range(4)
+        ]
+
+    def session(self, mode='full', **kwargs):
+        return ScrapingSession.objects.create(website=self.website, status='completed', scrape_mode=mode, **kwargs)
+
+    def see(self, session, *indexes):
+        Product.objects.filter(id__in=[self.products[idx].id for idx in indexes]).update(last_seen_session=session)
+
+    def in_stock(self):
+        return list(Product.objects.order_by('id').values_list('in_stock', flat=True))
+
+    def test_full_run_marks_unseen_products_out_of_stock(self):
+        session = self.session()
+        self.see(session, 0, 1, 2)
+
+        self.assertEqual(sweep_unseen_products(session, {'status': 'completed'}), 1)
+        self.assertEqual(self.in_stock(), [True, True, True, False])
+
+    def test_run_that_saw_too_few_products_is_not_swept(self):
+        session = self.session()
+        self.see(session, 0)
+
+        self.assertEqual(sweep_unseen_products(session, {'status': 'completed'}), 0)
+        self.assertEqual(self.in_stock(), [True] * 4)
+        self.assertTrue(session.logs.filter(level='warning', message__startswith='Removal sweep skipped').exists())
+
+    def test_incomplete_run_is_not_swept(self):
+        session = self.session()
+        self.see(session, 0, 1, 2)
+
+        self.assertEqual(sweep_unseen_products(session, {'status': 'failed'}), 0)
+        self.assertEqual(self.in_stock(), [True] * 4)
+
+    def test_stock_price_and_incremental_runs_are_not_swept(self):
+        for mode in ('stock_price', 'incremental'):
+            session = self.session(mode=mode)
+            self.see(session, 0)
+
+            self.assertEqual(sweep_unseen_products(session, {'status': 'completed'}), 0)
+        self.assertEqual(self.in_stock(), [True] * 4)
+
+    def test_resumed_run_counts_products_seen_before_the_resume(self):
+        interrupted = ScrapingSession.objects.create(website=self.website, status='stopped', scrape_mode='full')
+        self.see(interrupted, 0, 1)
+        resumed = self.session(last_processed_index=2, resume_data={'resumed_from_session': interrupted.id})
+        self.see(resumed, 2)
+
+        self.assertEqual(sweep_unseen_products(resumed, {'status': 'completed'}), 1)
+        self.assertEqual(self.in_stock(), [True, True, True, False])
+
+    def test_swept_products_lose_their_page_cache_entries(self):
+        for product in self.products[2:]:
+            PageCacheEntry.objects.create(url_hash=url_hash(product.link), url=product.link, fetched_at=timezone.now())
+        session = self.session()
+        self.see(session, 0, 1, 2)
+
+        sweep_unseen_products(session, {'status': 'completed'})
+        self.assertEqual(list(PageCacheEntry.objects.values_list('url', flat=True)), [self.products[2].link])
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+    def raise_for_status(self):
+        pass
+
+
+def shopify_product(idx):
+    return {'id': idx, 'title': f'Product {idx}', 'handle': f'product-{idx}',
+            'variants': [{'id': idx, 'sku': f'F{idx}', 'price': '10.00', 'available': True}]}
+
+
+class CatalogueCutShortTests(TestCase):
+    """A paginated API scrape that stops on a page error must not sweep or count as completed"""
+
+    def setUp(self):
+        self.website = Website.objects.create(name='feldart', url='https://feldart.com', scraper_function='scrape_feldart')
+        # In stock from an earlier run, listed on page 2
+        Product.objects.create(website='feldart', product_variant_id='feldart_F3', sku='F3', in_stock=True)
+        self.task = mock.Mock()
+        self.task.request.id = 'task-id'
+
+    def scrape_shopify(self, page_2):
+        session = ScrapingSession.objects.create(website=self.website, status='pending', scrape_mode='full')
+        pages = [FakeResponse({'products': [shopify_product(idx) for idx in range(3)]}), page_2]
+
+        def get(url, **kwargs):
+            page = pages.pop(0)
+            if isinstance(page, Exception):
+                raise page
+            return page
+
+        with mock.patch.object(tasks.requests, 'get', side_effect=get), mock.patch.object(tasks.time, 'sleep'):
+            result = tasks.scrape_shopify_website_common(session.id, {'base_url': 'feldart.com'}, self.task)
+        session.refresh_from_db()
+        return session, result
+
+    def test_shopify_page_error_sweeps_nothing(self):
+        session, result = self.scrape_shopify(requests.exceptions.ConnectionError('page 2 down'))
+
+        self.assertEqual(result['status'], 'incomplete')
+        self.assertEqual(session.status, 'failed')
+        self.assertEqual(session.products_created, 3)
+        self.assertTrue(Product.objects.get(sku='F3').in_stock)
+
+    def test_shopify_run_to_the_last_page_sweeps(self):
+        session, result = self.scrape_shopify(FakeResponse({'products': []}))
+
+        self.assertEqual(result['status'], 'completed')
+        self.assertEqual(session.status, 'completed')
+        self.assertFalse(Product.objects.get(sku='F3').in_stock)
+
+    def test_woocommerce_page_error_is_incomplete(self):
+        session = ScrapingSession.objects.create(website=self.website, status='running', scrape_mode='full')
+        page_1 = FakeResponse([{'name': f'Product {idx}', 'sku': f'F{idx}', 'permalink': f'https://meiros.com/p/{idx}'}
+                               for idx in range(2)])
+
+        with mock.patch.object(tasks, 'WOOCOMMERCE_PER_PAGE', 2), mock.patch.object(tasks.time, 'sleep'), \
+             mock.patch.object(tasks.requests, 'get', side_effect=[page_1, requests.exceptions.ConnectionError('down')]):
+            result = tasks.scrape_woocommerce_products_common(session, 'meiros')
+
+        self.assertEqual(result['status'], 'incomplete')
+        self.assertEqual(tasks.finished_session_status(session, result), 'failed')
+        self.assertEqual(sweep_unseen_products(session, result), 0)
+        self.assertTrue(Product.objects.get(sku='F3').in_stock)
+
+
+class DispatchEstimateTests(TestCase):
+    """Lane choice from the durations of earlier runs (scheduler.plan_dispatch)"""
+
+    def setUp(self):
+        self.website = Website.objects.create(name='feldart', url='https://feldart.com', scraper_function='scrape_feldart')
+
+    def completed_run(self, mode, minutes):
+        completed_at = timezone.now()
+        ScrapingSession.objects.create(website=self.website, status='completed', scrape_mode=mode,
+                                       run_started_at=completed_at - timedelta(minutes=minutes),
+                                       completed_at=completed_at)
+
+    def test_estimate_uses_runs_of_the_same_mode(self):
+        self.completed_run('full', 120)
+        self.completed_run('stock_price', 2)
+
+        full, = scheduler.plan_dispatch([self.website], 'full')
+        stock_price, = scheduler.plan_dispatch([self.website], 'stock_price')
+
+        self.assertEqual((full['queue'], full['expected_duration']), (scheduler.SLOW_LANE_QUEUE, 120 * 60))
+        self.assertEqual((stock_price['queue'], stock_price['expected_duration']), (scheduler.FAST_LANE_QUEUE, 2 * 60))
+
+    def test_mode_without_history_uses_its_default(self):
+        self.completed_run('full', 120)
+
+        decision, = scheduler.plan_dispatch([self.website], 'incremental')
+
+        self.assertEqual(decision['estimate_source'], 'default')
+        self.assertEqual(decision['expected_duration'], scheduler.DEFAULT_DURATIONS['incremental'][1])
+
+
+class CrawlFrontierTests(TransactionTestCase):
+    """Continuing or restarting a loader's frontier (crawl_frontier.CrawlFrontier)"""
+
+    def setUp(self):
+        self.price = '10.00'
+        self.requests = []
+
+    def frontier(self):
+        def get(url):
+            self.requests.append(url)
+            return url
+
+        def parse(url, depth, response):
+            if url.endswith('/categories'):
+                return {'listings': ['https://toys4u.co.il/c1']}
+            return {'products': [{'link': 'https://toys4u.co.il/p1', 'price': self.price}]}
+
+        return CrawlFrontier('toys4u', ['https://toys4u.co.il/categories'], parse, get=get, concurrency=1)
+
+    def test_frontier_crawled_to_the_end_is_seeded_again(self):
+        self.assertEqual(list(self.frontier().iter_products()), [{'link': 'https://toys4u.co.il/p1', 'price': '10.00'}])
+        self.assertFalse(CrawlFrontierURL.objects.exists())
+
+        self.price = '12.00'
+        self.requests.clear()
+        self.assertEqual(list(self.frontier().iter_products()), [{'link': 'https://toys4u.co.il/p1', 'price': '12.00'}])
+        self.assertEqual(self.requests, ['https://toys4u.co.il/categories', 'https://toys4u.co.il/c1'])
+
+    def test_interrupted_frontier_is_continued(self):
+        frontier = self.frontier()
+        frontier.open()
+        frontier.visit(frontier.claim())
+        frontier.claim()  # c1 claimed by a run that then crashed
+        self.requests.clear()
+
+        self.assertEqual(len(list(self.frontier().iter_products())), 1)
+        self.assertEqual(self.requests, ['https://toys4u.co.il/c1'])
+
+    def test_finished_frontier_left_behind_is_not_replayed(self):
+        frontier = self.frontier()
+        frontier.open()
+        frontier.push_products([{'link': 'https://toys4u.co.il/p1', 'price': '9.00'}], depth=1)
+        frontier.rows.filter(kind='listing').update(state='done')
+
+        self.assertEqual(list(self.frontier().iter_products()), [{'link': 'https://toys4u.co.il/p1', 'price': '10.00'}])
+
+
+class ProductSyncUpdaterTests(TestCase):
+    """Bulk sync status updates of the website import and the export"""
+
+    def setUp(self):
+        self.products = [
+            Product.objects.create(website='meiros', product_variant_id=f'meiros_S{idx}', sku=f'S{idx}')
+            for idx in range(3)
+        ]
+
+    def test_mark_on_website_updates_tracked_and_creates_untracked_products(self):
+        tracked = ProductSyncStatus.objects.create(product=self.products[0], status='removed', website_sku='OLD')
+
+        written = ProductSyncUpdater.mark_on_website({
+            self.products[0].id: ('MR-S0', '100'),
+            self.products[1].id: ('MR-S1', '101'),
+        })
+
+        self.assertEqual(written, 2)
+        tracked.refresh_from_db()
+        self.assertEqual((tracked.on_website, tracked.status, tracked.website_sku, tracked.website_product_id),
+                         (True, 'synced', 'MR-S0', '100'))
+        self.assertIsNotNone(tracked.last_synced_at)
+        created = ProductSyncStatus.objects.get(product=self.products[1])
+        self.assertEqual((created.on_website, created.status, created.website_sku, created.website_product_id),
+                         (True, 'synced', 'MR-S1', '101'))
+        self.assertFalse(ProductSyncStatus.objects.filter(product=self.products[2]).exists())
+
+    def test_mark_exported_stamps_tracked_and_creates_untracked_products(self):
+        tracked = ProductSyncStatus.objects.create(product=self.products[0], selected_for_export=True)
+
+        updated = ProductSyncUpdater.mark_exported([self.products[0].id, self.products[1].id])
+
+        self.assertEqual(updated, 1)
+        tracked.refresh_from_db()
+        self.assertFalse(tracked.selected_for_export)
+        self.assertIsNotNone(tracked.last_export_at)
+        created = ProductSyncStatus.objects.get(product=self.products[1])
+        self.assertEqual(created.status, 'new')
+        self.assertIsNotNone(created.last_export_at)
+        self.assertFalse(ProductSyncStatus.objects.filter(product=self.products[2]).exists())
@@ -10,7 +10,11 @@ from .tasks import (scrape_waterdale_collection, scrape_btshalom,
                     scrape_davidjudaica, scrape_zionjudaica, scrape_ezpekalach, scrape_classictouchdecor, scrape_toys4u,
                     scrape_feldheim)
 from .models import Website, ScrapingSession, ScrapingState, ScrapingLog
+from .heartbeat import get_task_liveness
+from .scheduler import describe_decision, plan_dispatch
+from .tasks import log_message
 from django.contrib.auth.models import User
+from django.db.models import Q
 from django.utils import timezone
 from celery import current_app
 import importlib
@@ -25,24 +29,14 @@ def is_celery_task_alive(task_id):
     Check if a Celery task is actually alive/running.
 
     Returns:
-        True  - Task is actively running (STARTED state) - requires CELERY_TASK_TRACK_STARTED=True
-        False - Task is confirmed dead (SUCCESS / FAILURE / REVOKED, or no task_id)
-        None  - Unknown / PENDING (could be legitimately queued OR worker died mid-run)
+        True  - Task is actively running (fresh heartbeat, see heartbeat.py)
+        False - Task is confirmed dead (SUCCESS / FAILURE / REVOKED, heartbeat
+                expired after STARTED, or no task_id)
+        None  - Unknown / PENDING (could be legitimately queued OR worker died before starting)
     """
     if not task_id:
         return False
-    try:
-        result = current_app.AsyncResult(task_id)
-        state = result.state
-        if state in ('SUCCESS', 'FAILURE', 'REVOKED'):
-            return False
-        if state == 'STARTED':
-            return True
-        # PENDING is ambiguous: task could be waiting in queue OR worker died
-        return None
-    except Exception as e:
-        logger.warning(f"Error checking Celery task {task_id} status: {e}")
-        return False
+    return get_task_liveness([task_id])[task_id]
 
 
 def _reset_stuck_session(session, state=None, new_status='failed'):
@@ -76,20 +70,59 @@ def _reset_stuck_session(session, state=None, new_status='failed'):
         logger.error(f"[Recovery] Error resetting session #{session.id}: {e}")
 
 
+def _chunk_task_ids(session):
+    """Chunk task IDs of a chunked crawl session (values() row), see start_chunked_crawl"""
+    return ((session.get('resume_data') or {}).get('chunked') or {}).get('task_ids') or []
+
+
+def _chunked_crawl_stuck_reason(session, liveness, now, stuck_minutes):
+    """
+    Why a chunked crawl is stuck, or '' while it is making progress.
+
+    The crawl is alive while any chunk runs or is queued (running chunks
+    also keep the heartbeat of session.celery_task_id, the finalize callback,
+    fresh for the other liveness checks). Once no chunk is left the callback
+    should run; if it is still PENDING well after the last log line, a chunk
+    was lost and the chord will never fire.
+    """
+    chunk_states = [liveness.get(task_id, False) for task_id in _chunk_task_ids(session)]
+    if any(state is not False for state in chunk_states):
+        return ''
+
+    finalize_alive = liveness.get(session['celery_task_id'], False)
+    if finalize_alive is True:
+        return ''
+    if finalize_alive is False:
+        return 'chunked crawl finished without completing the session'
+
+    last_log = ScrapingLog.objects.filter(session_id=session['id']).order_by('-timestamp').values_list(
+        'timestamp', flat=True
+    ).first()
+    idle_minutes = (now - (last_log or session['started_at'])).total_seconds() / 60
+    if idle_minutes > stuck_minutes:
+        return (
+            f'all chunks finished but the finalize task is PENDING after {idle_minutes:.0f} min '
+            f'without progress — a chunk was lost'
+        )
+    return ''
+
+
 def recover_stuck_sessions():
     """
     Scan all 'running' and 'pending' sessions and recover those whose Celery
     tasks are no longer alive.
 
+    Task states are read in one lookup (see get_task_liveness) and all resets
+    are applied with two bulk UPDATEs: one for sessions, one for ScrapingState.
+
     Called on:
-      - Celery worker startup (worker_ready signal in tasks.py)
-      - Every 5 minutes by the recover_stuck_sessions_task periodic task
+      - Celery worker startup (worker_ready signal in tasks.py queues the periodic task)
+      - Every minute by the recover_stuck_sessions_task periodic task
       - Manually via the /recover-stuck-scrapers/ endpoint
 
     Returns:
         int: Number of sessions / states that were recovered / fixed
     """
-    recovered = 0
     now = timezone.now()
     # A session stuck in PENDING for longer than this is considered orphaned
     STUCK_PENDING_MINUTES = 15
@@ -97,70 +130,75 @@ def recover_stuck_sessions():
     STUCK_RUNNING_MINUTES = 15
 
     # ── 1. Find all DB-level active sessions ──────────────────────────────
-    stuck_sessions = ScrapingSession.objects.filter(
+    active_sessions = list(ScrapingSession.objects.filter(
         status__in=['running', 'pending']
-    ).select_related('website').order_by('started_at')
+    ).values('id', 'status', 'celery_task_id', 'started_at', 'website__name', 'resume_data'))
+
+    # One lookup for all sessions (and the chunks of chunked crawls); dead
+    # workers show up as soon as their heartbeat expires
+    task_ids = []
+    for session in active_sessions:
+        task_ids.append(session['celery_task_id'])
+        task_ids.extend(_chunk_task_ids(session))
+    liveness = get_task_liveness(task_ids)
 
-    for session in stuck_sessions:
-        task_alive = is_celery_task_alive(session.celery_task_id)
-        age_minutes = (now - session.started_at).total_seconds() / 60
-        should_recover = False
+    stuck_session_ids = []
+    for session in active_sessions:
+        task_alive = liveness.get(session['celery_task_id'], False)
+        age_minutes = (now - session['started_at']).total_seconds() / 60
         reason = ''
 
-        if task_alive is False:
-            # Confirmed dead: task finished / was revoked / has no ID
-            should_recover = True
-            reason = 'Celery task confirmed dead (SUCCESS/FAILURE/REVOKED or missing ID)'
+        if _chunk_task_ids(session):
+            reason = _chunked_crawl_stuck_reason(session, liveness, now, STUCK_RUNNING_MINUTES)
+
+        elif not session['celery_task_id']:
+            # No task ID yet: the task may still be being dispatched
+            if age_minutes > 5:
+                reason = 'no Celery task ID and session is older than 5 minutes'
+
+        elif task_alive is False:
+            # Confirmed dead: task finished / was revoked
+            reason = 'Celery task confirmed dead (SUCCESS/FAILURE/REVOKED or heartbeat expired)'
 
         elif task_alive is None:
             # PENDING state - could be queued OR dead worker
-            if session.status == 'running' and age_minutes > STUCK_RUNNING_MINUTES:
-                should_recover = True
+            if session['status'] == 'running' and age_minutes > STUCK_RUNNING_MINUTES:
                 reason = (
                     f'session marked running but Celery task is PENDING for '
                     f'{age_minutes:.0f} min (> {STUCK_RUNNING_MINUTES} min) — worker likely died'
                 )
-            elif session.status == 'pending' and age_minutes > STUCK_PENDING_MINUTES:
-                should_recover = True
+            elif session['status'] == 'pending' and age_minutes > STUCK_PENDING_MINUTES:
                 reason = (
                     f'session stuck in pending for {age_minutes:.0f} min '
                     f'(> {STUCK_PENDING_MINUTES} min threshold)'
                 )
 
-        elif not session.celery_task_id and age_minutes > 5:
-            # No task ID and session has been around for a while
-            should_recover = True
-            reason = 'no Celery task ID and session is older than 5 minutes'
-
-        if should_recover:
+        if reason:
             logger.info(
-                f"[Recovery] Recovering session #{session.id} "
-                f"({session.website.name}, status={session.status}): {reason}"
-            )
-            _reset_stuck_session(session, new_status='failed')
-            recovered += 1
-
-    # ── 2. Fix orphaned ScrapingState records ─────────────────────────────
-    orphaned_states = ScrapingState.objects.filter(
-        is_running=True
-    ).select_related('website', 'current_session')
-
-    for state in orphaned_states:
-        if not state.current_session:
-            state.is_running = False
-            state.save()
-            recovered += 1
-            logger.info(f"[Recovery] Fixed orphaned ScrapingState for {state.website.name} (no current_session)")
-        elif state.current_session.status not in ('running', 'pending'):
-            state.is_running = False
-            state.current_session = None
-            state.save()
-            recovered += 1
-            logger.info(
-                f"[Recovery] Fixed orphaned ScrapingState for {state.website.name} "
-                f"(session status={state.current_session.status})"
+                f"[Recovery] Recovering session #{session['id']} "
+                f"({session['website__name']}, status={session['status']}): {reason}"
             )
+            stuck_session_ids.append(session['id'])
 
+    # ── 2. Fail stuck sessions in one UPDATE ──────────────────────────────
+    recovered = 0
+    if stuck_session_ids:
+        recovered = ScrapingSession.objects.filter(
+            id__in=stuck_session_ids, status__in=['running', 'pending']
+        ).update(status='failed', completed_at=now)
+
+    # ── 3. Reset ScrapingState records in one UPDATE ──────────────────────
+    # Covers the states of the sessions failed above as well as orphaned
+    # states (running without a session, or pointing at a finished one)
+    states_fixed = ScrapingState.objects.filter(
+        Q(current_session_id__in=stuck_session_ids)
+        | Q(is_running=True, current_session__isnull=True)
+        | (Q(is_running=True) & ~Q(current_session__status__in=['running', 'pending']))
+    ).update(is_running=False, current_session=None)
+    if states_fixed:
+        logger.info(f"[Recovery] Reset {states_fixed} ScrapingState record(s)")
+
+    recovered += states_fixed
     logger.info(f"[Recovery] Complete — {recovered} session(s)/state(s) recovered")
     return recovered
 
@@ -247,82 +285,107 @@ def get_scraper_function(function_name):
     """Get scraper function by name"""
     return SCRAPER_FUNCTIONS.get(function_name)
 
-def start_scraping_session(website_id, user=None, resume_from_index=0):
+def _clear_way_for_session(website):
     """
-    Start a new scraping session for a website.
+    Recover dead sessions of a website before a new one starts.
 
-    Includes:
-    - Duplicate prevention: checks both DB state AND actual Celery task liveness
-    - Auto-recovery: dead/stuck sessions for this website are cleaned up automatically
-      before attempting to start a new one
+    Returns:
+        dict: The refusal to return when a session is still active, or None
     """
-    try:
-        website = Website.objects.get(id=website_id)
+    # ── Duplicate / stuck-session check ───────────────────────────────
+    # Look for ANY active (running or pending) sessions for this website in the DB.
+    # We intentionally check the DB directly rather than relying solely on
+    # ScrapingState.is_running because that flag can be stale after a crash.
+    active_sessions = ScrapingSession.objects.filter(
+        website=website,
+        status__in=['running', 'pending']
+    ).order_by('-started_at')
 
-        # ── Duplicate / stuck-session check ───────────────────────────────
-        # Look for ANY active (running or pending) sessions for this website in the DB.
-        # We intentionally check the DB directly rather than relying solely on
-        # ScrapingState.is_running because that flag can be stale after a crash.
-        active_sessions = ScrapingSession.objects.filter(
-            website=website,
-            status__in=['running', 'pending']
-        ).order_by('-started_at')
+    for active_session in active_sessions:
+        task_alive = is_celery_task_alive(active_session.celery_task_id)
+        age_minutes = (timezone.now() - active_session.started_at).total_seconds() / 60
 
-        for active_session in active_sessions:
-            task_alive = is_celery_task_alive(active_session.celery_task_id)
-            age_minutes = (timezone.now() - active_session.started_at).total_seconds() / 60
+        if task_alive is True:
+            # Genuinely alive – refuse to start a duplicate
+            return {
+                'success': False,
+                'message': f'Scraping is already running for {website.name}',
+                'session_id': active_session.id,
+            }
 
-            if task_alive is True:
-                # Genuinely alive – refuse to start a duplicate
+        elif task_alive is False:
+            # Confirmed dead – auto-recover and continue
+            logger.info(
+                f"[StartSession] Auto-recovering dead session #{active_session.id} "
+                f"for {website.name} before starting new one"
+            )
+            _reset_stuck_session(active_session)
+
+        else:
+            # PENDING (ambiguous): decide based on age
+            if age_minutes < 15:
+                # Recently queued – treat as still active to avoid duplicates
                 return {
                     'success': False,
-                    'message': f'Scraping is already running for {website.name}',
+                    'message': (
+                        f'A scraping task for {website.name} is already queued or starting '
+                        f'(session #{active_session.id}, {age_minutes:.0f} min ago). '
+                        f'Wait a moment or use the recovery option if it appears stuck.'
+                    ),
                     'session_id': active_session.id,
                 }
-
-            elif task_alive is False:
-                # Confirmed dead – auto-recover and continue
+            else:
+                # Old PENDING – likely a dead-worker orphan, recover it
                 logger.info(
-                    f"[StartSession] Auto-recovering dead session #{active_session.id} "
-                    f"for {website.name} before starting new one"
+                    f"[StartSession] Auto-recovering stale PENDING session #{active_session.id} "
+                    f"for {website.name} ({age_minutes:.0f} min old)"
                 )
                 _reset_stuck_session(active_session)
 
-            else:
-                # PENDING (ambiguous): decide based on age
-                if age_minutes < 15:
-                    # Recently queued – treat as still active to avoid duplicates
-                    return {
-                        'success': False,
-                        'message': (
-                            f'A scraping task for {website.name} is already queued or starting '
-                            f'(session #{active_session.id}, {age_minutes:.0f} min ago). '
-                            f'Wait a moment or use the recovery option if it appears stuck.'
-                        ),
-                        'session_id': active_session.id,
-                    }
-                else:
-                    # Old PENDING – likely a dead-worker orphan, recover it
-                    logger.info(
-                        f"[StartSession] Auto-recovering stale PENDING session #{active_session.id} "
-                        f"for {website.name} ({age_minutes:.0f} min old)"
-                    )
-                    _reset_stuck_session(active_session)
+    # ── Ensure ScrapingState is clean before starting ─────────────────
+    state, _ = ScrapingState.objects.get_or_create(website=website)
+    if state.is_running:
+        # No active sessions remain after recovery above – reset the flag
+        state.is_running = False
+        state.current_session = None
+        state.save()
+    return None
 
-        # ── Ensure ScrapingState is clean before starting ─────────────────
-        state, _ = ScrapingState.objects.get_or_create(website=website)
-        if state.is_running:
-            # No active sessions remain after recovery above – reset the flag
-            state.is_running = False
-            state.current_session = None
-            state.save()
+def start_scraping_session(website_id, user=None, resume_from_index=0, dispatch=None, mode='full'):
+    """
+    Start a new scraping session for a website.
+
+    Includes:
+    - Duplicate prevention: checks both DB state AND actual Celery task liveness
+    - Auto-recovery: dead/stuck sessions for this website are cleaned up automatically
+      before attempting to start a new one
+    - Lane routing: the task goes to the fast or slow scraping queue by its
+      expected duration; the decision is stored on the session
+
+    Args:
+        dispatch: Decision from scheduler.plan_dispatch() when starting a batch;
+            planned for this website alone if not given
+        mode: 'full' or 'incremental' (see ScrapingSession.SCRAPE_MODE_CHOICES)
+    """
+    try:
+        website = Website.objects.get(id=website_id)
+
+        refusal = _clear_way_for_session(website)
+        if refusal is not None:
+            return refusal
 
         # ── Create new session ────────────────────────────────────────────
+        if dispatch is None:
+            dispatch = plan_dispatch([website], mode)[0]
         session = ScrapingSession.objects.create(
             website=website,
             status='pending',
             started_by=user,
             last_processed_index=resume_from_index,
+            scrape_mode=mode,
+            dispatch_queue=dispatch['queue'],
+            dispatch_position=dispatch['position'],
+            expected_duration=dispatch['expected_duration'],
         )
 
         scraper_function = get_scraper_function(website.scraper_function)
@@ -334,11 +397,15 @@ def start_scraping_session(website_id, user=None, resume_from_index=0):
                 'message': f'No scraper function found for {website.scraper_function}',
             }
 
-        task = scraper_function.delay(session.id, resume_from_index)
+        task = scraper_function.apply_async(args=[session.id, resume_from_index], queue=dispatch['queue'])
         session.celery_task_id = task.id
         session.save()
+        log_message(session, 'info', f'Dispatched to {describe_decision(dispatch)}')
 
-        logger.info(f"[StartSession] Started session #{session.id} for {website.name}, task={task.id}")
+        logger.info(
+            f"[StartSession] Started session #{session.id} for {website.name}, task={task.id} "
+            f"({describe_decision(dispatch)})"
+        )
         return {
             'success': True,
             'message': f'Scraping started for {website.name}',
@@ -352,6 +419,73 @@ def start_scraping_session(website_id, user=None, resume_from_index=0):
         logger.exception(f"[StartSession] Unexpected error for website_id={website_id}")
         return {'success': False, 'message': f'Error starting scraping: {str(e)}'}
 
+def start_scraping_batch(websites, user=None):
+    """
+    Start scraping for several websites, shortest expected run first.
+
+    Each website is routed to the fast or slow lane (see scheduler.py), so
+    long crawls never hold every slot while short scrapes wait.
+
+    Returns:
+        list of (dispatch decision, start_scraping_session result) in dispatch order
+    """
+    results = []
+    for decision in plan_dispatch(websites):
+        result = start_scraping_session(decision['website'].id, user=user, dispatch=decision)
+        results.append((decision, result))
+    return results
+
+def start_cooperative_crawl(websites, user=None):
+    """
+    Full-crawl several custom HTML websites together in one slow-lane task
+    (tasks.crawl_websites_together), each at its own request pace.
+
+    Websites that can't take part (Shopify stores, listing-only scrapers)
+    or that already have an active session are skipped.
+
+    Returns:
+        dict: success, message, session_ids, task_id, skipped (messages)
+    """
+    from celery.utils import uuid
+    from .tasks import cooperative_scraper_type, crawl_websites_together
+
+    task_id = uuid()
+    sessions, skipped = [], []
+    for website in websites:
+        if cooperative_scraper_type(website) is None:
+            skipped.append(f'{website.name}: not a custom HTML crawl')
+            continue
+        refusal = _clear_way_for_session(website)
+        if refusal is not None:
+            skipped.append(f"{website.name}: {refusal['message']}")
+            continue
+        sessions.append(ScrapingSession.objects.create(
+            website=website,
+            status='pending',
+            started_by=user,
+            scrape_mode='full',
+            dispatch_queue='scraping_slow',
+            celery_task_id=task_id,
+            resume_data={'cooperative': {'task_id': task_id}},
+        ))
+
+    if not sessions:
+        return {'success': False, 'message': 'No websites to crawl', 'session_ids': [], 'skipped': skipped}
+
+    session_ids = [session.id for session in sessions]
+    crawl_websites_together.apply_async(args=[session_ids], task_id=task_id, queue='scraping_slow')
+    for session in sessions:
+        log_message(session, 'info', f'Dispatched to a cooperative crawl of {len(sessions)} websites (scraping_slow lane)')
+
+    logger.info(f"[StartSession] Started cooperative crawl {task_id} of {len(sessions)} websites")
+    return {
+        'success': True,
+        'message': f'Crawling {len(sessions)} websites together',
+        'session_ids': session_ids,
+        'task_id': task_id,
+        'skipped': skipped,
+    }
+
 def stop_scraping_session(website_id):
     """
     Stop the current scraping session for a website.
@@ -373,13 +507,20 @@ def stop_scraping_session(website_id):
 
         stopped_ids = []
         for session in active_sessions:
-            if session.celery_task_id:
+            # Chunked crawls also revoke their chunk tasks
+            task_ids = [session.celery_task_id] if session.celery_task_id else []
+            task_ids += _chunk_task_ids({'resume_data': session.resume_data})
+            # A cooperative crawl task also crawls other websites; it stops
+            # this one when it sees the status change
+            shared_task_id = session.resume_data.get('cooperative', {}).get('task_id')
+            task_ids = [task_id for task_id in task_ids if task_id != shared_task_id]
+            for task_id in task_ids:
                 try:
-                    current_app.control.revoke(session.celery_task_id, terminate=True)
-                    logger.info(f"[StopSession] Revoked task {session.celery_task_id} for {website.name}")
+                    current_app.control.revoke(task_id, terminate=True)
+                    logger.info(f"[StopSession] Revoked task {task_id} for {website.name}")
                 except Exception as revoke_err:
                     logger.warning(
-                        f"[StopSession] Could not revoke task {session.celery_task_id} "
+                        f"[StopSession] Could not revoke task {task_id} "
                         f"(may already be dead): {revoke_err}"
                     )
 
@@ -474,12 +615,17 @@ def resume_scraping_session(session_id, user=None):
             state.save()
 
         # Create new session from where the old one left off
+        dispatch = plan_dispatch([website], session.scrape_mode)[0]
         new_session = ScrapingSession.objects.create(
             website=website,
             status='pending',
             started_by=user,
             last_processed_index=session.last_processed_index,
             resume_data={'resumed_from_session': session.id},
+            scrape_mode=session.scrape_mode,
+            dispatch_queue=dispatch['queue'],
+            dispatch_position=dispatch['position'],
+            expected_duration=dispatch['expected_duration'],
         )
 
         scraper_function = get_scraper_function(website.scraper_function)
@@ -491,9 +637,12 @@ def resume_scraping_session(session_id, user=None):
                 'message': f'No scraper function found for {website.scraper_function}',
             }
 
-        task = scraper_function.delay(new_session.id, session.last_processed_index)
+        task = scraper_function.apply_async(
+            args=[new_session.id, session.last_processed_index], queue=dispatch['queue']
+        )
         new_session.celery_task_id = task.id
         new_session.save()
+        log_message(new_session, 'info', f'Dispatched to {describe_decision(dispatch)}')
 
         logger.info(
             f"[ResumeSession] Resumed as session #{new_session.id} for {website.name}, "
@@ -513,9 +662,58 @@ def resume_scraping_session(session_id, user=None):
         logger.exception(f"[ResumeSession] Unexpected error for session_id={session_id}")
         return {'success': False, 'message': f'Error resuming scraping: {str(e)}'}
 
-def get_website_status(website_id):
+def reextract_session(session_id, user=None):
+    """
+    Re-run extraction over the pages a session archived, in a new session on
+    the sync queue. Does not touch the network or the website's scraper slot.
+    """
+    from .tasks import get_archive_extractor, scrape_from_archive
+
+    try:
+        session = ScrapingSession.objects.get(id=session_id)
+        website = session.website
+
+        if get_archive_extractor(website) is None:
+            return {'success': False, 'message': f'{website.name} does not archive product pages'}
+
+        page_count = session.archived_pages.count()
+        if not page_count:
+            return {'success': False, 'message': f'Session #{session.id} has no archived pages'}
+
+        new_session = ScrapingSession.objects.create(
+            website=website,
+            status='pending',
+            started_by=user,
+            resume_data={'reextracted_from_session': session.id},
+        )
+        task = scrape_from_archive.apply_async(args=[new_session.id], queue='sync')
+        new_session.celery_task_id = task.id
+        new_session.save()
+
+        logger.info(
+            f"[Reextract] Session #{new_session.id} re-extracting {page_count} pages of "
+            f"session #{session.id} for {website.name}, task={task.id}"
+        )
+        return {
+            'success': True,
+            'message': f'Re-extracting {page_count} archived pages for {website.name}',
+            'session_id': new_session.id,
+            'task_id': task.id,
+        }
+
+    except ScrapingSession.DoesNotExist:
+        return {'success': False, 'message': 'Session not found'}
+    except Exception as e:
+        logger.exception(f"[Reextract] Unexpected error for session_id={session_id}")
+        return {'success': False, 'message': f'Error starting re-extraction: {str(e)}'}
+
+def get_website_status(website_id, task_liveness=None):
     """
     Get the current status of a website's scraping operation
+
+    Args:
+        task_liveness: Optional {task_id: alive} map from get_task_liveness(),
+            so pages listing many websites check all tasks in one lookup
     """
     try:
         website = Website.objects.get(id=website_id)
@@ -544,14 +742,11 @@ def get_website_status(website_id):
                 'last_processed_index': session.last_processed_index,
             }
             
-            # Get task status if available
+            # Get task liveness if available
             if session.celery_task_id:
-                try:
-                    task_result = current_app.AsyncResult(session.celery_task_id)
-                    result['current_session']['task_status'] = task_result.status
-                    result['current_session']['task_info'] = task_result.info
-                except:
-                    pass
+                if task_liveness is None or session.celery_task_id not in task_liveness:
+                    task_liveness = get_task_liveness([session.celery_task_id])
+                result['current_session']['task_alive'] = task_liveness[session.celery_task_id]
         
         return result
     except Website.DoesNotExist:
@@ -0,0 +1,159 @@
+"""
+Benchmark of the scraping path under gevent
+
+Runs crawl_chunk, the task a chunked crawl sends to the scraping queue, for
+--concurrency simulated vendors at once in greenlets of this process, the
+way a `celery worker -P gevent -c <concurrency>` worker would run them. Each
+vendor is a local HTTP server on its own port (so its own rate-limit domain)
+that answers after --latency seconds with a product page.
+
+Prints throughput (product pages saved per second) and the resident memory
+of the process for one vendor and for --concurrency vendors; a prefork
+worker needs about the one-vendor footprint per process.
+
+Writes go to a throwaway SQLite database unless --configured-database is
+given, in which case the benchmark websites and their rows are deleted at
+the end.
+
+Usage:
+    python scraper_scripts_testing/gevent_benchmark.py --concurrency 50 --pages 20
+"""
+
+from gevent import monkey
+monkey.patch_all()
+
+import argparse
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+import gevent
+from gevent.pywsgi import WSGIServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+PRODUCT_PAGE = (
+    '<html><head><title>{name}</title></head><body>'
+    '<h2 class="pd-top__main-right__title">{name}</h2>'
+    '<span class="pd-top__main-right__price">${price}.00</span>'
+    '<span class="pd-top__main-right__bpinner-label sku">{sku}</span>'
+    '<div class="description">{filler}</div>'
+    '</body></html>'
+)
+
+
+def rss_mb():
+    """Current resident set size of this process in MB (Linux), else the peak"""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def start_vendor(vendor, latency):
+    """Serve product pages of one simulated vendor; returns its base URL"""
+    def app(environ, start_response):
+        time.sleep(latency)
+        idx = environ['PATH_INFO'].rsplit('/', 1)[-1]
+        body = PRODUCT_PAGE.format(name=f'Vendor {vendor} product {idx}', price=10 + int(idx),
+                                   sku=f'V{vendor}-{idx}', filler='x' * 50_000).encode()
+        start_response('200 OK', [('Content-Type', 'text/html; charset=utf-8')])
+        return [body]
+
+    server = WSGIServer(('127.0.0.1', 0), app, log=None)
+    server.start()
+    return f'http://127.0.0.1:{server.server_port}'
+
+
+def run_round(concurrency, pages, latency, interval):
+    from scraper.models import Product, ScrapingSession, Website
+    from scraper.tasks import crawl_chunk
+
+    sessions = []
+    for vendor in range(concurrency):
+        base_url = start_vendor(vendor, latency)
+        website = Website.objects.create(name=f'benchmark{concurrency}_{vendor}', url=base_url,
+                                         scraper_function='scrape_meiros', is_active=False)
+        session = ScrapingSession.objects.create(website=website, status='running', total_products_found=pages)
+        sessions.append((session, [f'{base_url}/p/{idx}' for idx in range(pages)]))
+
+    started = time.time()
+    greenlets = [
+        gevent.spawn(crawl_chunk.apply, args=(session.id, 'meiros', 0, urls))
+        for session, urls in sessions
+    ]
+    gevent.joinall(greenlets)
+    elapsed = time.time() - started
+
+    results = [greenlet.value.get() for greenlet in greenlets]
+    saved = sum(result['scraped'] for result in results)
+    failed = sum(result['failed'] for result in results)
+    names = [session.website.name for session, urls in sessions]
+    stored = Product.objects.filter(website__in=names).count()
+    return {'elapsed': elapsed, 'saved': saved, 'failed': failed, 'stored': stored, 'rss': rss_mb()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--pages', type=int, default=20, help='product pages per vendor')
+    parser.add_argument('--latency', type=float, default=0.3, help='seconds a vendor takes to answer')
+    parser.add_argument('--interval', type=float, default=1.0, help='seconds between requests to one vendor')
+    parser.add_argument('--configured-database', action='store_true',
+                        help='write to the database in the settings instead of a throwaway SQLite file')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='gevent-benchmark-')
+    from django.conf import settings
+    if not args.configured_database:
+        settings.DATABASES['default'] = {'ENGINE': 'django.db.backends.sqlite3',
+                                         'NAME': os.path.join(workdir, 'db.sqlite3')}
+    settings.PAGE_ARCHIVE_ROOT = os.path.join(workdir, 'page_archive')
+    settings.SCRAPER_MAX_CONCURRENT = args.concurrency
+    # No Redis needed: heartbeats are skipped and rate limiting stays in-process
+    settings.CELERY_RESULT_BACKEND = 'cache+memory://'
+
+    import django
+    django.setup()
+    from django.core.management import call_command
+    from scraper import green, page_archive, tasks
+    from scraper.models import Product, Website
+
+    page_archive.PAGE_ARCHIVE_ROOT = settings.PAGE_ARCHIVE_ROOT
+    tasks.CRAWL_DOMAIN_INTERVAL = args.interval
+    if not args.configured_database:
+        call_command('migrate', verbosity=0)
+
+    try:
+        baseline = rss_mb()
+        print(f'Process after setup: {baseline:.1f} MB')
+        for concurrency in (1, args.concurrency):
+            result = run_round(concurrency, args.pages, args.latency, args.interval)
+            print(f"concurrency {concurrency:>3}: {result['saved']} pages saved ({result['failed']} failed, "
+                  f"{result['stored']} products stored) in {result['elapsed']:.1f}s = "
+                  f"{result['saved'] / result['elapsed']:.1f} pages/s, RSS {result['rss']:.1f} MB")
+            if concurrency == 1:
+                single = result
+        print(f'Query slots and soft time limits (green.py) active: {green._configured}')
+        extra = (result['rss'] - single['rss']) / max(1, args.concurrency - 1)
+        print(f'gevent: {result["rss"]:.1f} MB for {args.concurrency} concurrent crawls '
+              f'(~{extra:.2f} MB each); prefork: ~{args.concurrency} x {single["rss"]:.1f} MB = '
+              f'{args.concurrency * single["rss"]:.0f} MB')
+    finally:
+        if args.configured_database:
+            names = Website.objects.filter(name__startswith='benchmark').values_list('name', flat=True)
+            Product.objects.filter(website__in=list(names)).delete()
+            Website.objects.filter(name__startswith='benchmark').delete()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()